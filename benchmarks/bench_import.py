@@ -0,0 +1,197 @@
+"""
+Benchmark statement imports end to end on generated statement PDFs.
+
+Each stage (parse, categorize, write) is timed on its own, then the whole
+import runs through StatementImportService. Peak memory per stage is measured
+with tracemalloc in a separate pass, since tracing slows parsing down.
+
+Usage:
+    python -m benchmarks.bench_import [--pages 20] [--rows 30] [--files 1]
+        [--backend pdfium]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+from benchmarks.statement_pdf import merchant_description, write_statement
+from expense_tracker.core.merchant_repository import MerchantCategoryRepository
+from expense_tracker.core.models import MerchantCategory, Transaction
+from expense_tracker.core.transaction_repository import TransactionRepository
+from expense_tracker.services.importer import (
+    ImportReport,
+    StatementImportService,
+    parse_row_date,
+)
+from expense_tracker.services.merchant import MerchantCategoryService
+from expense_tracker.utils.extract import PDF_BACKENDS, parse_bofa_statement_pdf
+from expense_tracker.utils.merchant_normalizer import normalize_merchant
+
+
+def seed_merchants(repo: MerchantCategoryRepository, count: int, seed: int = 0) -> None:
+    """Stores categories for merchants like the ones in generated statements."""
+    rng = random.Random(seed)
+    for _ in range(count):
+        description, category = merchant_description(rng)
+        key = normalize_merchant(description)
+        repo.set_category(MerchantCategory(key, category))
+    repo.add_rule("UBER *EATS", "Food")
+    repo.add_rule("AMAZON MKTP", "Shopping")
+
+
+def measure(fn: Callable, trace_memory: bool) -> tuple[object, float, int | None]:
+    """Runs fn, returning its result, elapsed seconds and peak traced bytes."""
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = fn()
+    finally:
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        if trace_memory:
+            tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def fresh_repos(
+    db_dir: Path, name: str
+) -> tuple[TransactionRepository, MerchantCategoryRepository]:
+    """
+    An empty transaction database and a copy of the seeded merchant database,
+    so fuzzy matches cached by one run do not speed up the next.
+    """
+    merchant_db = db_dir / f"{name}-merchants.db"
+    shutil.copy(db_dir / "merchants.db", merchant_db)
+    return (
+        TransactionRepository(str(db_dir / f"{name}.db")),
+        MerchantCategoryRepository(str(merchant_db)),
+    )
+
+
+def run_stages(
+    paths: list[str], db_dir: Path, trace_memory: bool, name: str
+) -> list[tuple]:
+    """Times parse, categorize and write separately on fresh databases."""
+    transaction_repo, merchant_repo = fresh_repos(db_dir, name)
+    merchant_service = MerchantCategoryService(
+        merchant_repo, transaction_repo, normalize_merchant
+    )
+
+    def parse() -> list[dict]:
+        rows = []
+        for path in paths:
+            rows.extend(parse_bofa_statement_pdf(path))
+        return rows
+
+    rows, parse_seconds, parse_peak = measure(parse, trace_memory)
+
+    def categorize() -> list[Transaction]:
+        return [
+            Transaction(
+                id=None,
+                date=parse_row_date(row["date"]),
+                amount=float(row["amount"]),
+                category=merchant_service.categorize_merchant(
+                    row["description"], float(row["amount"])
+                ),
+                description=row["description"],
+            )
+            for row in rows
+        ]
+
+    transactions, categorize_seconds, categorize_peak = measure(
+        categorize, trace_memory
+    )
+    _, write_seconds, write_peak = measure(
+        lambda: transaction_repo.add_transactions(transactions), trace_memory
+    )
+    transaction_repo.conn.close()
+    merchant_repo.conn.close()
+    return [
+        ("parse", len(rows), parse_seconds, parse_peak),
+        ("categorize", len(rows), categorize_seconds, categorize_peak),
+        ("write", len(rows), write_seconds, write_peak),
+    ]
+
+
+def run_import(
+    paths: list[str], db_dir: Path, trace_memory: bool, name: str
+) -> tuple[tuple[str, int, float, int | None], ImportReport]:
+    """Times a full StatementImportService import into a fresh database."""
+    transaction_repo, merchant_repo = fresh_repos(db_dir, name)
+    service = StatementImportService(
+        transaction_repo,
+        MerchantCategoryService(merchant_repo, transaction_repo, normalize_merchant),
+    )
+    report, seconds, peak = measure(lambda: service.import_files(paths), trace_memory)
+    transaction_repo.conn.close()
+    merchant_repo.conn.close()
+    return ("import (all stages)", report.imported, seconds, peak), report
+
+
+def print_results(title: str, results: list[tuple]) -> None:
+    print(title)
+    for stage, rows, seconds, peak in results:
+        rate = rows / seconds if seconds > 0 else 0.0
+        memory = f"{peak / 1024 / 1024:8.1f} MiB peak" if peak is not None else ""
+        print(
+            f"  {stage:<20} {rows:>7} rows {seconds:8.3f} s"
+            f" {rate:>10.0f} rows/s {memory}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=20, help="pages per statement")
+    parser.add_argument("--rows", type=int, default=30, help="rows per page")
+    parser.add_argument("--files", type=int, default=1, help="number of statements")
+    parser.add_argument("--merchants", type=int, default=500, help="known merchants")
+    parser.add_argument(
+        "--backend", choices=PDF_BACKENDS, help="PDF text extraction backend"
+    )
+    parser.add_argument(
+        "--no-memory", action="store_true", help="skip the tracemalloc pass"
+    )
+    args = parser.parse_args()
+    if args.backend:
+        # Read by every parse, including those in worker processes.
+        os.environ["SPENDWISE_PDF_BACKEND"] = args.backend
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        paths = []
+        for i in range(args.files):
+            path = tmp_dir / f"statement-{i}.pdf"
+            write_statement(str(path), args.pages, args.rows, seed=i)
+            paths.append(str(path))
+        merchant_repo = MerchantCategoryRepository(str(tmp_dir / "merchants.db"))
+        seed_merchants(merchant_repo, args.merchants)
+        merchant_repo.conn.close()
+
+        print(
+            f"{args.files} statement(s) x {args.pages} pages x {args.rows} rows, "
+            f"{args.merchants} known merchants"
+        )
+        import_result, report = run_import(paths, tmp_dir, False, "import")
+        stage_results = run_stages(paths, tmp_dir, False, "stages")
+        print_results("Time", stage_results + [import_result])
+        print("Import pipeline stages")
+        for line in report.stage_summary().splitlines():
+            print(f"  {line}")
+        if not args.no_memory:
+            import_result, _ = run_import(paths, tmp_dir, True, "import-traced")
+            print_results(
+                "Memory (tracemalloc, slower)",
+                run_stages(paths, tmp_dir, True, "stages-traced") + [import_result],
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark fuzzy merchant lookups with and without the trigram index.
+
+Usage:
+    python -m benchmarks.bench_merchant_index [--sizes 1000 10000 100000]
+"""
+
+import argparse
+import math
+import random
+import string
+import time
+
+from rapidfuzz import process
+
+from expense_tracker.utils.ngram_index import NGramIndex
+
+COMMON_WORDS = ["MARKET", "CAFE", "STORE", "GRILL", "PHARMACY", "FUEL", "BAKERY", "INC"]
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choice(string.ascii_uppercase) for _ in range(rng.randint(4, 9)))
+
+
+def generate_merchant_keys(count: int, seed: int = 0) -> list[str]:
+    """Generates normalized merchant keys such as "KOVARI BAKERY".
+
+    The second word comes from a shared vocabulary (locations, chains, common
+    words), so keys overlap the way real merchant names do.
+    """
+    rng = random.Random(seed)
+    vocabulary = COMMON_WORDS + [_word(rng) for _ in range(3000)]
+    keys: dict[str, None] = {}
+    while len(keys) < count:
+        keys[f"{_word(rng)} {rng.choice(vocabulary)}"] = None
+    return list(keys)
+
+
+def generate_queries(keys: list[str], count: int, seed: int = 1) -> list[str]:
+    """Generates lookups: noisy copies of known keys and unknown merchants."""
+    rng = random.Random(seed)
+    queries = []
+    for i in range(count):
+        if i % 2:
+            queries.append(f"{_word(rng)} {_word(rng)}")
+            continue
+        chars = list(rng.choice(keys))
+        chars[rng.randrange(len(chars))] = rng.choice(string.ascii_uppercase)
+        queries.append("".join(chars))
+    return queries
+
+
+def run(size: int, num_queries: int, threshold: int) -> float:
+    """Prints timings for one index size and returns candidates per lookup."""
+    keys = generate_merchant_keys(size)
+    queries = generate_queries(keys, num_queries)
+
+    start = time.perf_counter()
+    index = NGramIndex(keys)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = [process.extractOne(q, keys, score_cutoff=threshold) for q in queries]
+    exhaustive_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    examined = 0
+    actual = []
+    for q in queries:
+        candidates = index.candidates(q)
+        examined += len(candidates)
+        actual.append(process.extractOne(q, candidates, score_cutoff=threshold))
+    indexed_seconds = time.perf_counter() - start
+
+    mismatches = sum((a and a[:2]) != (e and e[:2]) for a, e in zip(actual, expected))
+    print(
+        f"{size:>8} keys | build {build_seconds * 1000:8.1f} ms"
+        f" | exhaustive {exhaustive_seconds / num_queries * 1000:7.3f} ms/lookup"
+        f" | indexed {indexed_seconds / num_queries * 1000:7.3f} ms/lookup"
+        f" | candidates {examined / num_queries:8.1f}"
+        f" | mismatches {mismatches}"
+    )
+    return examined / num_queries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000]
+    )
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--threshold", type=int, default=90)
+    args = parser.parse_args()
+
+    sizes = sorted(args.sizes)
+    candidates = [run(size, args.queries, args.threshold) for size in sizes]
+
+    # Candidates must grow sublinearly: by at most the square root of the growth
+    # in keys, so pruning keeps up as the merchant table grows.
+    if len(sizes) > 1:
+        growth = candidates[-1] / max(candidates[0], 1)
+        limit = math.sqrt(sizes[-1] / sizes[0])
+        if growth > limit:
+            raise SystemExit(
+                f"candidates grew {growth:.1f}x from {sizes[0]} to {sizes[-1]} keys"
+                f" (limit {limit:.1f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Generate Bank of America style statement PDFs for benchmarks and tests.
+
+The PDFs are written by hand (Helvetica text only, one compressed content
+stream per page), so no PDF library or network access is needed. Rows use the
+layout parse_bofa_page expects: date, description and amount columns.
+
+Usage:
+    python -m benchmarks.statement_pdf out.pdf [--pages 5] [--rows 30]
+"""
+
+import argparse
+import random
+import zlib
+from datetime import date, timedelta
+
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792
+
+DATE_X, DESCRIPTION_X, AMOUNT_X = 40, 95, 520
+FONT_SIZE = 8
+ROW_SPACING = 20
+
+MERCHANTS = [
+    ("STARBUCKS STORE {n:05d}", "Coffee"),
+    ("AMAZON MKTP US*{code}", "Shopping"),
+    ("UBER *TRIP {code} HELP.UBER.COM", "Transport"),
+    ("UBER *EATS {code}", "Food"),
+    ("VONS #{n:04d}", "Groceries"),
+    ("TRADER JOE S #{n:03d}", "Groceries"),
+    ("CHEVRON {n:07d}", "Gas"),
+    ("SHELL OIL {n:011d}", "Gas"),
+    ("NETFLIX.COM", "Subscriptions"),
+    ("SPOTIFY USA", "Subscriptions"),
+    ("CVS/PHARMACY #{n:05d}", "Health"),
+    ("TARGET T-{n:04d}", "Shopping"),
+    ("CHIPOTLE {n:04d}", "Food"),
+    ("SQ *{word} COFFEE", "Coffee"),
+    ("TST* {word} KITCHEN", "Food"),
+    ("PAYPAL *{word}", "Shopping"),
+]
+
+CITIES = [
+    ("SAN DIEGO", "CA"),
+    ("LOS ANGELES", "CA"),
+    ("SEATTLE", "WA"),
+    ("AUSTIN", "TX"),
+    ("NEW YORK", "NY"),
+    ("CHICAGO", "IL"),
+]
+
+WORDS = ["BLUE", "OAK", "CEDAR", "HARBOR", "SUNSET", "MAPLE", "RIVER", "NORTH"]
+
+DISCLOSURE = (
+    "Important information about your account. Please examine this statement "
+    "carefully and report any errors or unauthorized transactions promptly. "
+    "Interest charges and fees are described in your account agreement."
+).split()
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: str, pages: list[list[tuple[float, float, int, str]]]) -> None:
+    """Writes text-only pages, each a list of (x, y, font size, text) items."""
+    objects: list[bytes] = [
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica "
+        b"/Encoding /WinAnsiEncoding >>",
+        b"",  # the page tree, filled in once the page ids are known
+    ]
+    font_id, pages_id = 1, 2
+    kids = []
+    for items in pages:
+        stream = "BT\n" + "".join(
+            f"/F1 {size} Tf 1 0 0 1 {x:.2f} {y:.2f} Tm ({_escape(text)}) Tj\n"
+            for x, y, size, text in items
+        )
+        data = zlib.compress((stream + "ET\n").encode("latin-1"))
+        objects.append(
+            b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(data)
+            + data
+            + b"\nendstream"
+        )
+        content_id = len(objects)
+        objects.append(
+            f"<< /Type /Page /Parent {pages_id} 0 R "
+            f"/MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> "
+            f"/Contents {content_id} 0 R >>".encode()
+        )
+        kids.append(len(objects))
+    objects[pages_id - 1] = (
+        f"<< /Type /Pages /Kids [{' '.join(f'{k} 0 R' for k in kids)}] "
+        f"/Count {len(kids)} >>".encode()
+    )
+    objects.append(f"<< /Type /Catalog /Pages {pages_id} 0 R >>".encode())
+    catalog_id = len(objects)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root {catalog_id} 0 R >>\n"
+        f"startxref\n{xref}\n%%EOF\n"
+    ).encode()
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def merchant_description(rng: random.Random) -> tuple[str, str]:
+    """Returns a realistic card description and the category it belongs to."""
+    template, category = rng.choice(MERCHANTS)
+    name = template.format(
+        n=rng.randint(1, 9999),
+        code="".join(rng.choice("ABCDEFGHJKLMNPQRSTUVWXYZ23456789") for _ in range(6)),
+        word=rng.choice(WORDS),
+    )
+    city, state = rng.choice(CITIES)
+    return f"{name} {city} {state}", category
+
+
+def generate_rows(count: int, start: date, seed: int = 0) -> list[dict]:
+    """Transaction rows as parse_bofa_statement_pdf returns them."""
+    rng = random.Random(seed)
+    rows = []
+    day = start
+    for _ in range(count):
+        day += timedelta(days=rng.random() < 0.3)
+        if rng.random() < 0.05:
+            description = "PAYROLL DIRECT DEP"
+            amount = round(rng.uniform(1500, 4000), 2)
+        else:
+            description, _ = merchant_description(rng)
+            amount = -round(rng.uniform(1, 250), 2)
+        rows.append(
+            {"date": day.isoformat(), "description": description, "amount": amount}
+        )
+    return rows
+
+
+def _text_page(title: str, rng: random.Random) -> list[tuple[float, float, int, str]]:
+    items = [(DATE_X, 750, 12, title)]
+    for line in range(40):
+        words = [rng.choice(DISCLOSURE) for _ in range(14)]
+        items.append((DATE_X, 720 - line * 14, 9, " ".join(words)))
+    return items
+
+
+def write_statement(
+    path: str,
+    pages: int = 5,
+    rows_per_page: int = 30,
+    seed: int = 0,
+    cover_pages: int = 1,
+    disclosure_pages: int = 1,
+) -> list[dict]:
+    """
+    Writes a statement with `pages` transaction pages between cover and
+    disclosure pages. Returns the rows the parser should extract from it.
+    """
+    rng = random.Random(seed)
+    rows = generate_rows(pages * rows_per_page, date(2024, 1, 1), seed)
+    page_items = [
+        _text_page("Bank of America - Your combined statement", rng)
+        for _ in range(cover_pages)
+    ]
+    for p in range(pages):
+        items = [
+            (DATE_X, 750, 12, "Bank of America"),
+            (DATE_X, 735, 9, f"Page {p + 1} of {pages}"),
+            (DATE_X, 715, 9, "Date"),
+            (DESCRIPTION_X, 715, 9, "Description"),
+            (AMOUNT_X, 715, 9, "Amount"),
+        ]
+        y = 695
+        for row in rows[p * rows_per_page : (p + 1) * rows_per_page]:
+            posted = date.fromisoformat(row["date"]).strftime("%m/%d/%y")
+            items.append((DATE_X, y, FONT_SIZE, posted))
+            items.append((DESCRIPTION_X, y, FONT_SIZE, row["description"]))
+            items.append((AMOUNT_X, y, FONT_SIZE, f"{row['amount']:,.2f}"))
+            y -= ROW_SPACING
+        page_items.append(items)
+    page_items.extend(
+        _text_page("Important information", rng) for _ in range(disclosure_pages)
+    )
+    write_pdf(path, page_items)
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=30, help="rows per page")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rows = write_statement(args.path, args.pages, args.rows, args.seed)
+    print(f"Wrote {len(rows)} rows on {args.pages} pages to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
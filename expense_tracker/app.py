@@ -1,15 +1,196 @@
-from tkinter import Tk, ttk
-from expense_tracker.gui.main_window import MainWindow
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
 
 from expense_tracker.version import versions
 from expense_tracker.utils.path import get_database_path
 from expense_tracker.utils.migration import migrate_legacy_databases
 from expense_tracker.core.merchant_repository import MerchantCategoryRepository
 from expense_tracker.core.transaction_repository import TransactionRepository
+from expense_tracker.services.merchant import (
+    DEFAULT_FUZZY_THRESHOLD,
+    MerchantCategoryService,
+)
 from expense_tracker.services.statistics import StatisticsService
+from expense_tracker.utils.merchant_normalizer import normalize_merchant
+from expense_tracker.utils.startup import (
+    StartupTimer,
+    format_import_profile,
+    parse_importtime,
+)
 
-def main():
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="expense-tracker", description="Spendwise expense tracker."
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="open the window once under python -X importtime and report "
+        "the slowest imports and the time to the main window",
+    )
+    # Set on the child process --profile-startup runs.
+    parser.add_argument(
+        "--quit-when-ready", action="store_true", help=argparse.SUPPRESS
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    fuzzy_cache = subparsers.add_parser(
+        "fuzzy-cache", help="Inspect or prune cached fuzzy merchant matches."
+    )
+    fuzzy_cache.add_argument(
+        "action",
+        choices=["show", "prune", "clear"],
+        help="show entries, prune stale entries, or clear the whole cache",
+    )
+    fuzzy_cache.add_argument(
+        "--threshold",
+        type=int,
+        default=DEFAULT_FUZZY_THRESHOLD,
+        help="entries computed with any other threshold are stale",
+    )
+
+    rules = subparsers.add_parser(
+        "rules", help="Manage substring rules that categorize merchants."
+    )
+    rule_actions = rules.add_subparsers(dest="action", required=True)
+    add_rule = rule_actions.add_parser(
+        "add", help="add a rule, or change the category of an existing pattern"
+    )
+    add_rule.add_argument("pattern", help="text to find in descriptions")
+    add_rule.add_argument("category", help="category for matching transactions")
+    rule_actions.add_parser("list", help="list rules in the order they apply")
+    delete_rule = rule_actions.add_parser("delete", help="delete a rule by id")
+    delete_rule.add_argument("id", type=int, help="id shown by rules list")
+
+    import_statements = subparsers.add_parser(
+        "import", help="Import statement files or folders without the GUI."
+    )
+    import_statements.add_argument("paths", nargs="+", help="files or folders")
+    import_statements.add_argument(
+        "--threaded",
+        action="store_true",
+        help="run each import stage on its own thread",
+    )
+    return parser
+
+
+def run_fuzzy_cache_command(
+    action: str, merchant_repo: MerchantCategoryRepository, threshold: int
+) -> None:
+    """Prints or prunes the persistent fuzzy match cache."""
+    if action == "show":
+        matches = merchant_repo.get_all_fuzzy_matches()
+        for m in matches:
+            stale = (
+                m.merchant_version != merchant_repo.merchant_version
+                or m.threshold != threshold
+            )
+            score = f"{m.score:.1f}" if m.score is not None else "-"
+            print(
+                f"{m.query_key!r} -> {m.matched_key!r} (score {score}, "
+                f"threshold {m.threshold}){' [stale]' if stale else ''}"
+            )
+        print(f"{len(matches)} cached fuzzy match(es)")
+    elif action == "prune":
+        deleted = merchant_repo.prune_fuzzy_matches(threshold)
+        print(f"Pruned {deleted} stale fuzzy match(es)")
+    else:
+        deleted = merchant_repo.prune_fuzzy_matches()
+        print(f"Cleared {deleted} fuzzy match(es)")
+
+
+def run_rules_command(
+    args: argparse.Namespace, merchant_repo: MerchantCategoryRepository
+) -> None:
+    """Adds, lists or deletes merchant substring rules."""
+    if args.action == "add":
+        rule = merchant_repo.add_rule(args.pattern, args.category)
+        print(f"Rule {rule.id}: {rule.pattern!r} -> {rule.category}")
+    elif args.action == "list":
+        rules = merchant_repo.get_all_rules()
+        for rule in rules:
+            print(f"{rule.id}: {rule.pattern!r} -> {rule.category}")
+        print(f"{len(rules)} rule(s)")
+    elif merchant_repo.delete_rule(args.id):
+        print(f"Deleted rule {args.id}")
+    else:
+        print(f"No rule with id {args.id}")
+
+
+def run_import_command(
+    paths: list[str],
+    transaction_repo: TransactionRepository,
+    merchant_repo: MerchantCategoryRepository,
+    threaded: bool = False,
+) -> None:
+    """Imports statements and prints per-file results and stage timings."""
+    # Imported on first use: the statement parsers load pdfplumber.
+    from expense_tracker.services.importer import StatementImportService
+    from expense_tracker.utils.parse_cache import ParseCache
+
+    merchant_service = MerchantCategoryService(
+        merchant_repo, transaction_repo, normalize_merchant
+    )
+    import_service = StatementImportService(
+        transaction_repo,
+        merchant_service,
+        parse_cache=ParseCache.default(),
+        threaded_stages=threaded,
+    )
+    report = import_service.import_files(paths)
+    print(report.summary())
+    if report.stages:
+        print(report.stage_summary())
+
+
+def run_startup_profile() -> None:
+    """
+    Starts the app in a new interpreter under `-X importtime`, closing it once
+    the main window is interactive, and prints the slowest imports and the
+    wall time from launch to the main window.
+    """
+    command = [
+        sys.executable,
+        "-X",
+        "importtime",
+        "-c",
+        "from expense_tracker.app import main; main()",
+        "--quit-when-ready",
+    ]
+    # -X importtime writes to stderr; a file cannot fill up like a pipe.
+    with tempfile.TemporaryFile("w+") as stderr:
+        start = time.perf_counter()
+        child = subprocess.Popen(
+            command, stdout=subprocess.PIPE, stderr=stderr, text=True
+        )
+        ready = None
+        for line in child.stdout:
+            # The summary arrives as a log record or, without logging, bare.
+            if "Startup:" in line:
+                ready = time.perf_counter() - start
+                print(line[line.index("Startup:") :].rstrip())
+        child.wait()
+        stderr.seek(0)
+        imports = parse_importtime(stderr.read())
+
+    print(format_import_profile(imports))
+    if ready is None:
+        print(f"The app exited with code {child.returncode} before its window opened")
+    else:
+        print(f"Wall time to main window: {ready * 1000:.0f} ms")
+
+
+def main(argv: list[str] | None = None):
     """Start the Expense Tracker application."""
+    startup = StartupTimer()
+    args = build_parser().parse_args(argv)
+    if args.profile_startup:
+        run_startup_profile()
+        return
 
     versions()
 
@@ -24,6 +205,21 @@ def main():
     merchant_repo = MerchantCategoryRepository(
         str(get_database_path("merchant_categories.db"))
     )
+
+    if args.command == "fuzzy-cache":
+        run_fuzzy_cache_command(args.action, merchant_repo, args.threshold)
+        return
+    if args.command == "rules":
+        run_rules_command(args, merchant_repo)
+        return
+    if args.command == "import":
+        run_import_command(args.paths, transaction_repo, merchant_repo, args.threaded)
+        return
+
+    # Imported here so the commands above never load tkinter or the tabs.
+    from tkinter import Tk, ttk
+    from expense_tracker.gui.main_window import MainWindow
+
     statistics_service = StatisticsService(transaction_repo)
 
     root = Tk()
@@ -35,6 +231,10 @@ def main():
         tb.Style("darkly")
     except Exception:
         ttk.Style()
-    MainWindow(root, transaction_repo, merchant_repo, statistics_service)
+    window = MainWindow(
+        root, transaction_repo, merchant_repo, statistics_service, startup
+    )
+    if args.quit_when_ready:
+        window.bind("<<StartupComplete>>", lambda e: root.destroy())
     root.focus_force()
     root.mainloop()
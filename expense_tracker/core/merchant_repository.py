@@ -1,7 +1,7 @@
 import logging
 import sqlite3
 
-from expense_tracker.core.models import MerchantCategory
+from expense_tracker.core.models import FuzzyMatch, MerchantCategory, MerchantRule
 
 logger = logging.getLogger(__name__)
 
@@ -11,9 +11,11 @@ class MerchantCategoryRepository:
     """
 
     def __init__(self, db_path: str):
+        self.db_path = db_path
         self.conn = sqlite3.connect(db_path, check_same_thread=False)
         self.conn.row_factory = sqlite3.Row
         self._init_schema()
+        self.merchant_version = self._load_meta("merchant_version")
         logger.info("Initialized merchant category database schema")
 
     def _init_schema(self) -> None:
@@ -22,8 +24,48 @@ class MerchantCategoryRepository:
                 merchant_key TEXT PRIMARY KEY,
                 category TEXT NOT NULL
             );
+            CREATE TABLE IF NOT EXISTS merchant_rules (
+                id INTEGER PRIMARY KEY,
+                pattern TEXT NOT NULL UNIQUE,
+                category TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS fuzzy_match_cache (
+                query_key TEXT PRIMARY KEY,
+                matched_key TEXT,
+                score REAL,
+                threshold INTEGER NOT NULL,
+                merchant_version INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_fuzzy_match_cache_matched_key
+                ON fuzzy_match_cache (matched_key);
+            CREATE TABLE IF NOT EXISTS merchant_meta (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
         """)
 
+    def _load_meta(self, name: str) -> int:
+        row = self.conn.execute(
+            "SELECT value FROM merchant_meta WHERE name = ?", (name,)
+        ).fetchone()
+        return row["value"] if row else 0
+
+    @property
+    def rules_version(self) -> int:
+        """
+        Bumped in the database on every rule change, so callers can rebuild
+        derived matchers, including after another process changed the rules.
+        """
+        return self._load_meta("rules_version")
+
+    def _bump_rules_version(self) -> None:
+        self.conn.execute(
+            """
+            INSERT INTO merchant_meta (name, value) VALUES ('rules_version', 1)
+            ON CONFLICT(name) DO UPDATE SET value = value + 1
+        """
+        )
+
     def _row_to_merchant_category(
         self, row: sqlite3.Row | None
     ) -> MerchantCategory | None:
@@ -35,7 +77,27 @@ class MerchantCategoryRepository:
         )
 
     def set_category(self, merchant_category: MerchantCategory) -> None:
-        """Sets or updates the category for a given merchant key."""
+        """Sets or updates the category for a given merchant key.
+
+        Adding a new key bumps the merchant version, which invalidates every
+        cached fuzzy match. Changing the category of an existing key only
+        drops the cached matches that resolved to that key.
+        """
+        existing = self.get_category(merchant_category.merchant_key)
+        if existing is None:
+            self.merchant_version += 1
+            self.conn.execute(
+                """
+                INSERT INTO merchant_meta (name, value) VALUES ('merchant_version', ?)
+                ON CONFLICT(name) DO UPDATE SET value=excluded.value
+            """,
+                (self.merchant_version,),
+            )
+        elif existing.category != merchant_category.category:
+            self.conn.execute(
+                "DELETE FROM fuzzy_match_cache WHERE matched_key = ?",
+                (merchant_category.merchant_key,),
+            )
         self.conn.execute(
             """
             INSERT INTO merchant_categories (merchant_key, category)
@@ -62,3 +124,135 @@ class MerchantCategoryRepository:
             if merchant:
                 merchants.append(merchant)
         return merchants
+
+    def _row_to_merchant_rule(self, row: sqlite3.Row | None) -> MerchantRule | None:
+        if row is None:
+            return None
+        return MerchantRule(
+            id=row["id"],
+            pattern=row["pattern"],
+            category=row["category"],
+        )
+
+    def add_rule(self, pattern: str, category: str) -> MerchantRule:
+        """Adds a substring rule, or updates the category of an existing pattern."""
+        pattern = pattern.strip().upper()
+        if not pattern:
+            raise ValueError("Rule pattern must not be empty")
+        self.conn.execute(
+            """
+            INSERT INTO merchant_rules (pattern, category)
+            VALUES (?, ?)
+            ON CONFLICT(pattern) DO UPDATE SET category=excluded.category
+        """,
+            (pattern, category),
+        )
+        self._bump_rules_version()
+        self.conn.commit()
+        row = self.conn.execute(
+            "SELECT * FROM merchant_rules WHERE pattern = ?", (pattern,)
+        )
+        return self._row_to_merchant_rule(row.fetchone())
+
+    def delete_rule(self, rule_id: int) -> int:
+        """Deletes a substring rule. Returns the number of rules deleted."""
+        cursor = self.conn.execute(
+            "DELETE FROM merchant_rules WHERE id = ?", (rule_id,)
+        )
+        if cursor.rowcount:
+            self._bump_rules_version()
+        self.conn.commit()
+        return cursor.rowcount
+
+    def get_all_rules(self) -> list[MerchantRule]:
+        """Retrieves all substring rules in the order they were added."""
+        rows = self.conn.execute("SELECT * FROM merchant_rules ORDER BY id")
+        rules = []
+        for row in rows.fetchall():
+            rule = self._row_to_merchant_rule(row)
+            if rule:
+                rules.append(rule)
+        return rules
+
+    def _row_to_fuzzy_match(self, row: sqlite3.Row | None) -> FuzzyMatch | None:
+        if row is None:
+            return None
+        return FuzzyMatch(
+            query_key=row["query_key"],
+            matched_key=row["matched_key"],
+            score=row["score"],
+            threshold=row["threshold"],
+            merchant_version=row["merchant_version"],
+        )
+
+    def get_fuzzy_match(self, query_key: str) -> FuzzyMatch | None:
+        """Retrieves the cached fuzzy match for a normalized merchant key."""
+        row = self.conn.execute(
+            "SELECT * FROM fuzzy_match_cache WHERE query_key = ?", (query_key,)
+        )
+        return self._row_to_fuzzy_match(row.fetchone())
+
+    def set_fuzzy_match(self, fuzzy_match: FuzzyMatch) -> None:
+        """Caches a fuzzy match result. A missing matched_key records a miss.
+
+        The entry is visible to this repository at once but is not committed
+        on its own: callers caching many matches commit them together with
+        commit_fuzzy_matches(), and any other write here commits them too.
+        """
+        self.conn.execute(
+            """
+            INSERT INTO fuzzy_match_cache
+                (query_key, matched_key, score, threshold, merchant_version)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(query_key) DO UPDATE SET
+                matched_key=excluded.matched_key,
+                score=excluded.score,
+                threshold=excluded.threshold,
+                merchant_version=excluded.merchant_version
+        """,
+            (
+                fuzzy_match.query_key,
+                fuzzy_match.matched_key,
+                fuzzy_match.score,
+                fuzzy_match.threshold,
+                fuzzy_match.merchant_version,
+            ),
+        )
+
+    def commit_fuzzy_matches(self) -> None:
+        """Commits the fuzzy matches cached since the last commit, if any."""
+        if self.conn.in_transaction:
+            self.conn.commit()
+
+    def get_all_fuzzy_matches(self) -> list[FuzzyMatch]:
+        """Retrieves all cached fuzzy matches, ordered by query key."""
+        rows = self.conn.execute("SELECT * FROM fuzzy_match_cache ORDER BY query_key")
+        matches = []
+        for row in rows.fetchall():
+            fuzzy_match = self._row_to_fuzzy_match(row)
+            if fuzzy_match:
+                matches.append(fuzzy_match)
+        return matches
+
+    def prune_fuzzy_matches(self, threshold: int | None = None) -> int:
+        """Deletes cached fuzzy matches that can no longer be used.
+
+        Entries from an older merchant version are always stale. If a threshold
+        is given, entries computed with a different threshold are removed too;
+        with no threshold the whole cache is cleared.
+
+        Returns:
+            int: The number of deleted entries.
+        """
+        if threshold is None:
+            cursor = self.conn.execute("DELETE FROM fuzzy_match_cache")
+        else:
+            cursor = self.conn.execute(
+                """
+                DELETE FROM fuzzy_match_cache
+                WHERE merchant_version != ? OR threshold != ?
+            """,
+                (self.merchant_version, threshold),
+            )
+        self.conn.commit()
+        return cursor.rowcount
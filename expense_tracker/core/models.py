@@ -15,3 +15,19 @@ class Transaction:
 class MerchantCategory:
     merchant_key: str
     category: str
+
+
+@dataclass
+class MerchantRule:
+    id: int | None
+    pattern: str
+    category: str
+
+
+@dataclass
+class FuzzyMatch:
+    query_key: str
+    matched_key: str | None
+    score: float | None
+    threshold: int
+    merchant_version: int
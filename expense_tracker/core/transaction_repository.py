@@ -1,7 +1,11 @@
 import logging
 import sqlite3
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
 from dataclasses import replace
 from datetime import date
+from pathlib import Path
 
 from expense_tracker.core.models import Transaction
 
@@ -11,13 +15,66 @@ logger = logging.getLogger(__name__)
 class TransactionRepository:
     """
     A repository for managing transaction data.
+
+    With `read_only` the database file, which must exist already, is opened
+    read-only, for queries on a connection of their own.
     """
 
-    def __init__(self, db_path: str):
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+    def __init__(self, db_path: str, read_only: bool = False):
+        self.db_path = db_path
+        if read_only:
+            uri = f"{Path(db_path).resolve().as_uri()}?mode=ro"
+            self.conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        else:
+            self.conn = sqlite3.connect(db_path, check_same_thread=False)
         self.conn.row_factory = sqlite3.Row
-        self._init_schema()
-        logger.info("Initialized database schema")
+        self._in_atomic = False
+        # Commits made through this repository, for data_version
+        self._commits = 0
+        if not read_only:
+            self._init_schema()
+            logger.info("Initialized database schema")
+
+    def _commit(self) -> None:
+        if not self._in_atomic:
+            self.conn.commit()
+            self._commits += 1
+
+    def data_version(self) -> tuple[int, int]:
+        """
+        A value that changes whenever the transactions may have changed: after
+        every write committed through this repository, and, through SQLite's
+        PRAGMA data_version, after other connections commit to the database.
+        Views compare it with the version they last rendered to skip refreshes.
+        """
+        external = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        return self._commits, external
+
+    @contextmanager
+    def atomic(self) -> Iterator[None]:
+        """
+        Groups the writes made inside the block into one transaction. Nothing
+        is committed until the block ends, and an exception raised inside it
+        rolls every write back before propagating.
+
+        The transaction belongs to the connection, so writes made through this
+        repository from other threads join it too. Work that runs in the
+        background inside atomic() should use a repository of its own.
+        """
+        if self._in_atomic:
+            yield
+            return
+        self._in_atomic = True
+        try:
+            yield
+        except BaseException:
+            self.conn.rollback()
+            raise
+        else:
+            self.conn.commit()
+            self._commits += 1
+        finally:
+            self._in_atomic = False
 
     def _init_schema(self) -> None:
         self.conn.executescript("""
@@ -28,6 +85,9 @@ class TransactionRepository:
             category TEXT NOT NULL DEFAULT 'Uncategorized',
             description TEXT
         );
+        -- Serves the date-ordered pages of the transaction list.
+        CREATE INDEX IF NOT EXISTS idx_transactions_date_id
+            ON transactions(date, id);
         """)
 
     def _row_to_transaction(self, row: sqlite3.Row | None) -> Transaction | None:
@@ -54,21 +114,108 @@ class TransactionRepository:
                 transaction.description,
             ),
         )
-        self.conn.commit()
+        self._commit()
         return replace(transaction, id=cursor.lastrowid)
 
+    def add_transactions(self, transactions: list[Transaction]) -> int:
+        """
+        Inserts several transactions in a single commit.
+        Returns the number of inserted rows.
+        """
+        if not transactions:
+            return 0
+        self.conn.executemany(
+            """
+            INSERT INTO transactions (date, amount, category, description)
+            VALUES (?, ?, ?, ?)
+            """,
+            [
+                (t.date.isoformat(), t.amount, t.category, t.description)
+                for t in transactions
+            ],
+        )
+        self._commit()
+        return len(transactions)
+
+    def insert_transactions(self, transactions: list[Transaction]) -> list[int]:
+        """
+        Inserts several transactions in a single commit, like add_transactions,
+        and returns their ids in order.
+        """
+        ids = [
+            self.conn.execute(
+                """
+                INSERT INTO transactions (date, amount, category, description)
+                VALUES (?, ?, ?, ?)
+                """,
+                (t.date.isoformat(), t.amount, t.category, t.description),
+            ).lastrowid
+            for t in transactions
+        ]
+        if ids:
+            self._commit()
+        return ids
+
+    def get_transaction_fingerprints(
+        self, start_date: date, end_date: date
+    ) -> Counter[tuple[str, float, str]]:
+        """
+        Counts existing transactions per (date, amount, description) between
+        start_date and end_date inclusive. Used to skip already-imported rows.
+        """
+        rows = self.conn.execute(
+            """
+            SELECT date, amount, description, COUNT(*) as count
+            FROM transactions
+            WHERE date >= ? AND date <= ?
+            GROUP BY date, amount, description
+            """,
+            (start_date.isoformat(), end_date.isoformat()),
+        )
+        return Counter(
+            {
+                (row["date"], row["amount"], row["description"] or ""): row["count"]
+                for row in rows.fetchall()
+            }
+        )
+
     def get_transaction(self, transaction_id: int) -> Transaction | None:
         row = self.conn.execute(
             "SELECT * FROM transactions WHERE id = ?", (transaction_id,)
         )
         return self._row_to_transaction(row.fetchone())
 
+    @staticmethod
+    def list_position(transaction: Transaction) -> tuple[date, int]:
+        """The key transactions are listed by, newest first, for `after`."""
+        return transaction.date, transaction.id
+
+    @staticmethod
+    def _after_clause(after: tuple[date, int] | None) -> tuple[str, list]:
+        """
+        A condition for rows listed after the given list_position. It seeks
+        on idx_transactions_date_id, where OFFSET would step over every row
+        before the page.
+        """
+        if after is None:
+            return "1", []
+        return "(date, id) < (?, ?)", [after[0].isoformat(), after[1]]
+
     def get_all_transactions(
-        self, limit: int = 100, offset: int = 0
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        after: tuple[date, int] | None = None,
     ) -> list[Transaction]:
+        """
+        Transactions newest first, skipping `offset` rows. With `after`, a
+        list_position, the page starts after that transaction.
+        """
+        condition, params = self._after_clause(after)
         rows = self.conn.execute(
-            "SELECT * FROM transactions ORDER BY date DESC LIMIT ? OFFSET ?",
-            (limit, offset),
+            f"SELECT * FROM transactions WHERE {condition} "
+            "ORDER BY date DESC, id DESC LIMIT ? OFFSET ?",
+            (*params, limit, offset),
         )
         transactions: list[Transaction] = []
         for row in rows.fetchall():
@@ -94,18 +241,26 @@ class TransactionRepository:
         return row.fetchone()[0]
 
     def search_by_keyword(
-        self, keyword: str | None, limit: int = 100, offset: int = 0
+        self,
+        keyword: str | None,
+        limit: int = 100,
+        offset: int = 0,
+        after: tuple[date, int] | None = None,
     ) -> list[Transaction]:
         """
         Search transactions by keyword in description field (case-insensitive).
-        Returns all transactions if keyword is None or empty.
+        Returns all transactions if keyword is None or empty. Pages like
+        get_all_transactions.
         """
         if not keyword:
-            return self.get_all_transactions(limit, offset)
+            return self.get_all_transactions(limit, offset, after)
 
+        condition, params = self._after_clause(after)
         rows = self.conn.execute(
-            "SELECT * FROM transactions WHERE description LIKE ? COLLATE NOCASE ORDER BY date DESC LIMIT ? OFFSET ?",
-            (f"%{keyword}%", limit, offset),
+            f"SELECT * FROM transactions WHERE {condition} "
+            "AND description LIKE ? COLLATE NOCASE "
+            "ORDER BY date DESC, id DESC LIMIT ? OFFSET ?",
+            (*params, f"%{keyword}%", limit, offset),
         )
         transactions: list[Transaction] = []
         for row in rows.fetchall():
@@ -142,7 +297,7 @@ class TransactionRepository:
 
     def delete_transaction(self, transaction_id: int) -> None:
         self.conn.execute("DELETE FROM transactions WHERE id = ?", (transaction_id,))
-        self.conn.commit()
+        self._commit()
 
     def delete_multiple_transactions(self, transaction_ids: list[int]) -> int:
         if not transaction_ids:
@@ -151,7 +306,7 @@ class TransactionRepository:
         placeholders = ", ".join("?" for _ in transaction_ids)
         query = f"DELETE FROM transactions WHERE id IN ({placeholders})"
         cursor = self.conn.execute(query, transaction_ids)
-        self.conn.commit()
+        self._commit()
         return cursor.rowcount
 
     def update_transaction(self, transaction_id: int, data: dict) -> None:
@@ -168,7 +323,20 @@ class TransactionRepository:
         values.append(transaction_id)
         query = f"UPDATE transactions SET {updates} WHERE id = ?"
         self.conn.execute(query, values)
-        self.conn.commit()
+        self._commit()
+
+    def update_categories(self, updates: list[tuple[int, str]]) -> None:
+        """
+        Sets the category of several transactions in a single commit.
+        Each update is a (transaction_id, category) tuple.
+        """
+        if not updates:
+            return
+        self.conn.executemany(
+            "UPDATE transactions SET category = ? WHERE id = ?",
+            [(category, transaction_id) for transaction_id, category in updates],
+        )
+        self._commit()
 
     def get_daily_spending_range(self, start_date: date, end_date: date) -> dict[int, float]:
         """
@@ -0,0 +1,95 @@
+import logging
+import queue
+import threading
+import tkinter as tk
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundTask:
+    """
+    Runs a function on a worker thread and delivers its progress and result
+    back on the Tk thread.
+
+    The target is called with the task itself so it can report progress with
+    `report()` and check `cancelled` between units of work. Tk is never touched
+    from the worker: messages go through a queue that is polled with `after()`.
+    """
+
+    def __init__(
+        self,
+        widget: tk.Misc,
+        target: Callable[["BackgroundTask"], Any],
+        on_progress: Callable[..., None] | None = None,
+        on_done: Callable[[Any], None] | None = None,
+        on_error: Callable[[BaseException], None] | None = None,
+        poll_ms: int = 50,
+    ):
+        self._widget = widget
+        # Poll from the root window so pending callbacks outlive the owner.
+        self._root = widget.nametowidget(".")
+        self._target = target
+        self._on_progress = on_progress
+        self._on_done = on_done
+        self._on_error = on_error
+        self._poll_ms = poll_ms
+        self._messages: queue.Queue = queue.Queue()
+        self._cancel_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "BackgroundTask":
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._root.after(self._poll_ms, self._poll)
+        return self
+
+    def cancel(self) -> None:
+        """Asks the target to stop; it decides when it is safe to do so."""
+        self._cancel_event.set()
+
+    def report(self, *args) -> None:
+        """Queues a progress update. Safe to call from the worker thread."""
+        self._messages.put(("progress", args))
+
+    def _run(self) -> None:
+        try:
+            result = self._target(self)
+        except BaseException as e:
+            logger.exception("Background task failed")
+            self._messages.put(("error", e))
+        else:
+            self._messages.put(("done", result))
+
+    def _poll(self) -> None:
+        if not self._widget.winfo_exists():
+            # The owner went away; let the worker wind down on its own.
+            self.cancel()
+            return
+
+        while True:
+            try:
+                kind, payload = self._messages.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                if self._on_progress is not None:
+                    self._on_progress(*payload)
+            elif kind == "done":
+                if self._on_done is not None:
+                    self._on_done(payload)
+                return
+            else:
+                if self._on_error is not None:
+                    self._on_error(payload)
+                return
+
+        self._root.after(self._poll_ms, self._poll)
@@ -1,9 +1,11 @@
 import logging
 import tkinter as tk
 from tkinter import ttk, messagebox
+from typing import Callable
 
 from expense_tracker.core.transaction_repository import TransactionRepository
 from expense_tracker.core.merchant_repository import MerchantCategoryRepository
+from expense_tracker.gui.background import BackgroundTask
 from expense_tracker.services.merchant import MerchantCategoryService
 from expense_tracker.utils.merchant_normalizer import normalize_merchant
 
@@ -17,11 +19,13 @@ class EditExpenseDialog(tk.Toplevel):
         repo: TransactionRepository,
         merchant_repo: MerchantCategoryRepository,
         transaction_id: int,
+        on_complete: Callable[[], None] | None = None,
     ):
         super().__init__(master)
         self.repo = repo
         self.merchant_repo = merchant_repo
         self.transaction_id = transaction_id
+        self.on_complete = on_complete
         self.merchant_service = MerchantCategoryService(
             merchant_repo, repo, normalize_merchant
         )
@@ -36,12 +40,17 @@ class EditExpenseDialog(tk.Toplevel):
         self.progress_frame.pack(fill="x", padx=10, pady=5)
         self.progress_label = ttk.Label(self.progress_frame, text="")
         self.progress_label.pack(side="left", padx=5)
-        self.progress_bar = ttk.Progressbar(self.progress_frame, mode="indeterminate")
+        self.progress_bar = ttk.Progressbar(
+            self.progress_frame, mode="determinate", length=200
+        )
 
         self.prev_data = None
+        self._recategorize_task: BackgroundTask | None = None
 
         self._build_form()
         self._load_transaction_data()
+        # Closing mid-sweep cancels it, so on_complete still runs.
+        self.protocol("WM_DELETE_WINDOW", self._on_cancel)
 
     def _build_form(self):
         frame = ttk.Frame(self)
@@ -65,12 +74,12 @@ class EditExpenseDialog(tk.Toplevel):
         # Buttons
         button_frame = ttk.Frame(frame)
         button_frame.grid(row=6, column=0, pady=10, sticky="e")
-        ttk.Button(button_frame, text="Save", command=self._on_save).pack(
-            side="right", padx=5
-        )
-        ttk.Button(button_frame, text="Cancel", command=self._on_cancel).pack(
-            side="right"
+        self.save_button = ttk.Button(button_frame, text="Save", command=self._on_save)
+        self.save_button.pack(side="right", padx=5)
+        self.cancel_button = ttk.Button(
+            button_frame, text="Cancel", command=self._on_cancel
         )
+        self.cancel_button.pack(side="right")
 
         # Keyboard bindings
         self.bind("<Escape>", lambda e: self._on_cancel())
@@ -115,20 +124,10 @@ class EditExpenseDialog(tk.Toplevel):
                 self.prev_data is not None
                 and self.prev_data.category != data["category"]
             ):
-                try:
-                    self.merchant_service.update_category(
-                        self.prev_data.description, data["category"]
-                    )
-                    self.merchant_service.update_uncategorized_transactions()
-                    messagebox.showinfo(
-                        "Success",
-                        f"Transaction {self.transaction_id} updated and related transactions recategorized.",
-                    )
-                except Exception as e:
-                    messagebox.showerror(
-                        "Error", f"Failed to update related transactions: {e}"
-                    )
-                self.destroy()
+                self.merchant_service.update_category(
+                    self.prev_data.description, data["category"]
+                )
+                self._start_recategorization()
             else:
                 # No category change, just close the dialog
                 self.result = self.transaction_id
@@ -141,6 +140,75 @@ class EditExpenseDialog(tk.Toplevel):
             messagebox.showerror("Error", f"Failed to update transaction: {e}")
             return
 
+    def _start_recategorization(self):
+        """Recategorize related transactions on a worker thread."""
+        self.save_button.config(state=tk.DISABLED)
+        self.progress_label.config(text="Recategorizing related transactions...")
+        self.progress_bar.config(value=0, maximum=1)
+        self.progress_bar.pack(side="left", fill="x", expand=True, padx=5)
+
+        db_path, merchant_db_path = self.repo.db_path, self.merchant_repo.db_path
+
+        def recategorize(task: BackgroundTask) -> int:
+            # Repositories of its own, so the sweep's writes never leave a
+            # transaction open on the connections the window keeps using.
+            repo = TransactionRepository(db_path)
+            merchant_repo = MerchantCategoryRepository(merchant_db_path)
+            try:
+                service = MerchantCategoryService(
+                    merchant_repo, repo, normalize_merchant
+                )
+                return service.update_uncategorized_transactions(
+                    on_progress=task.report,
+                    should_cancel=lambda: task.cancelled,
+                )
+            finally:
+                repo.conn.close()
+                merchant_repo.conn.close()
+
+        self._recategorize_task = BackgroundTask(
+            self,
+            recategorize,
+            on_progress=self._on_recategorize_progress,
+            on_done=self._on_recategorize_done,
+            on_error=self._on_recategorize_error,
+        ).start()
+
+    def _on_recategorize_progress(self, processed: int, total: int):
+        self.progress_bar.config(value=processed, maximum=max(total, 1))
+        self.progress_label.config(text=f"Recategorizing {processed} of {total}...")
+
+    def _on_recategorize_done(self, updated: int):
+        if self._recategorize_task is not None and self._recategorize_task.cancelled:
+            message = (
+                f"Transaction {self.transaction_id} updated. Recategorization was "
+                f"cancelled after {updated} related transaction(s)."
+            )
+        else:
+            message = (
+                f"Transaction {self.transaction_id} updated and {updated} related "
+                "transaction(s) recategorized."
+            )
+        self._finish_recategorization()
+        messagebox.showinfo("Success", message)
+
+    def _on_recategorize_error(self, error: BaseException):
+        self._finish_recategorization()
+        messagebox.showerror("Error", f"Failed to update related transactions: {error}")
+
+    def _finish_recategorization(self):
+        self._recategorize_task = None
+        self.result = self.transaction_id
+        if self.on_complete is not None:
+            self.on_complete()
+        self.destroy()
+
     def _on_cancel(self):
+        if self._recategorize_task is not None:
+            # Stop after the current chunk; the done handler closes the dialog.
+            self._recategorize_task.cancel()
+            self.cancel_button.config(state=tk.DISABLED)
+            self.progress_label.config(text="Cancelling...")
+            return
         self.result = None
         self.destroy()
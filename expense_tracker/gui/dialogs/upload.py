@@ -1,14 +1,18 @@
 import tkinter as tk
+from pathlib import Path
 from tkinter import ttk, messagebox
-from datetime import datetime, date
+from typing import TYPE_CHECKING
 
-from expense_tracker.core.models import Transaction
 from expense_tracker.core.transaction_repository import TransactionRepository
 from expense_tracker.core.merchant_repository import MerchantCategoryRepository
-from expense_tracker.utils.extract import parse_bofa_statement_pdf
+from expense_tracker.gui.background import BackgroundTask
 from expense_tracker.services.merchant import MerchantCategoryService
+from expense_tracker.services.pipeline import ImportCancelled
 from expense_tracker.utils.merchant_normalizer import normalize_merchant
 
+if TYPE_CHECKING:
+    from expense_tracker.services.importer import ImportProgress, ImportReport
+
 
 class UploadDialog(tk.Toplevel):
     def __init__(
@@ -22,78 +26,195 @@ class UploadDialog(tk.Toplevel):
         self.merchant_repo = merchant_repo
         self.title("Upload Bank Statement")
         self.resizable(False, False)
-        self.merchant_service = MerchantCategoryService(
-            merchant_repo, repo, normalize_merchant
-        )
 
         self.file_var = tk.StringVar()
+        self._selected_paths: list[str] = []
+        self._import_task: BackgroundTask | None = None
+        self.status_var = tk.StringVar()
+        self.rate_var = tk.StringVar()
 
         self._build_form()
+        self.protocol("WM_DELETE_WINDOW", self._on_cancel)
 
     def _build_form(self):
         frame = ttk.Frame(self)
         frame.pack(fill="both", padx=10, pady=10)
 
         # File selection
-        ttk.Label(frame, text="Select PDF File:").grid(row=0, column=0, sticky="w")
+        ttk.Label(frame, text="Select Statement Files or a Folder:").grid(
+            row=0, column=0, sticky="w"
+        )
         file_entry = ttk.Entry(frame, textvariable=self.file_var, width=40)
         file_entry.grid(row=1, column=0, sticky="w")
-        ttk.Button(frame, text="Browse", command=self._browse_file).grid(
+        ttk.Button(frame, text="Browse Files", command=self._browse_file).grid(
             row=1, column=1, padx=5
         )
+        ttk.Button(frame, text="Browse Folder", command=self._browse_folder).grid(
+            row=1, column=2, padx=5
+        )
+
+        # Progress, shown once an import starts
+        self.progress_frame = ttk.Frame(frame)
+        self.progress_frame.grid(row=2, column=0, columnspan=3, sticky="ew", pady=5)
+        self.progress_frame.grid_remove()
+        self.progress_bar = ttk.Progressbar(
+            self.progress_frame, mode="determinate", maximum=1.0
+        )
+        self.progress_bar.pack(fill="x")
+        ttk.Label(self.progress_frame, textvariable=self.status_var).pack(anchor="w")
+        ttk.Label(self.progress_frame, textvariable=self.rate_var).pack(anchor="w")
 
         # Buttons
         button_frame = ttk.Frame(frame)
-        button_frame.grid(row=2, column=0, columnspan=2, pady=10, sticky="e")
-        ttk.Button(button_frame, text="Upload", command=self._on_upload).pack(
-            side=tk.LEFT, padx=5
+        button_frame.grid(row=3, column=0, columnspan=3, pady=10, sticky="e")
+        self.upload_button = ttk.Button(
+            button_frame, text="Upload", command=self._on_upload
         )
-        ttk.Button(button_frame, text="Cancel", command=self._on_cancel).pack(
-            side=tk.LEFT, padx=5
+        self.upload_button.pack(side=tk.LEFT, padx=5)
+        self.cancel_button = ttk.Button(
+            button_frame, text="Cancel", command=self._on_cancel
         )
+        self.cancel_button.pack(side=tk.LEFT, padx=5)
 
     def _browse_file(self):
         from tkinter import filedialog
 
-        file_path = filedialog.askopenfilename(filetypes=[("PDF files", "*.pdf")])
-        if file_path:
-            self.file_var.set(file_path)
+        file_paths = filedialog.askopenfilenames(
+            filetypes=[
+                ("Statements", "*.pdf *.csv *.ofx *.qfx"),
+                ("PDF files", "*.pdf"),
+                ("CSV files", "*.csv"),
+                ("OFX/QFX files", "*.ofx *.qfx"),
+            ]
+        )
+        if file_paths:
+            self._set_selection(list(file_paths))
+
+    def _browse_folder(self):
+        from tkinter import filedialog
+
+        folder = filedialog.askdirectory()
+        if folder:
+            self._set_selection([folder])
+
+    def _set_selection(self, paths: list[str]):
+        self._selected_paths = paths
+        if len(paths) == 1:
+            self.file_var.set(paths[0])
+        else:
+            self.file_var.set(f"{len(paths)} files selected")
+
+    def _get_selection(self) -> list[str]:
+        # A path typed into the entry replaces whatever was browsed
+        typed = self.file_var.get().strip()
+        if self._selected_paths and typed in (
+            self._selected_paths[0],
+            f"{len(self._selected_paths)} files selected",
+        ):
+            return self._selected_paths
+        return [typed] if typed else []
 
     def _on_upload(self):
-        file_path = self.file_var.get()
-        if not file_path:
-            messagebox.showerror("Error", "Please select a PDF file to upload.")
+        paths = self._get_selection()
+        if not paths:
+            messagebox.showerror("Error", "Please select a statement file to upload.")
             return
 
-        try:
-            transactions = parse_bofa_statement_pdf(file_path)
-            for t in transactions:
-                transaction = Transaction(
-                    id=None,
-                    date=self._parse_date(t["date"]),
-                    amount=t["amount"],
-                    category="Uncategorized",
-                    description=t["description"],
-                )
-                transaction.category = self.merchant_service.categorize_merchant(
-                    transaction.description, transaction.amount
-                )
-                self.repo.add_transaction(transaction)
-            messagebox.showinfo("Success", "Bank statement uploaded successfully.")
+        # Imported on first use: the statement parsers load pdfplumber.
+        from expense_tracker.services.importer import StatementImportService
+        from expense_tracker.utils.parse_cache import ParseCache
+
+        db_path, merchant_db_path = self.repo.db_path, self.merchant_repo.db_path
+
+        def run_import(task: BackgroundTask) -> "ImportReport":
+            # Connections of its own, so writes made from the window while
+            # the import runs stay out of its transaction, and its writes
+            # stay off the connections the window uses.
+            import_repo = TransactionRepository(db_path)
+            merchant_repo = MerchantCategoryRepository(merchant_db_path)
+            import_service = StatementImportService(
+                import_repo,
+                MerchantCategoryService(merchant_repo, import_repo, normalize_merchant),
+                parse_cache=ParseCache.default(),
+            )
+            try:
+                # A cancelled import rolls back every row. Files that fail
+                # leave no rows of their own, and the others are kept.
+                with import_repo.atomic():
+                    return import_service.import_files(
+                        paths,
+                        on_progress=task.report,
+                        should_cancel=lambda: task.cancelled,
+                    )
+            finally:
+                import_repo.conn.close()
+                merchant_repo.conn.close()
+
+        self.upload_button.config(state="disabled")
+        self.status_var.set("Counting pages...")
+        self.rate_var.set("")
+        self.progress_bar["value"] = 0
+        self.progress_frame.grid()
+        self._import_task = BackgroundTask(
+            self,
+            run_import,
+            on_progress=self._on_import_progress,
+            on_done=self._on_import_done,
+            on_error=self._on_import_error,
+        ).start()
+
+    def _on_import_progress(self, progress: "ImportProgress"):
+        self.progress_bar["value"] = progress.fraction
+        self.status_var.set(
+            f"Parsed page {progress.pages_parsed} of {progress.pages}, "
+            f"{progress.rows_categorized} rows categorized, "
+            f"{progress.rows_written} written"
+        )
+        self.rate_var.set(f"{progress.rows_per_second:.0f} rows/s")
+
+    def _on_import_done(self, report: "ImportReport"):
+        self._import_task = None
+        self.progress_frame.grid_remove()
+        self.upload_button.config(state="normal")
+        self.cancel_button.config(state="normal")
+        if not report.files:
+            messagebox.showerror("Error", "No statement files found in the selection.")
+            return
+        if all(f.error for f in report.files):
+            failures = "\n".join(
+                f"{Path(f.path).name}: {f.error}" for f in report.files
+            )
+            messagebox.showerror(
+                "Error",
+                f"Failed to upload bank statement; no transactions were imported."
+                f"\n{failures}",
+            )
+            return
+        if any(f.error for f in report.files):
+            messagebox.showwarning("Import Finished With Errors", report.summary())
+        else:
+            messagebox.showinfo("Import Complete", report.summary())
+        self.destroy()
+
+    def _on_import_error(self, error: BaseException):
+        self._import_task = None
+        if isinstance(error, ImportCancelled):
+            messagebox.showinfo(
+                "Import Cancelled", "Import cancelled; no transactions were imported."
+            )
             self.destroy()
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to upload bank statement: {e}")
+            return
+        self.progress_frame.grid_remove()
+        self.upload_button.config(state="normal")
+        self.cancel_button.config(state="normal")
+        messagebox.showerror("Error", f"Failed to upload bank statement: {error}")
 
     def _on_cancel(self):
+        if self._import_task is not None:
+            # The dialog closes once the import has rolled back.
+            self._import_task.cancel()
+            self.status_var.set("Cancelling...")
+            self.cancel_button.config(state="disabled")
+            return
         self.file_var.set("")
         self.destroy()
-
-    def _parse_date(self, raw_date) -> date:
-        if isinstance(raw_date, date):
-            return raw_date
-        for fmt in ("%Y-%m-%d", "%m/%d/%Y", "%m/%d/%y"):
-            try:
-                return datetime.strptime(raw_date, fmt).date()
-            except (ValueError, TypeError):
-                continue
-        raise ValueError(f"Unsupported date format: {raw_date}")
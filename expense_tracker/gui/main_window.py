@@ -3,16 +3,41 @@ from datetime import date
 from tkinter import ttk
 
 from expense_tracker.gui.tabs import TransactionsTab, HeatmapTab, StatisticsTab
+from expense_tracker.core.transaction_repository import TransactionRepository
+from expense_tracker.services.statistics import MonthDataCache, StatisticsService
+from expense_tracker.utils.startup import StartupTimer
 
 
 class MainWindow(tk.Frame):
-    def __init__(self, master, transaction_repo, merchant_repo, statistics_service):
+    """
+    The tabbed main window. Only the Transactions tab is built up front, and
+    its rows are loaded once the window has been drawn; the other tabs are
+    built the first time they are selected.
+    """
+
+    def __init__(
+        self,
+        master,
+        transaction_repo,
+        merchant_repo,
+        statistics_service,
+        startup: StartupTimer | None = None,
+    ):
         super().__init__(master)
         self.transaction_repo = transaction_repo
         self.merchant_repo = merchant_repo
         self.statistics_service = statistics_service
         self.master = master
         self._active_dialog: tk.Toplevel | None = None
+        # Month data shared by the Statistics and Heatmap tabs, loaded on a
+        # worker thread through a read-only connection of its own
+        self.month_data = MonthDataCache(
+            statistics_service,
+            reader=StatisticsService(
+                TransactionRepository(transaction_repo.db_path, read_only=True)
+            ),
+        )
+        self.startup = startup or StartupTimer()
 
         self.pack(fill=tk.BOTH, expand=True)
 
@@ -25,20 +50,33 @@ class MainWindow(tk.Frame):
             self.notebook, transaction_repo, merchant_repo, self
         )
 
-        # Create Statistics tab
-        self.statistics_tab = StatisticsTab(self.notebook, statistics_service)
-
-        # Create Heatmap tab
-        self.heatmap_tab = HeatmapTab(self.notebook, statistics_service, self)
+        # The Statistics and Heatmap tabs are built into these on first use
+        self.statistics_tab: StatisticsTab | None = None
+        self.heatmap_tab: HeatmapTab | None = None
+        self._statistics_frame = tk.Frame(self.notebook)
+        self._heatmap_frame = tk.Frame(self.notebook)
 
         # Add tabs to notebook
         self.notebook.add(self.transactions_tab, text="Transactions")
-        self.notebook.add(self.statistics_tab, text="Statistics")
-        self.notebook.add(self.heatmap_tab, text="Heatmap")
+        self.notebook.add(self._statistics_frame, text="Statistics")
+        self.notebook.add(self._heatmap_frame, text="Heatmap")
 
         # Bind tab change event for lazy loading
         self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
 
+        # Idle callbacks run once the window's pending drawing is done
+        self.after_idle(self._on_window_shown)
+
+    def _on_window_shown(self):
+        """Load the first rows once the empty window is on screen."""
+        self.update_idletasks()
+        self.startup.mark("first paint")
+        self.transactions_tab.refresh()
+        self.update_idletasks()
+        self.startup.mark("interactive")
+        self.startup.report()
+        self.event_generate("<<StartupComplete>>", when="tail")
+
     def _open_dialog(self, dialog_class, *args, **kwargs):
         if self._active_dialog is not None and self._active_dialog.winfo_exists():
             self._active_dialog.lift()
@@ -54,24 +92,52 @@ class MainWindow(tk.Frame):
             if dialog.winfo_exists():
                 dialog.destroy()
             self._active_dialog = None
-            self.transactions_tab.refresh()
+            self.data_changed()
 
-        dialog.protocol("WM_DELETE_WINDOW", on_close)
+        # Dialogs with work in progress close through their own handler.
+        if not dialog.protocol("WM_DELETE_WINDOW"):
+            dialog.protocol("WM_DELETE_WINDOW", on_close)
         dialog.transient(self.master)
         dialog.grab_set()
 
         self.master.wait_window(dialog)
 
         self._active_dialog = None
-        self.transactions_tab.refresh()
+        self.data_changed()
 
     def _on_tab_changed(self, event):
-        """Refresh tab content when user switches tabs."""
+        """Build the selected tab on first use and refresh its content."""
         current_tab = self.notebook.select()
         tab_index = self.notebook.index(current_tab)
         if tab_index == 1:  # Statistics tab
+            if self.statistics_tab is None:
+                self.statistics_tab = StatisticsTab(
+                    self._statistics_frame, self.statistics_service, self.month_data
+                )
+                self.statistics_tab.pack(fill=tk.BOTH, expand=True)
             self.statistics_tab.refresh()
         elif tab_index == 2:  # Heatmap tab
+            if self.heatmap_tab is None:
+                self.heatmap_tab = HeatmapTab(
+                    self._heatmap_frame, self.statistics_service, self, self.month_data
+                )
+            self.heatmap_tab.refresh()
+
+    def data_changed(self):
+        """
+        Refresh the transaction list after something may have been written.
+        It re-queries only if the data version changed; cached month data is
+        dropped by the same check.
+        """
+        self.transactions_tab.refresh()
+
+    def refresh_all_tabs(self):
+        """Refresh every tab after data changed outside the active view."""
+        self.data_changed()
+        # Tabs not built yet load fresh data when first selected
+        if self.statistics_tab is not None:
+            self.statistics_tab.refresh()
+        if self.heatmap_tab is not None:
             self.heatmap_tab.refresh()
 
     def show_transactions_for_date(self, target_date: date):
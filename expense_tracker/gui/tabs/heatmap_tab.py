@@ -3,29 +3,53 @@ import tkinter as tk
 from datetime import date
 from tkinter import ttk
 
-from expense_tracker.services.statistics import StatisticsService
+from expense_tracker.services.statistics import (
+    HEATMAP,
+    MonthDataCache,
+    StatisticsService,
+)
+
+# Calendar geometry, in canvas pixels
+CELL_WIDTH = 90
+CELL_HEIGHT = 70
+CELL_GAP = 4
+HEADER_HEIGHT = 29
+WEEKS = 6
+DAY_NAMES = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
 
 
 class HeatmapTab(tk.Frame):
-    def __init__(self, master, statistics_service: StatisticsService, main_window):
+    def __init__(
+        self,
+        master,
+        statistics_service: StatisticsService,
+        main_window,
+        month_data: MonthDataCache | None = None,
+    ):
         super().__init__(master)
         self.statistics_service = statistics_service
         self.main_window = main_window
+        self.month_data = month_data or MonthDataCache(statistics_service)
 
         # State
         self._months_with_expenses: list[tuple[int, int]] = []
         self._current_index = 0
         self._spending_data: dict[int, float] = {}
 
-        # Tooltip
-        self._tooltip: tk.Toplevel | None = None
+        # The day shown in each of the WEEKS * 7 cells, None for blank cells
+        self._cell_days: list[int | None] = []
+        # Last options set on each canvas item, so unchanged ones are skipped
+        self._item_options: dict[int, dict] = {}
+        self._hover_day: int | None = None
+        # Data version of the transactions the calendar was drawn from
+        self._rendered_version: tuple[int, int] | None = None
 
         self.pack(fill=tk.BOTH, expand=True)
 
         # Build UI
         self._build_header()
-        self._calendar_container = tk.Frame(self)
-        self._calendar_container.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self._build_calendar_canvas()
+        self._build_tooltip()
 
     def _build_header(self):
         """Build header with month navigation controls."""
@@ -77,17 +101,22 @@ class HeatmapTab(tk.Frame):
         if self._current_index < len(self._months_with_expenses) - 1:
             self._current_index += 1
             self._update_header_label()
-            self._build_calendar_grid()
+            self._draw_month()
 
     def _next_month(self):
         """Navigate to next month with expenses."""
         if self._current_index > 0:
             self._current_index -= 1
             self._update_header_label()
-            self._build_calendar_grid()
+            self._draw_month()
 
     def refresh(self):
-        """Fetch data and rebuild calendar grid."""
+        """Fetch data and redraw the calendar, unless no transaction changed."""
+        version = self.statistics_service.data_version()
+        if version == self._rendered_version:
+            return
+        self._rendered_version = version
+
         # Get all months with expenses
         self._months_with_expenses = self.statistics_service.get_available_months(expenses_only=True)
 
@@ -97,150 +126,151 @@ class HeatmapTab(tk.Frame):
         # Update header
         self._update_header_label()
 
-        # Build calendar
-        self._build_calendar_grid()
+        # Draw calendar
+        self._draw_month()
 
-    def _build_calendar_grid(self):
-        """Build the calendar grid with spending data."""
-        # Clear existing calendar
-        for widget in self._calendar_container.winfo_children():
-            widget.destroy()
+    def _build_calendar_canvas(self):
+        """
+        Create the calendar on one canvas. Its items are created here once;
+        switching months only recolors and relabels them.
+        """
+        self.canvas = tk.Canvas(
+            self,
+            width=7 * (CELL_WIDTH + CELL_GAP),
+            height=HEADER_HEIGHT + WEEKS * (CELL_HEIGHT + CELL_GAP),
+            highlightthickness=0,
+        )
+        self.canvas.pack(expand=True, padx=10, pady=10)
 
-        if not self._months_with_expenses:
-            # Show message if no transactions
-            message = tk.Label(
-                self._calendar_container,
-                text="No expenses found",
-                font=("Arial", 16),
-                fg="gray",
+        for col, day_name in enumerate(DAY_NAMES):
+            self.canvas.create_text(
+                col * (CELL_WIDTH + CELL_GAP) + CELL_WIDTH / 2 + CELL_GAP / 2,
+                HEADER_HEIGHT / 2,
+                text=day_name,
+                font=("Arial", 15, "bold"),
             )
-            message.pack(pady=50)
+
+        # One background, day number and amount per cell
+        self._cells: list[tuple[int, int, int]] = []
+        for index in range(WEEKS * 7):
+            x0, y0, x1, y1 = self._cell_bounds(index)
+            center = (x0 + x1) / 2
+            self._cells.append(
+                (
+                    self.canvas.create_rectangle(x0, y0, x1, y1),
+                    self.canvas.create_text(
+                        center, y0 + 20, font=("Arial", 14, "bold")
+                    ),
+                    self.canvas.create_text(center, y0 + 50, font=("Arial", 12)),
+                )
+            )
+
+        self._empty_message = self.canvas.create_text(
+            self.canvas.winfo_reqwidth() / 2,
+            HEADER_HEIGHT + 50,
+            text="No expenses found",
+            font=("Arial", 16),
+            fill="gray",
+            state=tk.HIDDEN,
+        )
+
+        self.canvas.bind("<Button-1>", self._on_canvas_click)
+        self.canvas.bind("<Motion>", self._on_canvas_motion)
+        self.canvas.bind("<Leave>", lambda _e: self._set_hover(None, None))
+
+    @staticmethod
+    def _cell_bounds(index: int) -> tuple[float, float, float, float]:
+        week, weekday = divmod(index, 7)
+        x0 = weekday * (CELL_WIDTH + CELL_GAP) + CELL_GAP / 2
+        y0 = HEADER_HEIGHT + week * (CELL_HEIGHT + CELL_GAP) + CELL_GAP / 2
+        return x0, y0, x0 + CELL_WIDTH, y0 + CELL_HEIGHT
+
+    def _configure(self, item: int, **options):
+        """Apply canvas item options, skipping the ones already set."""
+        last = self._item_options.setdefault(item, {})
+        changed = {k: v for k, v in options.items() if last.get(k) != v}
+        if changed:
+            self.canvas.itemconfigure(item, **changed)
+            last.update(changed)
+
+    def _draw_month(self):
+        """Recolor and relabel the calendar cells for the current month."""
+        self._set_hover(None, None)
+        if not self._months_with_expenses:
+            self._cell_days = []
+            for cell in self._cells:
+                for item in cell:
+                    self._configure(item, state=tk.HIDDEN)
+            self._configure(self._empty_message, state=tk.NORMAL)
             return
+        self._configure(self._empty_message, state=tk.HIDDEN)
 
         # Get current month
         year, month = self._months_with_expenses[self._current_index]
 
-        # Fetch spending data for current month
-        self._spending_data = self.statistics_service.get_spending_heatmap_data(
-            year, month
-        )
+        # Spending for the current month, then its neighbours in the background
+        self._spending_data = self.month_data.heatmap(year, month)
+        neighbours = self._months_with_expenses[
+            max(self._current_index - 1, 0) : self._current_index + 2
+        ]
+        self.month_data.prefetch(HEATMAP, neighbours)
 
-        # Create grid frame
-        grid_frame = tk.Frame(self._calendar_container)
-        grid_frame.pack(expand=True)
-
-        # Day of week headers
-        day_names = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
-        for col, day_name in enumerate(day_names):
-            # Use Canvas for headers to match cell width exactly
-            header_canvas = tk.Canvas(
-                grid_frame,
-                width=90,
-                height=25,
-                highlightthickness=0,
-            )
-            header_canvas.grid(row=0, column=col, padx=2, pady=2)
-            header_canvas.create_text(
-                45, 12,
-                text=day_name,
-                font=("Arial", 15, "bold"),
-            )
-
-        # Get calendar information
         first_weekday, num_days = calendar.monthrange(year, month)
-
-        # Calculate color thresholds
-        spending_values = [v for v in self._spending_data.values() if v > 0]
-        if spending_values:
-            spending_values.sort()
-            p25_idx = len(spending_values) // 4
-            p75_idx = (3 * len(spending_values)) // 4
-            p25 = spending_values[p25_idx] if p25_idx < len(spending_values) else 0
-            p75 = spending_values[p75_idx] if p75_idx < len(spending_values) else 0
-        else:
-            p25 = p75 = 0
-
-        # Build calendar grid
-        current_day = 1
-        for week in range(6):  # Max 6 weeks
-            if current_day > num_days:
-                break
-
-            for weekday in range(7):
-                row = week + 1  # +1 for header row
-
-                # Check if we should place a day here
-                if week == 0 and weekday < first_weekday:
-                    # Empty cell before first day of month
-                    empty_canvas = tk.Canvas(
-                        grid_frame,
-                        width=90,
-                        height=70,
-                        highlightthickness=1,
-                        highlightbackground="#CCCCCC",
-                    )
-                    empty_canvas.grid(row=row, column=weekday, padx=0, pady=2)
-                    # Draw gray background for empty cells
-                    empty_canvas.create_rectangle(
-                        0, 0, 90, 70,
-                        outline="",
-                    )
-                elif current_day <= num_days:
-                    # Create day cell using Canvas for reliable color rendering
-                    spending = self._spending_data.get(current_day, 0.0)
-                    color = self._get_color_for_spending(spending, p25, p75)
-
-                    # Determine text color for readability
-                    text_color = "white" if color == "#CC0000" else "black"
-
-                    # Create canvas with explicit background rectangle
-                    cell_canvas = tk.Canvas(
-                        grid_frame,
-                        width=90,
-                        height=70,
-                        highlightthickness=1,
-                        highlightbackground="#999999",
-                    )
-                    cell_canvas.grid(row=row, column=weekday, padx=0, pady=2)
-
-                    # Draw colored rectangle as background (this bypasses theme)
-                    cell_canvas.create_rectangle(
-                        0, 0, 90, 70,
-                        fill=color,
-                        outline="",
-                    )
-
-                    # Draw text on top of the colored background
-                    cell_canvas.create_text(
-                        45, 20,
-                        text=str(current_day),
-                        fill=text_color,
-                        font=("Arial", 14, "bold"),
-                    )
-                    cell_canvas.create_text(
-                        45, 50,
-                        text=f"${spending:.2f}",
-                        fill=text_color,
-                        font=("Arial", 12),
-                    )
-
-                    # Bind events
-                    day_num = current_day  # Capture in closure
-                    cell_canvas.bind(
-                        "<Button-1>",
-                        lambda _e, y=year, m=month, d=day_num: self._on_day_click(y, m, d),
-                    )
-                    cell_canvas.bind(
-                        "<Enter>",
-                        lambda e, m=month, d=day_num, s=spending: self._show_tooltip(
-                            e, m, d, s
-                        ),
-                    )
-                    cell_canvas.bind("<Leave>", self._hide_tooltip)
-                    # Change cursor on hover
-                    cell_canvas.configure(cursor="hand2")
-
-                    current_day += 1
+        weeks = (first_weekday + num_days + 6) // 7
+        p25, p75 = self._color_thresholds()
+
+        self._cell_days = []
+        for index, (rect, day_text, amount_text) in enumerate(self._cells):
+            day = index - first_weekday + 1
+            if 1 <= day <= num_days:
+                spending = self._spending_data.get(day, 0.0)
+                color = self._get_color_for_spending(spending, p25, p75)
+                # Determine text color for readability
+                text_color = "white" if color == "#CC0000" else "black"
+                self._configure(
+                    rect, fill=color, outline="#999999", state=tk.NORMAL
+                )
+                self._configure(
+                    day_text, text=str(day), fill=text_color, state=tk.NORMAL
+                )
+                self._configure(
+                    amount_text,
+                    text=f"${spending:.2f}",
+                    fill=text_color,
+                    state=tk.NORMAL,
+                )
+                self._cell_days.append(day)
+                continue
+
+            # Blank cells before the first day; nothing after the last week
+            state = tk.NORMAL if index < weeks * 7 and day < 1 else tk.HIDDEN
+            self._configure(rect, fill="", outline="#CCCCCC", state=state)
+            self._configure(day_text, state=tk.HIDDEN)
+            self._configure(amount_text, state=tk.HIDDEN)
+            self._cell_days.append(None)
+
+    def _color_thresholds(self) -> tuple[float, float]:
+        """The 25th and 75th percentile of the month's non-zero spending."""
+        spending_values = sorted(v for v in self._spending_data.values() if v > 0)
+        if not spending_values:
+            return 0, 0
+        p25 = spending_values[len(spending_values) // 4]
+        p75 = spending_values[(3 * len(spending_values)) // 4]
+        return p25, p75
+
+    def _day_at(self, x: int, y: int) -> int | None:
+        """Hit-test canvas coordinates against the day cells."""
+        if y < HEADER_HEIGHT:
+            return None
+        col = int(x // (CELL_WIDTH + CELL_GAP))
+        week = int((y - HEADER_HEIGHT) // (CELL_HEIGHT + CELL_GAP))
+        index = week * 7 + col
+        if not (0 <= col < 7 and 0 <= index < len(self._cell_days)):
+            return None
+        x0, y0, x1, y1 = self._cell_bounds(index)
+        if not (x0 <= x <= x1 and y0 <= y <= y1):
+            return None  # In the gap between cells
+        return self._cell_days[index]
 
     def _get_color_for_spending(self, spending: float, p25: float, p75: float) -> str:
         """
@@ -256,32 +286,50 @@ class HeatmapTab(tk.Frame):
         else:
             return "#CC0000"  # Dark red (high spending)
 
-    def _show_tooltip(self, event, month: int, day: int, amount: float):
-        """Show tooltip with spending details."""
-        self._hide_tooltip(event)  # Hide any existing tooltip
-
-        month_name = calendar.month_name[month]
-
+    def _build_tooltip(self):
+        """Create the tooltip window once; it is shown and hidden as needed."""
         self._tooltip = tk.Toplevel(self)
         self._tooltip.wm_overrideredirect(True)
-        self._tooltip.wm_geometry(f"+{event.x_root + 10}+{event.y_root + 10}")
-
-        label = tk.Label(
+        self._tooltip.withdraw()
+        self._tooltip_label = tk.Label(
             self._tooltip,
-            text=f"{month_name} {day}: ${amount:.2f}",
             background="#FFFFE0",
             relief=tk.SOLID,
             borderwidth=1,
             padx=5,
             pady=3,
         )
-        label.pack()
+        self._tooltip_label.pack()
+
+    def _on_canvas_motion(self, event):
+        self._set_hover(self._day_at(event.x, event.y), event)
+
+    def _set_hover(self, day: int | None, event):
+        """Show the tooltip and hand cursor over a day, hide them elsewhere."""
+        if day == self._hover_day:
+            return
+        self._hover_day = day
+        if day is None:
+            self.canvas.configure(cursor="")
+            self._tooltip.withdraw()
+            return
 
-    def _hide_tooltip(self, event):
-        """Hide the tooltip."""
-        if self._tooltip:
-            self._tooltip.destroy()
-            self._tooltip = None
+        year, month = self._months_with_expenses[self._current_index]
+        amount = self._spending_data.get(day, 0.0)
+        self.canvas.configure(cursor="hand2")
+        self._tooltip_label.config(
+            text=f"{calendar.month_name[month]} {day}: ${amount:.2f}"
+        )
+        self._tooltip.wm_geometry(f"+{event.x_root + 10}+{event.y_root + 10}")
+        self._tooltip.deiconify()
+        self._tooltip.lift()
+
+    def _on_canvas_click(self, event):
+        day = self._day_at(event.x, event.y)
+        if day is not None:
+            year, month = self._months_with_expenses[self._current_index]
+            self._set_hover(None, None)
+            self._on_day_click(year, month, day)
 
     def _on_day_click(self, year: int, month: int, day: int):
         """Handle click on a day cell."""
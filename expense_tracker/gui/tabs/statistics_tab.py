@@ -2,13 +2,23 @@ import calendar
 import tkinter as tk
 from tkinter import ttk
 
-from expense_tracker.services.statistics import StatisticsService
+from expense_tracker.services.statistics import (
+    METRICS,
+    MonthDataCache,
+    StatisticsService,
+)
 
 
 class StatisticsTab(tk.Frame):
-    def __init__(self, master, statistics_service: StatisticsService):
+    def __init__(
+        self,
+        master,
+        statistics_service: StatisticsService,
+        month_data: MonthDataCache | None = None,
+    ):
         super().__init__(master)
         self.statistics_service = statistics_service
+        self.month_data = month_data or MonthDataCache(statistics_service)
 
         # State: the latest month and year where the record is available
         latest_year, latest_month = self.statistics_service.get_latest_available_month()
@@ -17,6 +27,8 @@ class StatisticsTab(tk.Frame):
 
         # Cache all months with data for navigation button state management
         self._months_with_data = self.statistics_service.get_available_months()
+        # Data version of the transactions the metrics were read from
+        self._rendered_version: tuple[int, int] | None = None
 
         self.pack(fill=tk.BOTH, expand=True)
 
@@ -121,21 +133,23 @@ class StatisticsTab(tk.Frame):
         self.month_label.config(text=f"{month_name} {self._current_year}")
         self._update_button_states()
 
+    def _previous_year_month(self) -> tuple[int, int]:
+        if self._current_month == 1:
+            return self._current_year - 1, 12
+        return self._current_year, self._current_month - 1
+
+    def _next_year_month(self) -> tuple[int, int]:
+        if self._current_month == 12:
+            return self._current_year + 1, 1
+        return self._current_year, self._current_month + 1
+
     def _has_previous_month(self) -> bool:
         """Check if there's data in the previous month."""
-        if self._current_month == 1:
-            prev_year, prev_month = self._current_year - 1, 12
-        else:
-            prev_year, prev_month = self._current_year, self._current_month - 1
-        return (prev_year, prev_month) in self._months_with_data
+        return self._previous_year_month() in self._months_with_data
 
     def _has_next_month(self) -> bool:
         """Check if there's data in the next month."""
-        if self._current_month == 12:
-            next_year, next_month = self._current_year + 1, 1
-        else:
-            next_year, next_month = self._current_year, self._current_month + 1
-        return (next_year, next_month) in self._months_with_data
+        return self._next_year_month() in self._months_with_data
 
     def _update_button_states(self):
         """Enable/disable navigation buttons based on data availability."""
@@ -173,9 +187,10 @@ class StatisticsTab(tk.Frame):
 
     def _update_metrics(self):
         """Update metric displays with current month data."""
-        # Get monthly metrics from statistics service
-        metrics = self.statistics_service.get_monthly_metrics(
-            self._current_year, self._current_month
+        # Metrics for the current month, then its neighbours in the background
+        metrics = self.month_data.metrics(self._current_year, self._current_month)
+        self.month_data.prefetch(
+            METRICS, [self._previous_year_month(), self._next_year_month()]
         )
 
         # Format and color code net income
@@ -202,5 +217,12 @@ class StatisticsTab(tk.Frame):
             self.top_category_amount_label.config(text=f"${amount:,.2f}")
 
     def refresh(self):
-        """Refresh statistics when tab becomes active."""
+        """Refresh statistics when tab becomes active, unless nothing changed."""
+        version = self.statistics_service.data_version()
+        if version == self._rendered_version:
+            return
+        if self._rendered_version is not None:
+            self._months_with_data = self.statistics_service.get_available_months()
+            self._update_button_states()
+        self._rendered_version = version
         self._update_metrics()
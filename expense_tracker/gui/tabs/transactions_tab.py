@@ -1,12 +1,18 @@
-import math
 import tkinter as tk
 from datetime import date
 from tkinter import ttk, messagebox
 
+from expense_tracker.core.models import Transaction
 from expense_tracker.core.transaction_repository import TransactionRepository
+from expense_tracker.gui.background import BackgroundTask
 from expense_tracker.gui.dialogs.add_expense import AddExpenseDialog
 from expense_tracker.gui.dialogs.edit_expense import EditExpenseDialog
 from expense_tracker.gui.dialogs.upload import UploadDialog
+from expense_tracker.gui.virtual_tree import VirtualTreeview
+from expense_tracker.utils.row_cache import RowBlockCache
+
+# Typing pauses this long before the search runs.
+SEARCH_DEBOUNCE_MS = 250
 
 
 class TransactionsTab(tk.Frame):
@@ -15,24 +21,32 @@ class TransactionsTab(tk.Frame):
         self.transaction_repo: TransactionRepository = transaction_repo
         self.merchant_repo = merchant_repo
         self.main_window = main_window
-        self._current_page = 0
-        self._page_size = 100
-        self._total_transactions = 0
         self._search_keyword: str | None = None
         self._filter_date: date | None = None
+        # The filter and search behind the rows in the list
+        self._shown_query: tuple[date | None, str | None] | None = None
+        self._rendered_version: tuple[int, int] | None = None
+        # Only the search started last may show its results.
+        self._search_generation = 0
+        self._search_after: str | None = None
+        self._search_task: BackgroundTask | None = None
 
         self.pack(fill=tk.BOTH, expand=True)
         self._build_toolbar()
         self._build_body()
         self._build_footer()
-        self.refresh()
 
     def _build_body(self):
-        self.tree = ttk.Treeview(
+        # Only the rows in view are in the Treeview; the rest are fetched from
+        # the database in blocks as the list scrolls.
+        self.list = VirtualTreeview(
             self,
             columns=("id", "date", "amount", "category", "description"),
+            row_key=lambda t: str(t.id),
+            row_values=self._row_values,
             show="headings",
         )
+        self.tree = self.list.tree
         self.tree.heading("date", text="Date")
         self.tree.heading("amount", text="Amount")
         self.tree.heading("category", text="Category")
@@ -45,7 +59,7 @@ class TransactionsTab(tk.Frame):
         self.tree.column("description", width=300, anchor=tk.W)
 
         self.tree.column("id", width=0, stretch=tk.NO)
-        self.tree.pack(fill=tk.BOTH, expand=True)
+        self.list.pack(fill=tk.BOTH, expand=True)
 
         # Bind events
         self.tree.bind("<Double-1>", lambda e: self._edit_transaction())
@@ -53,87 +67,95 @@ class TransactionsTab(tk.Frame):
     def _build_footer(self):
         footer = tk.Frame(self)
         footer.pack(fill=tk.X, side=tk.BOTTOM)
-        self.prev_button = ttk.Button(
-            footer, text="Previous", command=self._previous_page
-        )
-        self.prev_button.pack(side=tk.LEFT, padx=5, pady=5)
-        self.page_label = ttk.Label(footer, text="")
-        self.page_label.pack(side=tk.LEFT, padx=5, pady=5)
-        self.next_button = ttk.Button(footer, text="Next", command=self._next_page)
-        self.next_button.pack(side=tk.LEFT, padx=5, pady=5)
+        self.count_label = ttk.Label(footer, text="")
+        self.count_label.pack(side=tk.LEFT, padx=5, pady=5)
         self.search_indicator = ttk.Label(footer, text="", foreground="white")
         self.search_indicator.pack(side=tk.RIGHT, padx=5, pady=5)
 
-    def _previous_page(self):
-        if self._current_page > 0:
-            self._current_page -= 1
-            self.refresh()
-
-    def _next_page(self):
-        self._current_page += 1
-        self.refresh()
-
-    def refresh(self):
-        for row in self.tree.get_children():
-            self.tree.delete(row)
+    @staticmethod
+    def _row_values(transaction: Transaction) -> tuple:
+        return (
+            transaction.id,
+            transaction.date.isoformat(),
+            transaction.amount,
+            transaction.category,
+            transaction.description,
+        )
 
-        offset = self._current_page * self._page_size
+    def _transaction_rows(
+        self,
+        filter_date: date | None,
+        keyword: str | None,
+        repo: TransactionRepository | None = None,
+    ) -> RowBlockCache:
+        """
+        The transactions to list for a date filter or search keyword, read
+        through `repo` (by default the tab's repository).
+        """
+        repo = repo or self.transaction_repo
+        if filter_date:
+            # A single day is small, so its rows are fetched whole and sliced.
+            day = filter_date
+            return RowBlockCache(
+                lambda limit, offset: repo.get_transactions_for_date(day)[
+                    offset : offset + limit
+                ],
+                lambda: len(repo.get_transactions_for_date(day)),
+            )
+        if keyword:
+            return RowBlockCache(
+                lambda limit, offset, after: repo.search_by_keyword(
+                    keyword, limit, offset, after
+                ),
+                lambda: repo.count_search_results(keyword),
+                key=repo.list_position,
+            )
+        return RowBlockCache(
+            repo.get_all_transactions,
+            repo.count_all_transactions,
+            key=repo.list_position,
+        )
 
-        # Use date filter if active, otherwise use search/all transactions
+    def refresh(self, force: bool = False):
+        """
+        Shows the transactions for the current filter or search. With the same
+        filter and search as before, nothing is queried unless the data
+        version changed (or `force`), and then only rows that changed are
+        redrawn and the scroll position and selection are kept.
+        """
+        query = (self._filter_date, self._search_keyword)
+        version = self.transaction_repo.data_version()
+        if query == self._shown_query:
+            if version == self._rendered_version and not force:
+                return
+            self._rendered_version = version
+            self.list.refresh()
+            self._update_footer()
+        else:
+            self._show_rows(query, self._transaction_rows(*query), version)
+
+    def _show_rows(
+        self,
+        query: tuple[date | None, str | None],
+        rows: RowBlockCache,
+        version: tuple[int, int],
+    ) -> None:
+        self._filter_date, self._search_keyword = query
+        self._rendered_version = version
+        self._shown_query = query
+        self.list.set_rows(rows)
+        self._update_footer()
+
+    def _update_footer(self):
         if self._filter_date:
-            transactions = self.transaction_repo.get_transactions_for_date(
-                self._filter_date
-            )
-            self._total_transactions = len(transactions)
             self.search_indicator.config(
                 text=f"Filtered by date: {self._filter_date.isoformat()}"
             )
         elif self._search_keyword:
-            self._total_transactions = self.transaction_repo.count_search_results(
-                self._search_keyword
-            )
-            transactions = self.transaction_repo.search_by_keyword(
-                self._search_keyword,
-                limit=self._page_size,
-                offset=offset,
-            )
             self.search_indicator.config(text=f"Search: {self._search_keyword}")
         else:
-            self._total_transactions = self.transaction_repo.count_all_transactions()
-            transactions = self.transaction_repo.get_all_transactions(
-                limit=self._page_size,
-                offset=offset,
-            )
             self.search_indicator.config(text="")
-
-        for transaction in transactions:
-            self.tree.insert(
-                "",
-                tk.END,
-                values=(
-                    transaction.id,
-                    transaction.date.isoformat(),
-                    transaction.amount,
-                    transaction.category,
-                    transaction.description,
-                ),
-            )
-
-        total_pages = (
-            math.ceil(self._total_transactions / self._page_size)
-            if self._total_transactions > 0
-            else 1
-        )
-        self.page_label.config(text=f"Page {self._current_page + 1} of {total_pages}")
-
-        self.prev_button.config(
-            state=tk.NORMAL if self._current_page > 0 else tk.DISABLED
-        )
-        self.next_button.config(
-            state=tk.NORMAL
-            if offset + self._page_size < self._total_transactions
-            else tk.DISABLED
-        )
+        self.count_label.config(text=f"{len(self.list)} transaction(s)")
 
     def _build_toolbar(self):
         bar = tk.Frame(self)
@@ -147,13 +169,14 @@ class TransactionsTab(tk.Frame):
         ttk.Button(
             bar, text="Delete Transaction", command=self._delete_transaction
         ).pack(side=tk.LEFT, padx=5, pady=5)
-        ttk.Button(bar, text="Refresh", command=self.refresh).pack(
+        ttk.Button(bar, text="Refresh", command=lambda: self.refresh(force=True)).pack(
             side=tk.LEFT, padx=5, pady=5
         )
         ttk.Button(bar, text="Import Statement", command=self._upload_statement).pack(
             side=tk.RIGHT, padx=5, pady=5
         )
         self.qvar = tk.StringVar()
+        self.qvar.trace_add("write", lambda *_: self._on_search_typed())
         search_entry = ttk.Entry(bar, textvariable=self.qvar, width=30)
         search_entry.pack(side=tk.LEFT, padx=5, pady=5)
         search_entry.bind("<Return>", lambda _: self._search_transactions())
@@ -165,12 +188,7 @@ class TransactionsTab(tk.Frame):
         )
 
     def _get_selected_ids(self) -> list[int]:
-        ids = []
-        for item in self.tree.selection():
-            item_data = self.tree.item(item, "values")
-            if item_data:
-                ids.append(int(item_data[0]))
-        return ids
+        return [int(key) for key in self.list.selected_keys()]
 
     def _upload_statement(self):
         self.main_window._open_dialog(
@@ -199,6 +217,7 @@ class TransactionsTab(tk.Frame):
             self.transaction_repo,
             self.merchant_repo,
             transaction_ids[0],
+            on_complete=self.main_window.refresh_all_tabs,
         )
 
     def _delete_transaction(self):
@@ -222,30 +241,71 @@ class TransactionsTab(tk.Frame):
             messagebox.showinfo(
                 "Success", f"Deleted {deleted} transaction(s) successfully."
             )
-            self.refresh()
-
-    def _search_transactions(self):
-        keyword = self.qvar.get().strip()
-        # Empty search clears the search
-        if not keyword:
-            self._clear_search()
+            self.main_window.data_changed()
+
+    def _cancel_pending_search(self):
+        if self._search_after is not None:
+            self.after_cancel(self._search_after)
+            self._search_after = None
+        # Searches already running finish, but their results are ignored.
+        self._search_generation += 1
+        if self._search_task is not None:
+            self._search_task.cancel()
+            self._search_task = None
+
+    def _on_search_typed(self):
+        self._cancel_pending_search()
+        keyword = self.qvar.get().strip() or None
+        if keyword == self._search_keyword:
             return
+        self._search_after = self.after(SEARCH_DEBOUNCE_MS, self._search_transactions)
 
-        self._search_keyword = keyword
-        self._current_page = 0  # Reset to first page
-        self.refresh()
+    def _search_transactions(self):
+        """
+        Searches for the keyword in the entry. The count and the first block
+        of rows are queried on a worker thread, on a read-only connection of
+        its own since the list keeps reading the tab's; the list only changes
+        if no newer search has started by the time they arrive.
+        """
+        self._cancel_pending_search()
+        generation = self._search_generation
+        query = (None, self.qvar.get().strip() or None)
+        # Read first, so a write during the search is not missed later.
+        version = self.transaction_repo.data_version()
+        db_path = self.transaction_repo.db_path
+
+        def run_search(task: BackgroundTask) -> RowBlockCache:
+            reader = TransactionRepository(db_path, read_only=True)
+            try:
+                found = self._transaction_rows(*query, repo=reader)
+                if not task.cancelled:
+                    found.rows(0, found.block_size)
+                return found
+            finally:
+                reader.conn.close()
+
+        def show_results(found: RowBlockCache):
+            if generation == self._search_generation:
+                self._search_task = None
+                rows = self._transaction_rows(*query)
+                rows.seed(found)
+                self._show_rows(query, rows, version)
+
+        self._search_task = BackgroundTask(
+            self, run_search, on_done=show_results
+        ).start()
 
     def _clear_search(self):
+        self._cancel_pending_search()
         self._search_keyword = None
         self._filter_date = None  # Also clear date filter
         self.qvar.set("")  # Clear the search entry field
-        self._current_page = 0  # Reset to first page
         self.refresh()
 
     def filter_by_date(self, target_date: date):
         """Filter transactions by a specific date."""
+        self._cancel_pending_search()
         self._filter_date = target_date
         self._search_keyword = None  # Clear search when filtering by date
         self.qvar.set("")  # Clear the search entry field
-        self._current_page = 0  # Reset to first page
         self.refresh()
@@ -0,0 +1,207 @@
+import tkinter as tk
+from tkinter import ttk
+from typing import Any, Callable
+
+from expense_tracker.utils.row_cache import RowBlockCache
+
+# Rows materialized below the last visible one, so a partly shown row is filled.
+MARGIN_ROWS = 2
+WHEEL_ROWS = 3
+DEFAULT_ROW_HEIGHT = 20
+
+
+class VirtualTreeview(ttk.Frame):
+    """
+    A scrollable Treeview over a RowBlockCache that only holds the rows in
+    view plus a small margin, whatever the length of the list.
+
+    The Treeview never scrolls itself: the scrollbar, mouse wheel and
+    navigation keys move the window's first row, and the window is redrawn
+    from the cache. Items are keyed by `row_key(row)`: a redraw only inserts,
+    updates, moves or deletes the items that differ from the new window, and
+    the selection is kept by key while rows scroll out of view and back.
+    """
+
+    def __init__(
+        self,
+        master,
+        columns: tuple[str, ...],
+        row_key: Callable[[Any], str],
+        row_values: Callable[[Any], tuple],
+        **tree_options,
+    ):
+        super().__init__(master)
+        self.row_key = row_key
+        self.row_values = row_values
+        self.tree = ttk.Treeview(self, columns=columns, **tree_options)
+        self.scrollbar = ttk.Scrollbar(
+            self, orient=tk.VERTICAL, command=self._on_scrollbar
+        )
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self._rows: RowBlockCache | None = None
+        self._first = 0
+        self._focus = 0
+        self._values: dict[str, tuple] = {}
+        # Selected keys and the list index each was last seen at.
+        self._selected: dict[str, int] = {}
+        self._shown_selection: tuple[str, ...] = ()
+
+        self.tree.bind("<Configure>", lambda e: self._redraw())
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self._scroll_by(-WHEEL_ROWS))
+        self.tree.bind("<Button-5>", lambda e: self._scroll_by(WHEEL_ROWS))
+        self.tree.bind("<Up>", lambda e: self._move_focus(-1))
+        self.tree.bind("<Down>", lambda e: self._move_focus(1))
+        self.tree.bind("<Prior>", lambda e: self._move_focus(-self._visible_rows()))
+        self.tree.bind("<Next>", lambda e: self._move_focus(self._visible_rows()))
+        self.tree.bind("<Home>", lambda e: self._move_focus(-len(self)))
+        self.tree.bind("<End>", lambda e: self._move_focus(len(self)))
+
+    def __len__(self) -> int:
+        return len(self._rows) if self._rows is not None else 0
+
+    def set_rows(self, rows: RowBlockCache) -> None:
+        """Shows a new list from its first row, clearing the selection."""
+        self._rows = rows
+        self._first = self._focus = 0
+        self._selected.clear()
+        self._redraw()
+
+    def refresh(self) -> None:
+        """
+        Re-reads the rows in view, keeping the scroll position and the
+        selection of rows that are still there.
+        """
+        if self._rows is not None:
+            self._rows.clear()
+        self._redraw(prune_selection=True)
+
+    def selected_keys(self) -> list[str]:
+        """
+        Keys of the selected rows in list order, including ones scrolled out
+        of view.
+        """
+        return sorted(self._selected, key=self._selected.get)
+
+    def _visible_rows(self) -> int:
+        children = self.tree.get_children()
+        bbox = self.tree.bbox(children[0]) if children else ""
+        if bbox:
+            top, row_height = bbox[1], bbox[3]
+        else:
+            style_height = ttk.Style().lookup("Treeview", "rowheight")
+            top, row_height = 0, int(style_height or DEFAULT_ROW_HEIGHT)
+        return max(1, (self.tree.winfo_height() - top) // max(row_height, 1))
+
+    def _redraw(self, prune_selection: bool = False) -> None:
+        visible = self._visible_rows()
+        total = len(self)
+        self._first = max(0, min(self._first, total - visible))
+        window = (
+            self._rows.rows(self._first, self._first + visible + MARGIN_ROWS)
+            if self._rows is not None
+            else []
+        )
+
+        keys = [self.row_key(row) for row in window]
+        if prune_selection:
+            # Rows that were in view but are gone were deleted or moved away.
+            for key in set(self.tree.get_children()) - set(keys):
+                self._selected.pop(key, None)
+        self._apply_window(keys, window)
+        children = self.tree.get_children()
+        for index, key in enumerate(children):
+            if key in self._selected:
+                self._selected[key] = self._first + index
+        self._shown_selection = tuple(k for k in children if k in self._selected)
+        self.tree.selection_set(self._shown_selection)
+        focus_index = self._focus - self._first
+        if 0 <= focus_index < len(children):
+            self.tree.focus(children[focus_index])
+        self.tree.yview_moveto(0)
+
+        if total:
+            self.scrollbar.set(self._first / total, (self._first + visible) / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _apply_window(self, keys: list[str], window: list) -> None:
+        """Changes the Treeview's items into the window, touching only what differs."""
+        wanted = set(keys)
+        stale = [key for key in self.tree.get_children() if key not in wanted]
+        if stale:
+            self.tree.delete(*stale)
+            for key in stale:
+                del self._values[key]
+        current = list(self.tree.get_children())
+        for index, (key, row) in enumerate(zip(keys, window)):
+            values = self.row_values(row)
+            if key not in self._values:
+                self.tree.insert("", index, iid=key, values=values)
+                current.insert(index, key)
+            else:
+                if self._values[key] != values:
+                    self.tree.item(key, values=values)
+                if current[index] != key:
+                    self.tree.move(key, "", index)
+                    current.remove(key)
+                    current.insert(index, key)
+            self._values[key] = values
+
+    def _scroll_to(self, first: int) -> None:
+        first = max(0, min(first, len(self) - self._visible_rows()))
+        if first != self._first:
+            self._first = first
+            self._redraw()
+
+    def _scroll_by(self, rows: int) -> str:
+        self._scroll_to(self._first + rows)
+        return "break"
+
+    def _on_scrollbar(self, action: str, amount: str, unit: str | None = None):
+        if action == "moveto":
+            self._scroll_to(int(float(amount) * len(self)))
+        elif unit == "pages":
+            self._scroll_by(int(amount) * self._visible_rows())
+        else:
+            self._scroll_by(int(amount))
+
+    def _on_mousewheel(self, event) -> str:
+        # Windows reports multiples of 120 per notch, macOS small deltas.
+        notches = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        return self._scroll_by(-int(notches) * WHEEL_ROWS)
+
+    def _move_focus(self, rows: int) -> str:
+        """Moves the focused row and selects it, scrolling it into view."""
+        if not len(self):
+            return "break"
+        self._focus = max(0, min(self._focus + rows, len(self) - 1))
+        visible = self._visible_rows()
+        if self._focus < self._first:
+            self._first = self._focus
+        elif self._focus >= self._first + visible:
+            self._first = self._focus - visible + 1
+        row = self._rows.rows(self._focus, self._focus + 1)
+        self._selected = {self.row_key(row[0]): self._focus} if row else {}
+        self._redraw()
+        return "break"
+
+    def _on_select(self, event) -> None:
+        selection = self.tree.selection()
+        if selection == self._shown_selection:
+            # Queued by a redraw restoring the selection, not by the user.
+            return
+        children = self.tree.get_children()
+        # The Treeview only knows the rows in view; keep the others selected.
+        self._selected = {
+            key: index for key, index in self._selected.items() if key not in children
+        }
+        for key in selection:
+            self._selected[key] = self._first + children.index(key)
+        self._shown_selection = selection
+        focus = self.tree.focus()
+        if focus in children:
+            self._focus = self._first + children.index(focus)
@@ -0,0 +1,616 @@
+import logging
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, timedelta
+from itertools import islice
+from pathlib import Path
+
+from expense_tracker.core.models import Transaction
+from expense_tracker.core.transaction_repository import TransactionRepository
+from expense_tracker.services.merchant import MerchantCategoryService
+from expense_tracker.services.pipeline import (
+    Batch,
+    ImportCancelled,
+    ImportPipeline,
+    PipelineStage,
+    StageStats,
+)
+from expense_tracker.utils.extract import (
+    PageFilterStats,
+    get_parse_workers,
+    parse_worker_pool,
+)
+from expense_tracker.utils.parse_cache import ParseCache, hash_file
+from expense_tracker.utils.statement_formats import (
+    PDF,
+    SUFFIX_FORMATS,
+    count_pages,
+    detect_format,
+    iter_statement_rows,
+    parse_statement,
+)
+
+logger = logging.getLogger(__name__)
+
+STATEMENT_SUFFIXES = tuple(SUFFIX_FORMATS)
+
+# Rows categorized and written per batch when streaming a single statement.
+IMPORT_BATCH_SIZE = 500
+
+# Progress is reported at most this often, plus once when the import ends.
+PROGRESS_INTERVAL_SECONDS = 0.1
+
+Fingerprint = tuple[str, float, str]
+
+
+@dataclass
+class FileImportResult:
+    """Outcome of importing one statement file."""
+
+    path: str
+    imported: int = 0
+    skipped: int = 0
+    failed: int = 0
+    error: str | None = None
+
+
+@dataclass
+class ImportReport:
+    """Outcome of importing a batch of statement files."""
+
+    files: list[FileImportResult] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+    stages: list[StageStats] = field(default_factory=list)
+
+    @property
+    def imported(self) -> int:
+        return sum(f.imported for f in self.files)
+
+    @property
+    def skipped(self) -> int:
+        return sum(f.skipped for f in self.files)
+
+    @property
+    def failed(self) -> int:
+        return sum(f.failed for f in self.files)
+
+    @property
+    def rows_per_second(self) -> float:
+        rows = self.imported + self.skipped + self.failed
+        return rows / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+    def summary(self) -> str:
+        """Human readable per-file results and totals."""
+        lines = []
+        for f in self.files:
+            name = Path(f.path).name
+            if f.error:
+                lines.append(f"{name}: failed ({f.error})")
+            else:
+                lines.append(
+                    f"{name}: {f.imported} imported, {f.skipped} skipped, "
+                    f"{f.failed} failed"
+                )
+        lines.append(
+            f"Total: {self.imported} imported, {self.skipped} skipped, "
+            f"{self.failed} failed in {self.elapsed_seconds:.1f}s "
+            f"({self.rows_per_second:.0f} rows/s)"
+        )
+        return "\n".join(lines)
+
+    def stage_summary(self) -> str:
+        """Time and rows per pipeline stage, one stage per line."""
+        return "\n".join(stage.summary() for stage in self.stages)
+
+
+@dataclass
+class ImportProgress:
+    """A snapshot of a running import, passed to import_files' on_progress."""
+
+    pages: int = 0
+    pages_parsed: int = 0
+    rows_parsed: int = 0
+    rows_categorized: int = 0
+    rows_written: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def fraction(self) -> float:
+        """Share of pages parsed so far, from 0 to 1."""
+        return min(self.pages_parsed / self.pages, 1.0) if self.pages else 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        seconds = self.elapsed_seconds
+        return self.rows_parsed / seconds if seconds > 0 else 0.0
+
+
+class _ImportRun:
+    """
+    Progress and cancellation of one import_files call. Parsing and the
+    pipeline stages may report from different threads; snapshots are passed
+    to `on_progress` at most every PROGRESS_INTERVAL_SECONDS.
+    """
+
+    def __init__(
+        self,
+        pages: dict[str, int],
+        on_progress: Callable[[ImportProgress], None] | None,
+        should_cancel: Callable[[], bool] | None,
+    ):
+        self.pages = pages
+        self.on_progress = on_progress
+        self.should_cancel = should_cancel
+        self._parsed: dict[str, int] = {}
+        self._progress = ImportProgress(pages=sum(pages.values()))
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self._last_report: float | None = None
+
+    def check_cancelled(self) -> None:
+        if self.should_cancel is not None and self.should_cancel():
+            raise ImportCancelled
+
+    def track_pages(
+        self, path: str, rows: Iterable[dict], stats: PageFilterStats
+    ) -> Iterator[dict]:
+        """Passes a file's rows through, reporting pages as they are parsed."""
+        for row in rows:
+            if stats.pages != self._parsed.get(path, 0):
+                self._set_pages(path, stats.pages)
+            yield row
+
+    def file_done(self, path: str) -> None:
+        self._set_pages(path, self.pages.get(path, 0))
+
+    def _set_pages(self, path: str, count: int) -> None:
+        with self._lock:
+            self._parsed[path] = count
+            self._progress.pages_parsed = sum(
+                min(n, self.pages.get(p, n)) for p, n in self._parsed.items()
+            )
+        self.report()
+
+    def stages_done(self, stats: list[StageStats]) -> None:
+        """Pipeline on_batch callback: counts rows through the stages."""
+        rows_out = {s.name: s.rows_out for s in stats}
+        with self._lock:
+            self._progress.rows_parsed = stats[0].rows_out
+            self._progress.rows_categorized = rows_out.get("categorize", 0)
+            self._progress.rows_written = rows_out.get("write", 0)
+        self.report()
+
+    def report(self, force: bool = False) -> None:
+        if self.on_progress is None:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            if (
+                not force
+                and self._last_report is not None
+                and now - self._last_report < PROGRESS_INTERVAL_SECONDS
+            ):
+                return
+            self._last_report = now
+            snapshot = replace(self._progress, elapsed_seconds=now - self._start)
+        self.on_progress(snapshot)
+
+
+def find_statement_files(paths: Iterable[str]) -> list[str]:
+    """
+    Expands directories into the statement files they contain (non-recursive,
+    sorted by name). Files are kept in the order given; duplicates are dropped.
+    """
+    found: dict[str, None] = {}
+    for raw in paths:
+        path = Path(raw)
+        if path.is_dir():
+            for child in sorted(path.iterdir()):
+                if child.is_file() and child.suffix.lower() in STATEMENT_SUFFIXES:
+                    found[str(child)] = None
+        else:
+            found[str(path)] = None
+    return list(found)
+
+
+def parse_row_date(raw_date) -> date:
+    """Converts a parsed row date (ISO or US formats) to a date."""
+    if isinstance(raw_date, date):
+        return raw_date
+    for fmt in ("%Y-%m-%d", "%m/%d/%Y", "%m/%d/%y"):
+        try:
+            return datetime.strptime(raw_date, fmt).date()
+        except (ValueError, TypeError):
+            continue
+    raise ValueError(f"Unsupported date format: {raw_date}")
+
+
+def batched(iterable: Iterable, size: int) -> Iterator[list]:
+    """Yields lists of up to `size` items."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _recording(rows: Iterable[dict], sink: list[dict]) -> Iterator[dict]:
+    """Passes rows through while keeping a copy for the parse cache."""
+    for row in rows:
+        sink.append(row)
+        yield row
+
+
+def _parse_serially(path: str) -> list[dict]:
+    """Parses a single statement inside a worker process."""
+    return parse_statement(path, workers=1)
+
+
+class NormalizeStage(PipelineStage):
+    """Turns parsed rows into uncategorized transactions, counting bad rows."""
+
+    name = "normalize"
+
+    def process(self, result: FileImportResult, rows: list[dict]) -> list:
+        transactions = []
+        for row in rows:
+            try:
+                transactions.append(
+                    Transaction(
+                        id=None,
+                        date=parse_row_date(row["date"]),
+                        amount=float(row["amount"]),
+                        category="Uncategorized",
+                        description=row["description"],
+                    )
+                )
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Skipping unreadable row in {result.path}: {e}")
+                result.failed += 1
+        return transactions
+
+
+class CategorizeStage(PipelineStage):
+    """Assigns each transaction its merchant category."""
+
+    name = "categorize"
+
+    def __init__(self, merchant_service: MerchantCategoryService):
+        self.merchant_service = merchant_service
+
+    def process(self, result: FileImportResult, transactions: list) -> list:
+        for t in transactions:
+            t.category = self.merchant_service.categorize_merchant(
+                t.description, t.amount
+            )
+        self.merchant_service.commit_fuzzy_matches()
+        return transactions
+
+
+class DedupeStage(PipelineStage):
+    """
+    Drops rows that are already known. The n-th occurrence of a row in a file
+    is skipped when at least n copies are known, so repeated rows within one
+    file are kept, minus as many as already exist.
+
+    Known rows are the ones in the database before the import plus the ones
+    imported from earlier files. Database counts are fetched once per date,
+    before this import emits any row for that date, so they never include
+    rows the write stage has not committed yet.
+    """
+
+    name = "dedupe"
+
+    def __init__(self, transaction_repo: TransactionRepository):
+        self.transaction_repo = transaction_repo
+        self._known: Counter[Fingerprint] = Counter()
+        self._fetched_dates: set[str] = set()
+        self._file: FileImportResult | None = None
+        self._seen: Counter[Fingerprint] = Counter()
+        self._imported: Counter[Fingerprint] = Counter()
+
+    def _fetch_known(self, transactions: list[Transaction]) -> None:
+        missing = {
+            t.date
+            for t in transactions
+            if t.date.isoformat() not in self._fetched_dates
+        }
+        if not missing:
+            return
+        start, end = min(missing), max(missing)
+        fingerprints = self.transaction_repo.get_transaction_fingerprints(start, end)
+        for key, count in fingerprints.items():
+            if key[0] not in self._fetched_dates:
+                self._known[key] += count
+        day = start
+        while day <= end:
+            self._fetched_dates.add(day.isoformat())
+            day += timedelta(days=1)
+
+    def process(self, result: FileImportResult, transactions: list) -> list:
+        if result is not self._file:
+            # Rows from the previous file count as known for the files after it.
+            self._known.update(self._imported)
+            self._file = result
+            self._seen = Counter()
+            self._imported = Counter()
+
+        self._fetch_known(transactions)
+        kept = []
+        for t in transactions:
+            key = (t.date.isoformat(), t.amount, t.description)
+            self._seen[key] += 1
+            if self._seen[key] <= self._known[key]:
+                result.skipped += 1
+            else:
+                kept.append(t)
+                self._imported[key] += 1
+                result.imported += 1
+        return kept
+
+
+class WriteStage(PipelineStage):
+    """
+    Inserts transactions, one commit per batch. With `in_date_order` every
+    batch is held back and written in a single date-ordered commit at the end.
+
+    Ids of rows written batch by batch are kept per file in `written_ids`, so
+    a file that fails partway through can be taken out again.
+    """
+
+    name = "write"
+
+    def __init__(self, transaction_repo: TransactionRepository, in_date_order: bool):
+        self.transaction_repo = transaction_repo
+        self.in_date_order = in_date_order
+        self._held: list[Transaction] = []
+        self.written_ids: dict[str, list[int]] = {}
+
+    def process(self, result: FileImportResult, transactions: list) -> list:
+        if self.in_date_order:
+            self._held.extend(transactions)
+            return []
+        ids = self.transaction_repo.insert_transactions(transactions)
+        self.written_ids.setdefault(result.path, []).extend(ids)
+        return transactions
+
+    def finish(self) -> list[Batch]:
+        if not self._held:
+            return []
+        held, self._held = sorted(self._held, key=lambda t: t.date), []
+        self.transaction_repo.add_transactions(held)
+        return [(None, held)]
+
+
+class StatementImportService:
+    """
+    Imports one or more statement files (PDF, CSV or OFX/QFX) into the
+    transaction repository.
+
+    Rows flow through an ImportPipeline: parse, normalize, categorize, dedupe
+    and write. A single file is streamed: rows are parsed, categorized,
+    de-duplicated and written in batches as pages are parsed, so memory stays
+    flat and the first rows reach the database early; if parsing fails partway
+    through, the rows already written are deleted again. Several files are
+    parsed concurrently in worker processes, then written by a single writer
+    in date order. With `threaded_stages` each stage runs on its own thread.
+
+    With a parse cache, PDFs whose contents were parsed before skip parsing and
+    reuse the cached rows.
+    """
+
+    def __init__(
+        self,
+        transaction_repo: TransactionRepository,
+        merchant_service: MerchantCategoryService,
+        workers: int | None = None,
+        batch_size: int = IMPORT_BATCH_SIZE,
+        parse_cache: ParseCache | None = None,
+        threaded_stages: bool = False,
+    ):
+        self.transaction_repo = transaction_repo
+        self.merchant_service = merchant_service
+        self.workers = workers if workers is not None else get_parse_workers()
+        self.batch_size = batch_size
+        self.parse_cache = parse_cache
+        self.threaded_stages = threaded_stages
+
+    def _cached_rows(self, path: str) -> tuple[str | None, list[dict] | None]:
+        """Returns the file's content hash and its cached rows, if any."""
+        # CSV and OFX files parse about as fast as the cache can be read.
+        if self.parse_cache is None or detect_format(path) != PDF:
+            return None, None
+        digest = hash_file(path)
+        rows = self.parse_cache.get(digest)
+        if rows is not None:
+            logger.info(f"Using cached parse of {path}")
+        return digest, rows
+
+    def _parse_files(
+        self, paths: list[str], run: _ImportRun
+    ) -> list[list[dict] | Exception]:
+        """
+        Parses every file, returning its rows or the error it raised. Raises
+        ImportCancelled between files once the run is cancelled.
+        """
+        if self.workers <= 1:
+            results: list[list[dict] | Exception] = []
+            for path in paths:
+                run.check_cancelled()
+                try:
+                    results.append(parse_statement(path, workers=1))
+                except Exception as e:
+                    results.append(e)
+                run.file_done(path)
+            return results
+
+        with parse_worker_pool(min(self.workers, len(paths))) as executor:
+            futures = [executor.submit(_parse_serially, path) for path in paths]
+            results = []
+            for path, future in zip(paths, futures):
+                try:
+                    run.check_cancelled()
+                except ImportCancelled:
+                    executor.shutdown(cancel_futures=True)
+                    raise
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    results.append(e)
+                run.file_done(path)
+            return results
+
+    def _stream_file(
+        self, result: FileImportResult, run: _ImportRun
+    ) -> Iterator[Batch]:
+        """Yields batches of one file's rows while it is being parsed."""
+        parsed: list[dict] = []
+        try:
+            digest, cached = self._cached_rows(result.path)
+            if cached is not None:
+                rows: Iterable[dict] = cached
+            else:
+                stats = PageFilterStats()
+                rows = iter_statement_rows(
+                    result.path, workers=self.workers, stats=stats
+                )
+                rows = run.track_pages(result.path, rows, stats)
+                if digest is not None:
+                    rows = _recording(rows, parsed)
+            for batch in batched(rows, self.batch_size):
+                yield result, batch
+        except Exception as e:
+            logger.error(f"Failed to parse {result.path}: {e}")
+            result.error = str(e)
+            return
+        finally:
+            run.file_done(result.path)
+        if cached is None and digest is not None:
+            self.parse_cache.put(digest, parsed)
+
+    def _parse_concurrently(
+        self, results: list[FileImportResult], run: _ImportRun
+    ) -> Iterator[Batch]:
+        """Parses several files at once, then yields their batches in order."""
+        parsed_files: list[list[dict] | Exception | None] = []
+        digests: list[str | None] = []
+        for result in results:
+            try:
+                digest, cached = self._cached_rows(result.path)
+            except (OSError, ValueError) as e:
+                digest, cached = None, e
+            digests.append(digest)
+            parsed_files.append(cached)
+            if cached is not None:
+                run.file_done(result.path)
+
+        misses = [i for i, parsed in enumerate(parsed_files) if parsed is None]
+        missing_paths = [results[i].path for i in misses]
+        for i, parsed in zip(misses, self._parse_files(missing_paths, run)):
+            parsed_files[i] = parsed
+            if digests[i] is not None and not isinstance(parsed, Exception):
+                self.parse_cache.put(digests[i], parsed)
+
+        for result, parsed in zip(results, parsed_files):
+            if isinstance(parsed, Exception):
+                logger.error(f"Failed to parse {result.path}: {parsed}")
+                result.error = str(parsed)
+                continue
+            for batch in batched(parsed, self.batch_size):
+                yield result, batch
+
+    def _discard_written(self, result: FileImportResult, write: WriteStage) -> None:
+        """
+        Deletes the rows of a streamed file that failed after some of its
+        batches were written, so a failed file imports nothing.
+        """
+        ids = write.written_ids.pop(result.path, [])
+        if ids:
+            logger.info(f"Removing {len(ids)} row(s) written from {result.path}")
+            with self.transaction_repo.atomic():
+                for chunk in batched(ids, self.batch_size):
+                    self.transaction_repo.delete_multiple_transactions(chunk)
+        result.imported = result.skipped = result.failed = 0
+
+    @staticmethod
+    def _count_pages(files: list[str]) -> dict[str, int]:
+        """Pages per file, for progress; unreadable files count as one page."""
+        pages = {}
+        for path in files:
+            try:
+                pages[path] = count_pages(path)
+            except Exception as e:
+                logger.warning(f"Could not count pages of {path}: {e}")
+                pages[path] = 1
+        return pages
+
+    def build_pipeline(
+        self,
+        in_date_order: bool,
+        should_cancel: Callable[[], bool] | None = None,
+        on_batch: Callable[[list[StageStats]], None] | None = None,
+    ) -> ImportPipeline:
+        """The stages rows go through after parsing."""
+        return ImportPipeline(
+            "parse",
+            [
+                NormalizeStage(),
+                CategorizeStage(self.merchant_service),
+                DedupeStage(self.transaction_repo),
+                WriteStage(self.transaction_repo, in_date_order),
+            ],
+            threaded=self.threaded_stages,
+            should_cancel=should_cancel,
+            on_batch=on_batch,
+        )
+
+    def import_files(
+        self,
+        paths: Iterable[str],
+        on_progress: Callable[[ImportProgress], None] | None = None,
+        should_cancel: Callable[[], bool] | None = None,
+    ) -> ImportReport:
+        """
+        Imports statements from files and directories.
+
+        Args:
+            paths: Statement files, or directories containing them.
+            on_progress: Called with an ImportProgress snapshot as pages are
+                parsed and rows categorized and written, and once at the end.
+                It may be called from a pipeline thread.
+            should_cancel: Checked between batches and files. Once it returns
+                True the import stops and raises ImportCancelled; batches
+                already written stay written unless the caller wraps the
+                import in TransactionRepository.atomic().
+
+        Returns:
+            An ImportReport with per-file results and stage timings.
+        """
+        start = time.perf_counter()
+        files = find_statement_files(paths)
+        report = ImportReport(files=[FileImportResult(path) for path in files])
+        run = _ImportRun(
+            self._count_pages(files) if on_progress is not None else {},
+            on_progress,
+            should_cancel,
+        )
+
+        if len(report.files) == 1:
+            source = self._stream_file(report.files[0], run)
+            pipeline = self.build_pipeline(False, should_cancel, run.stages_done)
+            report.stages = pipeline.run(source)
+            if report.files[0].error is not None:
+                self._discard_written(report.files[0], pipeline.stages[-1])
+        elif report.files:
+            source = self._parse_concurrently(report.files, run)
+            pipeline = self.build_pipeline(True, should_cancel, run.stages_done)
+            report.stages = pipeline.run(source)
+        run.report(force=True)
+
+        report.elapsed_seconds = time.perf_counter() - start
+        logger.info(
+            f"Imported {report.imported} transaction(s) from {len(files)} file(s) "
+            f"at {report.rows_per_second:.0f} rows/s"
+        )
+        return report
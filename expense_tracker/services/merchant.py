@@ -3,11 +3,19 @@ import logging
 
 from expense_tracker.core.transaction_repository import TransactionRepository
 from expense_tracker.core.merchant_repository import MerchantCategoryRepository
-from expense_tracker.core.models import MerchantCategory
+from expense_tracker.core.models import FuzzyMatch, MerchantCategory, MerchantRule
+from expense_tracker.utils.aho_corasick import AhoCorasick
+from expense_tracker.utils.ngram_index import NGramIndex
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
+DEFAULT_FUZZY_THRESHOLD = 90
+
+# Below this cutoff a match no longer has to share a trigram with the query,
+# so fuzzy lookups fall back to scoring every merchant key.
+INDEXED_MIN_THRESHOLD = 90
+
 
 class MerchantCategoryService:
     def __init__(
@@ -19,16 +27,71 @@ class MerchantCategoryService:
         self.merchant_repo = merchant_repo
         self.transaction_repo = transaction_repo
         self.normalizer = normalizer
+        self._merchant_index: NGramIndex | None = None
+        self._rules: list[MerchantRule] = []
+        self._rule_matcher: AhoCorasick | None = None
+        self._rules_version: int | None = None
 
     def update_category(self, description: str, category: str) -> None:
         """Updates the category for a given merchant description."""
         normalized_merchant = self.normalizer(description)
         merchant_category = MerchantCategory(normalized_merchant, category)
         self.merchant_repo.set_category(merchant_category)
+        if self._merchant_index is not None:
+            self._merchant_index.add(normalized_merchant)
+
+    def _get_merchant_index(self) -> NGramIndex:
+        """Builds the merchant key index on first use."""
+        if self._merchant_index is None:
+            merchants = self.merchant_repo.get_all_merchants()
+            self._merchant_index = NGramIndex(m.merchant_key for m in merchants)
+        return self._merchant_index
+
+    def invalidate_merchant_index(self) -> None:
+        """Drops the merchant key index so it is rebuilt on the next lookup."""
+        self._merchant_index = None
+
+    def _get_rule_matcher(self) -> AhoCorasick:
+        """Returns the rule automaton, rebuilding it only when the rules changed."""
+        version = self.merchant_repo.rules_version
+        if self._rule_matcher is None or self._rules_version != version:
+            self._rules = self.merchant_repo.get_all_rules()
+            self._rule_matcher = AhoCorasick([rule.pattern for rule in self._rules])
+            self._rules_version = version
+        return self._rule_matcher
+
+    def match_rule(self, description: str) -> MerchantRule | None:
+        """Finds the substring rule that applies to a raw description.
+
+        All rules are matched in a single pass. When several match, the longest
+        pattern wins, then the rule that was added first.
+
+        Args:
+            description (str): The raw description from the transaction.
+
+        Returns:
+            MerchantRule | None: The winning rule, or None if no rule matches.
+        """
+        matcher = self._get_rule_matcher()
+        matches = matcher.matching_patterns(description.upper())
+        if not matches:
+            return None
+        best = min(matches, key=lambda i: (-len(self._rules[i].pattern), i))
+        return self._rules[best]
 
-    def fuzzy_lookup_merchant(self, merchant: str, threshold: int = 90) -> str | None:
+    def fuzzy_lookup_merchant(
+        self, merchant: str, threshold: int = DEFAULT_FUZZY_THRESHOLD
+    ) -> str | None:
         """Attempts to find the closest matching merchant name using fuzzy string matching.
 
+        Results, including misses, are cached in the merchant database and
+        reused until the merchant keys or the threshold change. New entries
+        are committed by commit_fuzzy_matches(), once per batch of lookups.
+
+        Candidates are pruned with a trigram index first, which gives the same
+        result as scoring every merchant key when the threshold is at least
+        ``INDEXED_MIN_THRESHOLD``.
+
         Args:
             merchant (str): The normalized merchant name to look up.
             threshold (int, optional): The minimum score for a match to be considered valid. Defaults to 90.
@@ -36,19 +99,44 @@ class MerchantCategoryService:
         Returns:
             str | None: The best matching merchant name if found, otherwise None.
         """
+        version = self.merchant_repo.merchant_version
+        cached = self.merchant_repo.get_fuzzy_match(merchant)
+        if (
+            cached is not None
+            and cached.threshold == threshold
+            and cached.merchant_version == version
+        ):
+            return cached.matched_key
+
         from rapidfuzz import process
 
-        merchants = self.merchant_repo.get_all_merchants()
-        if not merchants:
+        index = self._get_merchant_index()
+        if not len(index):
             return None
 
-        merchant_keys = [m.merchant_key for m in merchants]
+        if threshold >= INDEXED_MIN_THRESHOLD:
+            merchant_keys = index.candidates(merchant)
+        else:
+            merchant_keys = index.keys
 
         match = process.extractOne(merchant, merchant_keys, score_cutoff=threshold)
+        self.merchant_repo.set_fuzzy_match(
+            FuzzyMatch(
+                query_key=merchant,
+                matched_key=match[0] if match else None,
+                score=match[1] if match else None,
+                threshold=threshold,
+                merchant_version=version,
+            )
+        )
         if match:
             return match[0]
         return None
 
+    def commit_fuzzy_matches(self) -> None:
+        """Commits the fuzzy matches cached by lookups so far in one go."""
+        self.merchant_repo.commit_fuzzy_matches()
+
     def categorize_merchant(self, description: str, amount: float) -> str:
         """Categorizes the merchant based on the description and amount.
 
@@ -70,7 +158,12 @@ class MerchantCategoryService:
         if merchant_category:
             return merchant_category.category
 
-        # If no exact match, try fuzzy matching
+        # Then user-defined substring rules
+        rule = self.match_rule(description)
+        if rule:
+            return rule.category
+
+        # If nothing else matched, try fuzzy matching
         fuzzy_match = self.fuzzy_lookup_merchant(merchant)
         if fuzzy_match:
             merchant_category = self.merchant_repo.get_category(fuzzy_match)
@@ -79,21 +172,49 @@ class MerchantCategoryService:
 
         return "Uncategorized"
 
-    def update_uncategorized_transactions(self) -> None:
-        # Get all uncategorized transactions
+    def update_uncategorized_transactions(
+        self,
+        chunk_size: int = 200,
+        on_progress: Callable[[int, int], None] | None = None,
+        should_cancel: Callable[[], bool] | None = None,
+    ) -> int:
+        """Recategorizes "Uncategorized" transactions using the current merchant categories.
+
+        Updates are committed one chunk at a time, so a cancelled sweep keeps
+        the chunks that were already written.
+
+        Args:
+            chunk_size (int, optional): Number of transactions per committed chunk. Defaults to 200.
+            on_progress (Callable[[int, int], None] | None, optional): Called with (processed, total) after each chunk.
+            should_cancel (Callable[[], bool] | None, optional): Checked before each chunk; returning True stops the sweep.
+
+        Returns:
+            int: The number of transactions that were recategorized.
+        """
         transactions = self.transaction_repo.get_all_transactions_by_category(
             "Uncategorized"
         )
+        total = len(transactions)
+        updated = 0
+
+        for start in range(0, total, chunk_size):
+            if should_cancel is not None and should_cancel():
+                logger.info(f"Recategorization cancelled after {start} of {total}")
+                break
+
+            updates = []
+            for transaction in transactions[start : start + chunk_size]:
+                category = self.categorize_merchant(
+                    transaction.description, transaction.amount
+                )
+                if category != "Uncategorized":
+                    updates.append((transaction.id, category))
 
-        # For each transaction, update the category if the normalized merchant matches the updated category
-        for transaction in transactions:
-            # Check if the normalized merchant matches the updated category's merchant key
-            category = self.categorize_merchant(
-                transaction.description, transaction.amount
-            )
+            self.transaction_repo.update_categories(updates)
+            self.commit_fuzzy_matches()
+            updated += len(updates)
 
-            # If the category is not "Uncategorized", update the transaction category
-            if category != "Uncategorized":
-                self.transaction_repo.update_transaction(
-                    transaction.id, {"category": category}
-                )
+            if on_progress is not None:
+                on_progress(min(start + chunk_size, total), total)
+
+        return updated
@@ -0,0 +1,249 @@
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Batches buffered between two threaded stages.
+DEFAULT_QUEUE_SIZE = 4
+
+Batch = tuple[Any, list]
+
+_DONE = object()
+
+
+@dataclass
+class StageStats:
+    """Work done by one pipeline stage."""
+
+    name: str
+    batches: int = 0
+    rows_in: int = 0
+    rows_out: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_in / self.seconds if self.seconds > 0 else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.name}: {self.rows_in} in, {self.rows_out} out, "
+            f"{self.seconds:.2f}s ({self.rows_per_second:.0f} rows/s)"
+        )
+
+
+class PipelineStage:
+    """
+    One step of an ImportPipeline.
+
+    Subclasses set `name` and implement `process`, which receives a batch's
+    context (for example the file it came from) and items and returns the
+    items to pass on. Stages that hold batches back return them from
+    `finish`, which runs once after the last batch.
+    """
+
+    name = "stage"
+
+    def process(self, context: Any, items: list) -> list:
+        raise NotImplementedError
+
+    def finish(self) -> list[Batch]:
+        return []
+
+
+class ImportCancelled(Exception):
+    """Raised by ImportPipeline.run when its cancel check returns True."""
+
+
+class _Aborted(Exception):
+    pass
+
+
+class ImportPipeline:
+    """
+    Passes batches from a source through a sequence of stages, timing each
+    stage and counting the rows going in and out of it.
+
+    By default every batch runs through all stages on the calling thread.
+    With `threaded=True` the source and each stage run on their own thread,
+    connected by bounded queues, so a slow stage overlaps with the others.
+    Stage timings only count time spent working, not waiting on a queue.
+
+    `should_cancel` is checked before each batch is read from the source or
+    processed by a stage; once it returns True, run raises ImportCancelled.
+    `on_batch` is called with the stats of every stage after each batch a
+    stage finishes, from that stage's thread.
+    """
+
+    def __init__(
+        self,
+        source_name: str,
+        stages: list[PipelineStage],
+        threaded: bool = False,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        should_cancel: Callable[[], bool] | None = None,
+        on_batch: Callable[[list[StageStats]], None] | None = None,
+    ):
+        self.source_name = source_name
+        self.stages = stages
+        self.threaded = threaded
+        self.queue_size = queue_size
+        self.should_cancel = should_cancel
+        self.on_batch = on_batch
+
+    def run(self, source: Iterable[Batch]) -> list[StageStats]:
+        """Runs every batch of the source through the stages."""
+        stats = [StageStats(self.source_name)]
+        stats.extend(StageStats(stage.name) for stage in self.stages)
+        if self.threaded and self.stages:
+            self._run_threaded(source, stats)
+        else:
+            self._run_serial(source, stats)
+        for s in stats:
+            logger.info(f"Pipeline stage {s.summary()}")
+        return stats
+
+    def _check_cancelled(self) -> None:
+        if self.should_cancel is not None and self.should_cancel():
+            raise ImportCancelled
+
+    def _batch_done(self, stats: list[StageStats]) -> None:
+        if self.on_batch is not None:
+            self.on_batch(stats)
+
+    def _timed_source(self, source: Iterable[Batch], stats: list[StageStats]):
+        iterator = iter(source)
+        source_stats = stats[0]
+        while True:
+            self._check_cancelled()
+            start = time.perf_counter()
+            try:
+                context, items = next(iterator)
+            except StopIteration:
+                source_stats.seconds += time.perf_counter() - start
+                return
+            source_stats.seconds += time.perf_counter() - start
+            source_stats.batches += 1
+            source_stats.rows_in += len(items)
+            source_stats.rows_out += len(items)
+            self._batch_done(stats)
+            yield context, items
+
+    def _timed_process(
+        self, i: int, stats: list[StageStats], context: Any, items: list
+    ) -> list:
+        self._check_cancelled()
+        stage_stats = stats[i + 1]
+        start = time.perf_counter()
+        out = self.stages[i].process(context, items)
+        stage_stats.seconds += time.perf_counter() - start
+        stage_stats.batches += 1
+        stage_stats.rows_in += len(items)
+        stage_stats.rows_out += len(out)
+        self._batch_done(stats)
+        return out
+
+    def _timed_finish(self, i: int, stats: list[StageStats]) -> list[Batch]:
+        self._check_cancelled()
+        stage_stats = stats[i + 1]
+        start = time.perf_counter()
+        flushed = self.stages[i].finish()
+        stage_stats.seconds += time.perf_counter() - start
+        stage_stats.rows_out += sum(len(items) for _, items in flushed)
+        self._batch_done(stats)
+        return flushed
+
+    def _run_serial(self, source: Iterable[Batch], stats: list[StageStats]) -> None:
+        def push(first: int, context: Any, items: list) -> None:
+            for i in range(first, len(self.stages)):
+                items = self._timed_process(i, stats, context, items)
+
+        for context, items in self._timed_source(source, stats):
+            push(0, context, items)
+        for i in range(len(self.stages)):
+            for context, items in self._timed_finish(i, stats):
+                push(i + 1, context, items)
+
+    def _run_threaded(self, source: Iterable[Batch], stats: list[StageStats]) -> None:
+        queues = [queue.Queue(self.queue_size) for _ in self.stages]
+        abort = threading.Event()
+        errors: list[BaseException] = []
+
+        def put(q: queue.Queue, item) -> None:
+            while True:
+                try:
+                    q.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    if abort.is_set():
+                        raise _Aborted
+
+        def get(q: queue.Queue):
+            while True:
+                try:
+                    return q.get(timeout=0.1)
+                except queue.Empty:
+                    if abort.is_set():
+                        raise _Aborted
+
+        def run_source() -> None:
+            for batch in self._timed_source(source, stats):
+                put(queues[0], batch)
+                if abort.is_set():
+                    raise _Aborted
+
+        def run_stage(i: int) -> None:
+            out = queues[i + 1] if i + 1 < len(queues) else None
+            while (batch := get(queues[i])) is not _DONE:
+                context, items = batch
+                items = self._timed_process(i, stats, context, items)
+                if out is not None:
+                    put(out, (context, items))
+            for batch in self._timed_finish(i, stats):
+                if out is not None:
+                    put(out, batch)
+
+        def worker(target, *args, downstream: queue.Queue | None = None) -> None:
+            try:
+                target(*args)
+            except _Aborted:
+                return
+            except BaseException as e:
+                errors.append(e)
+                abort.set()
+                return
+            if downstream is not None:
+                try:
+                    put(downstream, _DONE)
+                except _Aborted:
+                    pass
+
+        threads = [
+            threading.Thread(
+                target=worker,
+                args=(run_source,),
+                kwargs={"downstream": queues[0]},
+                daemon=True,
+            )
+        ]
+        for i in range(len(self.stages)):
+            downstream = queues[i + 1] if i + 1 < len(queues) else None
+            threads.append(
+                threading.Thread(
+                    target=worker,
+                    args=(run_stage, i),
+                    kwargs={"downstream": downstream},
+                    daemon=True,
+                )
+            )
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
@@ -1,11 +1,22 @@
 import logging
-from typing import NamedTuple
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Iterable, NamedTuple
 from datetime import date
 
 from expense_tracker.core.transaction_repository import TransactionRepository
 
 logger = logging.getLogger(__name__)
 
+HEATMAP, METRICS = "heatmap", "metrics"
+
+# Entries kept by MonthDataCache. Heatmap data and metrics for a month are
+# separate entries, so this covers 12 months of both.
+DEFAULT_CACHED_ENTRIES = 24
+
+MonthKey = tuple[str, int, int]
+
 
 class MonthlyMetrics(NamedTuple):
     """Monthly statistics metrics"""
@@ -25,6 +36,10 @@ class StatisticsService:
     def __init__(self, transaction_repo: TransactionRepository):
         self.transaction_repo = transaction_repo
 
+    def data_version(self) -> tuple[int, int]:
+        """The transaction repository's data version; see its data_version."""
+        return self.transaction_repo.data_version()
+
     @staticmethod
     def _get_month_date_range(year: int, month: int) -> tuple[date, date]:
         """Helper to get start and end date for a given month."""
@@ -104,3 +119,115 @@ class StatisticsService:
             List of (year, month, net_amount) tuples
         """
         return self.transaction_repo.get_monthly_cashflow_trend(num_months)
+
+
+class MonthDataCache:
+    """
+    Heatmap data and MonthlyMetrics per month, kept in a bounded LRU cache.
+
+    `prefetch` loads months the user is likely to open next (the neighbours
+    of the one shown) on a background thread, so navigating to them needs no
+    query. Entries are dropped once the transactions' data version changes,
+    or on `invalidate`; loads still in flight then are not stored.
+
+    Every load, prefetched or not, runs on that one thread through `reader`
+    (by default `statistics_service`). Given a reader on a connection of its
+    own, the caller's connection is never queried from two threads; the data
+    version is still read through `statistics_service`.
+    """
+
+    def __init__(
+        self,
+        statistics_service: StatisticsService,
+        max_entries: int = DEFAULT_CACHED_ENTRIES,
+        reader: StatisticsService | None = None,
+    ):
+        self.statistics_service = statistics_service
+        self.max_entries = max_entries
+        reader = reader or statistics_service
+        self._loaders = {
+            HEATMAP: reader.get_spending_heatmap_data,
+            METRICS: reader.get_monthly_metrics,
+        }
+        self._entries: OrderedDict[MonthKey, Any] = OrderedDict()
+        self._pending: dict[MonthKey, Future] = {}
+        self._generation = 0
+        self._version: tuple[int, int] | None = None
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="month-prefetch"
+        )
+
+    def heatmap(self, year: int, month: int) -> dict[int, float]:
+        """Daily spending for a month, as StatisticsService returns it."""
+        return self._get((HEATMAP, year, month))
+
+    def metrics(self, year: int, month: int) -> MonthlyMetrics:
+        return self._get((METRICS, year, month))
+
+    def prefetch(self, kind: str, months: Iterable[tuple[int, int]]) -> list[Future]:
+        """
+        Loads `kind` (HEATMAP or METRICS) for months not cached yet in the
+        background. Returns the futures of the loads it started.
+        """
+        self._check_version()
+        started = []
+        with self._lock:
+            generation = self._generation
+            for year, month in months:
+                key = (kind, year, month)
+                if key in self._entries or key in self._pending:
+                    continue
+                future = self._executor.submit(self._load, key, generation)
+                self._pending[key] = future
+                started.append((key, future))
+        for key, future in started:
+            future.add_done_callback(lambda f, key=key: self._forget(key, f))
+        return [future for _, future in started]
+
+    def invalidate(self) -> None:
+        """Drops every cached month after the transactions changed."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._pending.clear()
+
+    def _check_version(self) -> None:
+        version = self.statistics_service.data_version()
+        if version != self._version:
+            self.invalidate()
+            self._version = version
+
+    def _get(self, key: MonthKey) -> Any:
+        self._check_version()
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            future = self._pending.get(key)
+            generation = self._generation
+        if future is not None:
+            try:
+                return future.result()
+            except Exception:
+                pass  # Logged by _forget; load it again below
+        return self._executor.submit(self._load, key, generation).result()
+
+    def _load(self, key: MonthKey, generation: int) -> Any:
+        kind, year, month = key
+        value = self._loaders[kind](year, month)
+        with self._lock:
+            # A load started before invalidate() may have read old data.
+            if generation == self._generation:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def _forget(self, key: MonthKey, future: Future) -> None:
+        with self._lock:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+        if not future.cancelled() and future.exception() is not None:
+            logger.warning(f"Failed to prefetch {key}: {future.exception()}")
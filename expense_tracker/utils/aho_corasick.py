@@ -0,0 +1,61 @@
+from collections import deque
+from collections.abc import Iterator, Sequence
+
+
+class AhoCorasick:
+    """
+    An Aho-Corasick automaton that finds every occurrence of a set of patterns
+    in one pass over the text, regardless of how many patterns there are.
+    """
+
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns = list(patterns)
+        # Node 0 is the root. Each node has goto edges, a failure link and the
+        # indices of the patterns that end at it (including via failure links).
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[list[int]] = [[]]
+
+        for index, pattern in enumerate(self.patterns):
+            if pattern:
+                self._insert(pattern, index)
+        self._build_failure_links()
+
+    def _insert(self, pattern: str, index: int) -> None:
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[node][char] = next_node
+            node = next_node
+        self._output[node].append(index)
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child].extend(self._output[self._fail[child]])
+
+    def iter_matches(self, text: str) -> Iterator[tuple[int, int]]:
+        """Yields (start, pattern_index) for every pattern occurrence in the text."""
+        node = 0
+        for position, char in enumerate(text):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for index in self._output[node]:
+                yield position - len(self.patterns[index]) + 1, index
+
+    def matching_patterns(self, text: str) -> set[int]:
+        """Returns the indices of all patterns that occur in the text."""
+        return {index for _, index in self.iter_matches(text)}
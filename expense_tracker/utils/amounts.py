@@ -0,0 +1,10 @@
+def parse_amount(s: str) -> float:
+    """
+    Parses an amount as statements print it: "$1,234.56", "-10.00", or
+    "($25.00)" for a negative one. An empty string is 0.
+    """
+    s = s.replace("$", "").replace(",", "").strip()
+    neg = s.startswith("(") and s.endswith(")")
+    s = s.strip("()")
+    val = float(s) if s else 0.0
+    return -val if neg else val
@@ -1,58 +1,141 @@
+import gc
+import logging
+import multiprocessing
+import os
 import pdfplumber
 import re
+import time
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from dataclasses import dataclass
+from functools import lru_cache
 from datetime import datetime
 
+from expense_tracker.utils.amounts import parse_amount
+from expense_tracker.utils.layout import (
+    ColumnLayout,
+    LineParts,
+    TableRegion,
+    assemble_rows,
+    detect_columns,
+    group_lines,
+    split_lines,
+    table_region,
+)
+from expense_tracker.utils.pdfium_backend import PdfiumDocument
+from expense_tracker.utils.settings import get_int_setting, get_setting
+
+logger = logging.getLogger(__name__)
+
 DATE_RX = re.compile(r"^\d{2}/\d{2}/\d{2}$")
 AMOUNT_RX = re.compile(
     r"^(?:-?\$?\s?\d[\d,]*\.?\d{0,2}|\(-?\$?\s?\d[\d,]*\.?\d{0,2}\))$"
 )
+# Anywhere in a page's raw text; pages without one cannot hold a transaction row.
+PAGE_DATE_RX = re.compile(r"\d{2}/\d{2}/\d{2}")
+# An amount's digits in a page's raw text, used to check a table crop keeps them.
+PAGE_AMOUNT_RX = re.compile(r"\d[\d,]*\.\d{2}")
 
+# Table regions learned per statement format, keyed by (producer, page width,
+# page height). Shared by every statement parsed in this process.
+_TABLE_TEMPLATES: dict[tuple, TableRegion] = {}
 
-def parse_bofa_page(page):
-    """Rebuild rows by grouping words by y-position instead of trusting pdfplumber's table."""
-    # group words by y-position
-    words = page.extract_words(use_text_flow=True) or []
-    lines = {}
+# Bump whenever parsed output changes so cached parses are invalidated.
+PARSER_VERSION = 3
 
-    # group nearby words into lines
-    for w in words:
-        ykey = round(w["top"] / 2) * 2  # 2-point vertical tolerance
-        lines.setdefault(ykey, []).append(w)
+# Text extraction backends. pdfium is much faster; its output is checked
+# against pdfplumber on every statement before it is trusted.
+PDFPLUMBER, PDFIUM = "pdfplumber", "pdfium"
+PDF_BACKENDS = (PDFPLUMBER, PDFIUM)
 
-    rows = []
-    for _, wline in sorted(lines.items()):
-        # sort words by x-position and extract text
-        wline.sort(key=lambda w: w["x0"])
+# Pages compared between the backends before pdfium is trusted with a
+# statement: the first and last pages with dates and others spread between.
+PARITY_SAMPLE_PAGES = 4
 
-        # extract tokens and filter out empty ones
-        tokens = [w["text"].strip() for w in wline if w["text"].strip()]
+# Pages parsed per opening of a statement. A document keeps its pages until it
+# is closed, so long statements are reopened every this many pages to keep
+# memory flat.
+DEFAULT_CHUNK_PAGES = 50
 
-        # filter out irrelevant rows
-        if len(tokens) < 3:
-            continue
+# Statements with fewer pages than this are parsed serially; starting worker
+# processes costs more than it saves on short files.
+PARALLEL_MIN_PAGES = 8
 
-        # must begin with a date and end with an amount
-        if not DATE_RX.match(tokens[0]):
-            continue
-        amt_idx = next(
-            (i for i in range(len(tokens) - 1, -1, -1) if AMOUNT_RX.match(tokens[i])),
-            None,
-        )
-        if amt_idx is None:
-            continue
-        desc = " ".join(tokens[1:amt_idx])
-        if desc.lower().startswith("total "):
+
+@dataclass
+class PageFilterStats:
+    """Counts pages skipped by the date pre-check and the time it took."""
+
+    pages: int = 0
+    skipped: int = 0
+    check_seconds: float = 0.0
+    parse_seconds: float = 0.0
+
+    @property
+    def seconds_saved(self) -> float:
+        """
+        Estimated parse time saved: skipped pages times the mean word
+        extraction time of parsed pages, minus the time spent checking.
+        """
+        parsed = self.pages - self.skipped
+        if not parsed:
+            return 0.0
+        return self.skipped * self.parse_seconds / parsed - self.check_seconds
+
+    def merge(self, other: "PageFilterStats") -> None:
+        self.pages += other.pages
+        self.skipped += other.skipped
+        self.check_seconds += other.check_seconds
+        self.parse_seconds += other.parse_seconds
+
+
+def _has_dates(chars: list[dict]) -> bool:
+    """
+    Cheap check for a MM/DD/YY date in a page's raw characters. Cover pages,
+    disclosures and ads have none, so full word extraction can be skipped.
+    """
+    return PAGE_DATE_RX.search("".join(c["text"] for c in chars)) is not None
+
+
+def parse_bofa_page(page, columns: ColumnLayout | None = None) -> list[dict]:
+    """
+    Rebuild rows from word positions instead of trusting pdfplumber's table.
+
+    Column boundaries are detected from the page unless given; they are only
+    needed to join descriptions that wrap onto a continuation line.
+    """
+    parts = _split_page(page)
+    if columns is None:
+        columns = detect_columns(parts)
+    return _rows_from_parts(parts, columns)
+
+
+def _split_page(page) -> list[LineParts]:
+    lines = group_lines(page.extract_words(use_text_flow=True) or [])
+    return split_lines(lines, DATE_RX, AMOUNT_RX)
+
+
+def _rows_from_parts(
+    parts: list[LineParts], columns: ColumnLayout | None
+) -> list[dict]:
+    rows = []
+    for row in assemble_rows(parts, columns):
+        desc = " ".join(row.description)
+        # Total lines look like transactions but summarize them
+        if not desc or desc.lower().startswith("total "):
             continue
         rows.append(
             {
-                "date": _parse_date(tokens[0]),
+                "date": _parse_date(row.date),
                 "description": desc,
-                "amount": _parse_amount(tokens[amt_idx]),
+                "amount": parse_amount(row.amount),
             }
         )
     return rows
 
 
+@lru_cache(maxsize=4096)
 def _parse_date(s):
     for fmt in ("%m/%d/%y", "%m/%d/%Y"):
         try:
@@ -62,17 +145,374 @@ def _parse_date(s):
     return s
 
 
-def _parse_amount(s: str) -> float:
-    s = s.replace("$", "").replace(",", "").strip()
-    neg = s.startswith("(") and s.endswith(")")
-    s = s.strip("()")
-    val = float(s) if s else 0.0
-    return -val if neg else val
+def _text_boxes(chars: list[dict], pattern: re.Pattern) -> list[TableRegion] | None:
+    """
+    Bounding boxes of the matches of `pattern` in a page's raw characters, or
+    None when they cannot be told from the characters.
+    """
+    text = "".join(c["text"] for c in chars)
+    if len(text) != len(chars):
+        # Multi-character glyphs (ligatures) break the index mapping.
+        return None
+    boxes = []
+    for m in pattern.finditer(text):
+        first, last = chars[m.start()], chars[m.end() - 1]
+        boxes.append(
+            TableRegion(
+                first["x0"],
+                min(first["top"], last["top"]),
+                last["x1"],
+                max(first["bottom"], last["bottom"]),
+            )
+        )
+    return boxes
+
+
+def _crop_keeps_rows(template: TableRegion, chars: list[dict]) -> bool:
+    """
+    Whether cropping a page to a learned table region keeps every row whole:
+    all of its dates, and the amounts level with them, lie inside the region.
+    Statements sharing a template key can still place their columns apart.
+    """
+    dates = _text_boxes(chars, PAGE_DATE_RX)
+    amounts = _text_boxes(chars, PAGE_AMOUNT_RX)
+    if not dates or amounts is None:
+        return False
+    if not all(template.contains(box) for box in dates):
+        return False
+    top = min(box.top for box in dates)
+    bottom = max(box.bottom for box in dates)
+    return all(
+        template.contains(box)
+        for box in amounts
+        if top <= (box.top + box.bottom) / 2 <= bottom
+    )
+
+
+def _template_key(page) -> tuple:
+    """Statements from the same producer with the same page size share a layout."""
+    return (
+        page.pdf.metadata.get("Producer"),
+        round(page.width),
+        round(page.height),
+    )
+
+
+def clear_table_templates() -> None:
+    """Forgets every learned table region."""
+    _TABLE_TEMPLATES.clear()
+
+
+class _StatementPageParser:
+    """
+    Parses the pages of one statement in order, carrying layout state from
+    page to page: the detected columns and the table region template.
+    """
+
+    def __init__(self, stats: PageFilterStats):
+        self.stats = stats
+        self.columns: ColumnLayout | None = None
+
+    def parse_and_close(self, page) -> list[dict]:
+        """
+        Parses one page unless it has no dates, then releases its cached
+        layout objects.
+        """
+        try:
+            # Laying out the characters is needed either way, so it is not timed.
+            chars = page.chars
+            self.stats.pages += 1
+            start = time.perf_counter()
+            has_dates = _has_dates(chars)
+            checked = time.perf_counter()
+            self.stats.check_seconds += checked - start
+            if not has_dates:
+                self.stats.skipped += 1
+                return []
+            rows = self._parse(page, chars)
+            self.stats.parse_seconds += time.perf_counter() - checked
+            return rows
+        finally:
+            page.close()
+
+    def _parse(self, page, chars: list[dict]) -> list[dict]:
+        key = _template_key(page)
+        template = _TABLE_TEMPLATES.get(key)
+        if template is not None and _crop_keeps_rows(template, chars):
+            # Every row starts with a date, so no row lies outside the region.
+            crop = page.crop(template.clamp(page.bbox).bbox)
+            try:
+                parts = _split_page(crop)
+            finally:
+                crop.close()
+        else:
+            parts = _split_page(page)
+            learned = table_region(parts)
+            if learned is not None:
+                _TABLE_TEMPLATES[key] = (
+                    learned if template is None else template.union(learned)
+                )
+
+        if self.columns is None:
+            self.columns = detect_columns(parts)
+        return _rows_from_parts(parts, self.columns)
+
+
+def get_pdf_backend() -> str:
+    """Text extraction backend for statement PDFs (SPENDWISE_PDF_BACKEND)."""
+    backend = get_setting("PDF_BACKEND", PDFPLUMBER).strip().lower()
+    if backend not in PDF_BACKENDS:
+        logger.warning(f"Ignoring unknown PDF backend {backend!r}, using {PDFPLUMBER}")
+        return PDFPLUMBER
+    return backend
 
 
-def parse_bofa_statement_pdf(path: str) -> list[dict]:
+def _open_pdf(path: str, backend: str, pages: range | None = None):
+    """Opens a statement, optionally with only the (0-based) pages given."""
+    page_numbers = None if pages is None else range(pages.start + 1, pages.stop + 1)
+    if backend == PDFIUM:
+        return PdfiumDocument(path, page_numbers)
+    pdf = pdfplumber.open(path, pages=page_numbers)
+    # Read objects again when needed instead of keeping every page's content
+    # streams until the document is closed.
+    pdf.doc.caching = False
+    return pdf
+
+
+def _iter_pages(
+    path: str, backend: str, start: int, stop: int | None = None
+) -> Iterator:
+    """
+    Yields pages [start, stop) of a statement, or every page from `start` on,
+    reopening the PDF with only the next get_chunk_pages() pages at a time.
+    Each chunk's document is closed and freed before the next one is opened,
+    so no more than one chunk of pages is ever held.
+    """
+    chunk = get_chunk_pages()
+    while stop is None or start < stop:
+        end = start + chunk if stop is None else min(start + chunk, stop)
+        pages = range(start, end)
+        with _open_pdf(path, backend, pages) as pdf:
+            opened = len(pdf.pages)
+            for page in pdf.pages:
+                yield page
+        # Parsed pages and crops are closed, which drops their layout objects;
+        # a young-generation pass frees the small cycles left around them
+        # without walking the whole heap.
+        gc.collect(0)
+        if opened < len(pages):
+            return  # past the last page
+        start = end
+
+
+def _page_count(path: str, backend: str) -> int:
+    with _open_pdf(path, backend) as pdf:
+        count = len(pdf.pages)
+    gc.collect(0)
+    return count
+
+
+def _parity_sample(first: int, last: int) -> list[int]:
+    """Up to PARITY_SAMPLE_PAGES page indexes spread evenly from first to last."""
+    if last - first < PARITY_SAMPLE_PAGES:
+        return list(range(first, last + 1))
+    step = (last - first) / (PARITY_SAMPLE_PAGES - 1)
+    return [first + round(i * step) for i in range(PARITY_SAMPLE_PAGES)]
+
+
+def _dated_page(pages, indexes) -> int | None:
+    """The first of `indexes` whose page has dates, closing the pages read."""
+    for index in indexes:
+        page = pages[index]
+        dated = _has_dates(page.chars)
+        page.close()
+        if dated:
+            return index
+    return None
+
+
+def _pdfium_matches_pdfplumber(path: str) -> bool:
+    """
+    Parses a sample of the pages with dates with both backends and compares
+    the rows: the first and last such pages and pages spread evenly between
+    them. Statements without dated pages have nothing to compare, so they
+    match.
+    """
+    expected: dict[int, list[dict]] = {}
+    with PdfiumDocument(path) as pdf:
+        count = len(pdf.pages)
+        first = _dated_page(pdf.pages, range(count))
+        if first is None:
+            return True
+        last = _dated_page(pdf.pages, range(count - 1, first - 1, -1))
+        for index in _parity_sample(first, last):
+            page = pdf.pages[index]
+            if _has_dates(page.chars):
+                expected[index] = parse_bofa_page(page)
+            page.close()
+    with pdfplumber.open(path, pages=[index + 1 for index in expected]) as pdf:
+        return all(
+            parse_bofa_page(page) == rows
+            for page, rows in zip(pdf.pages, expected.values())
+        )
+
+
+def _resolve_backend(path: str, backend: str) -> str:
+    """The backend to parse a statement with, falling back to pdfplumber."""
+    if backend != PDFIUM:
+        return PDFPLUMBER
+    try:
+        if _pdfium_matches_pdfplumber(path):
+            return PDFIUM
+        reason = "its rows differ from pdfplumber's"
+    except Exception as e:
+        reason = str(e)
+    logger.warning(f"Not using pdfium for {path} ({reason}), using pdfplumber")
+    return PDFPLUMBER
+
+
+def _statement_columns(path: str, backend: str) -> tuple[ColumnLayout | None, int]:
+    """
+    The columns a serial parse of a statement uses, and the index of the page
+    they are detected on, so page ranges parsed apart can share them.
+    """
+    parser = _StatementPageParser(PageFilterStats())
+    with closing(_iter_pages(path, backend, 0)) as pages:
+        for index, page in enumerate(pages):
+            parser.parse_and_close(page)
+            if parser.columns is not None:
+                return parser.columns, index
+    return None, 0
+
+
+def _parse_page_range(
+    path: str,
+    start: int,
+    stop: int,
+    backend: str = PDFPLUMBER,
+    columns: ColumnLayout | None = None,
+    columns_page: int = 0,
+) -> tuple[list[dict], PageFilterStats]:
+    """
+    Parses pages [start, stop) of a statement, with the statement's columns
+    from page `columns_page` on, like a serial parse. Runs in a worker process.
+    """
     rows = []
-    with pdfplumber.open(path) as pdf:
-        for page in pdf.pages:
-            rows.extend(parse_bofa_page(page))
-    return rows
+    parser = _StatementPageParser(PageFilterStats())
+    for index, page in enumerate(_iter_pages(path, backend, start, stop), start):
+        if index >= columns_page:
+            parser.columns = columns
+        rows.extend(parser.parse_and_close(page))
+    return rows, parser.stats
+
+
+def _split_page_ranges(num_pages: int, parts: int) -> list[tuple[int, int]]:
+    """Splits pages into at most `parts` contiguous, near-equal ranges."""
+    parts = max(1, min(parts, num_pages))
+    size, extra = divmod(num_pages, parts)
+    ranges = []
+    start = 0
+    for i in range(parts):
+        stop = start + size + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def get_chunk_pages() -> int:
+    """Pages parsed per opening of a statement (SPENDWISE_PARSE_CHUNK_PAGES)."""
+    return max(1, get_int_setting("PARSE_CHUNK_PAGES", DEFAULT_CHUNK_PAGES))
+
+
+def parse_worker_pool(max_workers: int) -> ProcessPoolExecutor:
+    """
+    Worker processes for parsing statements. They are spawned rather than
+    forked: parsing is started from threads (the GUI's background tasks), and
+    a child forked from a multithreaded process can deadlock on a lock that
+    another thread, such as a logging handler's, held at the time.
+    """
+    return ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+def get_parse_workers() -> int:
+    """Number of worker processes for statement parsing (SPENDWISE_PARSE_WORKERS)."""
+    return max(1, get_int_setting("PARSE_WORKERS", os.cpu_count() or 1))
+
+
+def _log_page_filter(path: str, stats: PageFilterStats) -> None:
+    logger.info(
+        f"Skipped {stats.skipped} of {stats.pages} page(s) without dates in "
+        f"{path}, saving about {max(stats.seconds_saved, 0.0):.2f}s"
+    )
+
+
+def iter_bofa_statement_rows(
+    path: str,
+    workers: int = 1,
+    stats: PageFilterStats | None = None,
+    backend: str | None = None,
+) -> Iterator[dict]:
+    """
+    Yields the transaction rows of a Bank of America statement in page order.
+
+    Serially, rows are yielded page by page and each page is closed as soon as
+    it is parsed. The PDF is reopened every SPENDWISE_PARSE_CHUNK_PAGES pages,
+    so memory use does not grow with the statement's length. With more than
+    one worker and at least PARALLEL_MIN_PAGES pages, page ranges are parsed
+    in separate processes that each open the file, and each range is yielded
+    as soon as it and all earlier ranges are done. The columns are detected
+    first and shared by every range, so the rows are the same either way.
+
+    Pages without a date are skipped before word extraction; pass `stats` to
+    collect how many were skipped. Table columns are detected on the first
+    transaction page and reused for the rest of the statement. The table's
+    region is remembered per statement format, and pages whose dates all lie
+    inside it are cropped to it before word extraction.
+
+    Text is extracted with the backend given, or the SPENDWISE_PDF_BACKEND
+    setting. The pdfium backend is only used when it produces the same rows
+    as pdfplumber on a sample of the statement's pages with dates; see
+    _pdfium_matches_pdfplumber.
+    """
+    if stats is None:
+        stats = PageFilterStats()
+    backend = _resolve_backend(path, backend or get_pdf_backend())
+    # Counting pages reads the whole page tree, so only do it to split work.
+    num_pages = _page_count(path, backend) if workers > 1 else 0
+    if workers <= 1 or num_pages < PARALLEL_MIN_PAGES:
+        parser = _StatementPageParser(stats)
+        for page in _iter_pages(path, backend, 0):
+            yield from parser.parse_and_close(page)
+        _log_page_filter(path, stats)
+        return
+
+    ranges = _split_page_ranges(num_pages, workers)
+    columns, columns_page = _statement_columns(path, backend)
+    with parse_worker_pool(len(ranges)) as executor:
+        chunks = executor.map(
+            _parse_page_range,
+            [path] * len(ranges),
+            [start for start, _ in ranges],
+            [stop for _, stop in ranges],
+            [backend] * len(ranges),
+            [columns] * len(ranges),
+            [columns_page] * len(ranges),
+        )
+        for rows, chunk_stats in chunks:
+            stats.merge(chunk_stats)
+            yield from rows
+    _log_page_filter(path, stats)
+
+
+def parse_bofa_statement_pdf(path: str, workers: int | None = None) -> list[dict]:
+    """
+    Parses every transaction row of a Bank of America statement, in page order.
+
+    Workers default to the SPENDWISE_PARSE_WORKERS setting; see
+    iter_bofa_statement_rows for when parsing runs in parallel.
+    """
+    if workers is None:
+        workers = get_parse_workers()
+    return list(iter_bofa_statement_rows(path, workers))
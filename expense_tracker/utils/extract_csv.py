@@ -0,0 +1,128 @@
+import csv
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime
+
+from expense_tracker.utils.amounts import parse_amount
+
+DATE_FORMATS = ("%m/%d/%Y", "%Y-%m-%d", "%m/%d/%y", "%d-%b-%Y")
+
+# Header names banks use for each column, compared case-insensitively.
+DATE_COLUMNS = (
+    "date",
+    "posted date",
+    "posting date",
+    "transaction date",
+    "trans. date",
+)
+DESCRIPTION_COLUMNS = ("description", "payee", "name", "merchant", "memo")
+AMOUNT_COLUMNS = ("amount", "transaction amount")
+DEBIT_COLUMNS = ("debit", "withdrawal", "withdrawals")
+CREDIT_COLUMNS = ("credit", "deposit", "deposits")
+
+# Header rows are searched for this many lines, past any account summary.
+HEADER_SEARCH_LINES = 20
+
+
+@dataclass
+class CsvColumns:
+    """
+    Maps statement fields to CSV header names. Either `amount` or at least one
+    of `debit` and `credit` must be set; debits are stored as negative amounts.
+    """
+
+    date: str
+    description: str
+    amount: str | None = None
+    debit: str | None = None
+    credit: str | None = None
+
+
+def _find(header: list[str], names: tuple[str, ...]) -> str | None:
+    lowered = {h.strip().lower(): h for h in header}
+    return next((lowered[name] for name in names if name in lowered), None)
+
+
+def detect_csv_columns(header: list[str]) -> CsvColumns | None:
+    """Returns the column mapping for a header row, or None if it is not one."""
+    date = _find(header, DATE_COLUMNS)
+    description = _find(header, DESCRIPTION_COLUMNS)
+    amount = _find(header, AMOUNT_COLUMNS)
+    debit = _find(header, DEBIT_COLUMNS)
+    credit = _find(header, CREDIT_COLUMNS)
+    if date is None or description is None or not (amount or debit or credit):
+        return None
+    return CsvColumns(date, description, amount, debit, credit)
+
+
+def _parse_csv_date(raw: str) -> str:
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(raw, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return raw
+
+
+def _row_amount(record: dict[str, str], columns: CsvColumns) -> float | str | None:
+    """The row's amount, None when it has none, or the raw text if unreadable."""
+    if columns.amount is not None:
+        raw = (record.get(columns.amount) or "").strip()
+        if not raw:
+            return None
+        try:
+            return parse_amount(raw)
+        except ValueError:
+            return raw
+    debit = (record.get(columns.debit) or "").strip() if columns.debit else ""
+    credit = (record.get(columns.credit) or "").strip() if columns.credit else ""
+    if not debit and not credit:
+        return None
+    try:
+        return (parse_amount(credit) if credit else 0.0) - (
+            abs(parse_amount(debit)) if debit else 0.0
+        )
+    except ValueError:
+        return debit or credit
+
+
+def iter_csv_rows(path: str, columns: CsvColumns | None = None) -> Iterator[dict]:
+    """
+    Yields transaction rows from a CSV export, one line at a time.
+
+    The header row is found among the first lines, skipping account summaries
+    that some banks put above it, and mapped with detect_csv_columns unless
+    `columns` is given. Rows without an amount (such as beginning balance
+    lines) are skipped. Like the PDF parser, unreadable dates and amounts are
+    passed through as text for the importer to reject.
+    """
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = None
+        for line_number, record in enumerate(reader, 1):
+            if columns is not None:
+                if columns.date in record and columns.description in record:
+                    header = record
+            else:
+                found = detect_csv_columns(record)
+                if found is not None:
+                    header, columns = record, found
+            if header is not None:
+                break
+            if line_number >= HEADER_SEARCH_LINES:
+                break
+        if header is None:
+            raise ValueError(f"No transaction header row found in {path}")
+
+        for values in reader:
+            if not any(v.strip() for v in values):
+                continue
+            record = dict(zip(header, values))
+            amount = _row_amount(record, columns)
+            if amount is None:
+                continue
+            yield {
+                "date": _parse_csv_date(record.get(columns.date, "").strip()),
+                "description": " ".join(record.get(columns.description, "").split()),
+                "amount": amount,
+            }
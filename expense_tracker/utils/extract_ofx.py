@@ -0,0 +1,84 @@
+import re
+from collections.abc import Iterator
+from datetime import datetime
+
+# An opening or closing tag and the text after it. OFX 1.x (SGML) leaves most
+# elements unclosed, so a value runs until the next tag.
+TAG_RX = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _iter_tags(f) -> Iterator[tuple[bool, str, str]]:
+    """Yields (closing, name, value) for every tag, reading in chunks."""
+    buffer = ""
+    while chunk := f.read(CHUNK_SIZE):
+        buffer += chunk
+        # The last tag may continue in the next chunk.
+        cut = buffer.rfind("<")
+        complete, buffer = buffer[:cut], buffer[cut:]
+        for m in TAG_RX.finditer(complete):
+            yield m.group(1) == "/", m.group(2).upper(), m.group(3).strip()
+    for m in TAG_RX.finditer(buffer):
+        yield m.group(1) == "/", m.group(2).upper(), m.group(3).strip()
+
+
+def _encoding(path: str) -> str:
+    """UTF-8 when the OFX header says so, otherwise the usual Windows-1252."""
+    with open(path, "rb") as f:
+        head = f.read(1024).upper()
+    if b"ENCODING:UTF-8" in head or b'ENCODING="UTF-8"' in head:
+        return "utf-8"
+    return "cp1252"
+
+
+def _parse_ofx_date(raw: str) -> str:
+    """Converts an OFX date (YYYYMMDD, optionally followed by a time) to ISO."""
+    try:
+        return datetime.strptime(raw[:8], "%Y%m%d").date().isoformat()
+    except ValueError:
+        return raw
+
+
+def _unescape(value: str) -> str:
+    return (
+        value.replace("&lt;", "<")
+        .replace("&gt;", ">")
+        .replace("&quot;", '"')
+        .replace("&apos;", "'")
+        .replace("&amp;", "&")
+    )
+
+
+def _row(fields: dict[str, str]) -> dict | None:
+    if "DTPOSTED" not in fields or "TRNAMT" not in fields:
+        return None
+    description = fields.get("NAME") or fields.get("MEMO") or fields.get("PAYEE", "")
+    try:
+        amount: float | str = float(fields["TRNAMT"].replace(",", ""))
+    except ValueError:
+        amount = fields["TRNAMT"]
+    return {
+        "date": _parse_ofx_date(fields["DTPOSTED"]),
+        "description": " ".join(_unescape(description).split()),
+        "amount": amount,
+    }
+
+
+def iter_ofx_rows(path: str) -> Iterator[dict]:
+    """
+    Yields transaction rows from an OFX or QFX download (SGML or XML) as its
+    STMTTRN elements are read, without loading the whole file.
+    """
+    with open(path, encoding=_encoding(path), errors="replace", newline="") as f:
+        fields: dict[str, str] | None = None
+        for closing, name, value in _iter_tags(f):
+            if name == "STMTTRN":
+                if fields is not None:
+                    # The closing tag, or a new transaction, ends the current one.
+                    row = _row(fields)
+                    if row is not None:
+                        yield row
+                fields = None if closing else {}
+            elif fields is not None and not closing and value:
+                fields[name] = value
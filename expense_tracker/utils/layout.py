@@ -0,0 +1,256 @@
+import re
+from dataclasses import dataclass, field
+from operator import itemgetter
+from statistics import median
+from typing import NamedTuple
+
+# Words whose tops are within this many points belong to the same line.
+LINE_TOLERANCE = 2.0
+
+# A continuation line may start this far left of the description column.
+COLUMN_TOLERANCE = 4.0
+
+# A continuation line starts at most this many line heights below the row above.
+CONTINUATION_MAX_GAP = 2.0
+
+# Padding around a detected table region so wider amounts and wrapped lines
+# on later pages still fall inside it.
+REGION_PADDING = 24.0
+
+_TOP = itemgetter("top")
+_X0 = itemgetter("x0")
+
+
+@dataclass
+class Line:
+    """Words sharing a baseline, in left-to-right order."""
+
+    top: float
+    bottom: float
+    words: list[dict] = field(default_factory=list)
+
+
+@dataclass
+class ColumnLayout:
+    """Column x-boundaries of a statement's transaction table."""
+
+    description_x0: float
+    amount_x0: float
+    line_height: float
+
+
+@dataclass
+class LayoutRow:
+    """Raw text of one transaction row, possibly spanning several lines."""
+
+    date: str
+    description: list[str]
+    amount: str | None
+
+
+@dataclass(frozen=True)
+class TableRegion:
+    """Bounding box of a transaction table, in page coordinates."""
+
+    x0: float
+    top: float
+    x1: float
+    bottom: float
+
+    def contains(self, other: "TableRegion") -> bool:
+        return (
+            self.x0 <= other.x0
+            and self.top <= other.top
+            and other.x1 <= self.x1
+            and other.bottom <= self.bottom
+        )
+
+    def union(self, other: "TableRegion") -> "TableRegion":
+        return TableRegion(
+            min(self.x0, other.x0),
+            min(self.top, other.top),
+            max(self.x1, other.x1),
+            max(self.bottom, other.bottom),
+        )
+
+    def clamp(self, bbox: tuple[float, float, float, float]) -> "TableRegion":
+        """Limits the region to a page's bounding box."""
+        x0, top, x1, bottom = bbox
+        return TableRegion(
+            max(self.x0, x0),
+            max(self.top, top),
+            min(self.x1, x1),
+            min(self.bottom, bottom),
+        )
+
+    @property
+    def bbox(self) -> tuple[float, float, float, float]:
+        return (self.x0, self.top, self.x1, self.bottom)
+
+
+class LineParts(NamedTuple):
+    """A line split into its leading date, middle words and trailing amount."""
+
+    line: Line
+    date: str | None
+    middle: list[dict]
+    middle_texts: list[str]
+    amount: str | None
+    amount_x0: float | None
+
+
+def group_lines(words: list[dict], tolerance: float = LINE_TOLERANCE) -> list[Line]:
+    """
+    Groups words into lines in one pass over the words sorted by position.
+    A word joins the current line while its top is within `tolerance` of the
+    line's first word, so a line is never split across a rounding boundary.
+    """
+    lines: list[Line] = []
+    current: Line | None = None
+    for w in sorted(words, key=_TOP):
+        top = w["top"]
+        if current is None or top - current.top > tolerance:
+            current = Line(top=top, bottom=top)
+            lines.append(current)
+        current.words.append(w)
+        bottom = w.get("bottom", top)
+        if bottom > current.bottom:
+            current.bottom = bottom
+    for line in lines:
+        line.words.sort(key=_X0)
+    return lines
+
+
+def split_lines(
+    lines: list[Line], date_rx: re.Pattern, amount_rx: re.Pattern
+) -> list[LineParts]:
+    """
+    Splits each line once into a leading date, the words in between and the
+    right-most amount. Words after the amount are dropped.
+    """
+    parts = []
+    for line in lines:
+        words = line.words
+        texts = [w["text"].strip() for w in words]
+        if "" in texts:
+            kept = [(w, t) for w, t in zip(words, texts) if t]
+            words, texts = [w for w, _ in kept], [t for _, t in kept]
+
+        start, date = 0, None
+        if texts and date_rx.match(texts[0]):
+            start, date = 1, texts[0]
+        stop, amount, amount_x0 = len(texts), None, None
+        for i in range(len(texts) - 1, start - 1, -1):
+            if amount_rx.match(texts[i]):
+                stop, amount, amount_x0 = i, texts[i], words[i]["x0"]
+                break
+        parts.append(
+            LineParts(
+                line, date, words[start:stop], texts[start:stop], amount, amount_x0
+            )
+        )
+    return parts
+
+
+def detect_columns(parts: list[LineParts]) -> ColumnLayout | None:
+    """
+    Finds the description and amount columns from lines that start with a date
+    and end with an amount. Returns None when no such line exists.
+    """
+    description_x0s, amount_x0s, heights = [], [], []
+    for p in parts:
+        if p.date is None or p.amount is None or not p.middle:
+            continue
+        description_x0s.append(p.middle[0]["x0"])
+        amount_x0s.append(p.amount_x0)
+        heights.append(p.line.bottom - p.line.top)
+    if not description_x0s:
+        return None
+    return ColumnLayout(
+        description_x0=median(description_x0s),
+        amount_x0=min(amount_x0s),
+        line_height=median(heights),
+    )
+
+
+def table_region(
+    parts: list[LineParts], padding: float = REGION_PADDING
+) -> TableRegion | None:
+    """
+    Returns the padded bounding box of the lines that start with a date and
+    end with an amount, or None when there are none.
+    """
+    region = None
+    for p in parts:
+        if p.date is None or p.amount is None:
+            continue
+        words = p.line.words
+        line_region = TableRegion(
+            words[0]["x0"],
+            p.line.top,
+            max(w.get("x1", w["x0"]) for w in words),
+            p.line.bottom,
+        )
+        region = line_region if region is None else region.union(line_region)
+    if region is None:
+        return None
+    return TableRegion(
+        region.x0 - padding,
+        region.top - padding,
+        region.x1 + padding,
+        region.bottom + padding,
+    )
+
+
+def assemble_rows(
+    parts: list[LineParts], columns: ColumnLayout | None
+) -> list[LayoutRow]:
+    """
+    Assembles transaction rows from split lines in a single pass.
+
+    A row starts on a line beginning with a date. Dateless lines right below
+    it whose words sit inside the description column are continuations: their
+    text is appended to the description, and they may carry the amount when
+    the first line did not. Rows that never get an amount are dropped.
+    """
+    rows: list[LayoutRow] = []
+    pending: LayoutRow | None = None
+    previous: Line | None = None
+    for p in parts:
+        if p.date is not None:
+            if pending is not None and pending.amount is not None:
+                rows.append(pending)
+            pending = LayoutRow(p.date, p.middle_texts, p.amount)
+        elif pending is not None and _is_continuation(p, previous, pending, columns):
+            pending.description.extend(p.middle_texts)
+            if p.amount is not None:
+                pending.amount = p.amount
+        else:
+            if pending is not None and pending.amount is not None:
+                rows.append(pending)
+            pending = None
+        previous = p.line
+    if pending is not None and pending.amount is not None:
+        rows.append(pending)
+    return rows
+
+
+def _is_continuation(
+    p: LineParts,
+    previous: Line | None,
+    pending: LayoutRow,
+    columns: ColumnLayout | None,
+) -> bool:
+    if columns is None or previous is None or not p.middle:
+        return False
+    if p.line.top - previous.bottom > columns.line_height * CONTINUATION_MAX_GAP:
+        return False
+    if p.middle[0]["x0"] < columns.description_x0 - COLUMN_TOLERANCE:
+        return False
+    if p.middle[-1].get("x1", p.middle[-1]["x0"]) > columns.amount_x0:
+        return False
+    if p.amount is not None and (
+        pending.amount is not None or p.amount_x0 < columns.amount_x0 - COLUMN_TOLERANCE
+    ):
+        return False
+    return not p.middle_texts[0].lower().startswith("total")
@@ -0,0 +1,242 @@
+import math
+from collections import Counter
+from collections.abc import Iterable
+from itertools import chain
+
+NGRAM_SIZE = 3
+
+# WRatio length ratios: below SIMILAR_LENGTH_RATIO it compares whole strings,
+# up to and including PARTIAL_LENGTH_RATIO it needs an exact substring to reach
+# a score of 90, and beyond that it caps the score at 60.
+SIMILAR_LENGTH_RATIO = 1.5
+PARTIAL_LENGTH_RATIO = 8.0
+
+# The lowest score cutoff the pruning is exact for, and the scales WRatio
+# applies to ratio and to the token ratios.
+MIN_SCORE_CUTOFF = 90
+RATIO_SCALE = 100
+TOKEN_SCALE = 95
+
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i : i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+def _token_trigrams(text: str) -> set[str]:
+    # Trigrams inside a token survive token_sort and token_set reordering.
+    return set().union(*(_trigrams(token) for token in text.split()))
+
+
+def _short_tokens(text: str) -> set[str]:
+    # Short tokens such as "SQ" have no trigrams of their own to share, so they
+    # link strings as whole tokens. Longer tokens share their trigrams instead.
+    return {f"w:{token}" for token in text.split() if len(token) < NGRAM_SIZE}
+
+
+def _max_edits(total_length: int, scale: int) -> int:
+    """Returns the largest Indel distance that still reaches the score cutoff."""
+    return (scale - MIN_SCORE_CUTOFF) * total_length // scale
+
+
+def _token_set_tolerance(size: int) -> int:
+    """
+    Characters of unshared tokens token_set_ratio tolerates next to the tokens
+    a string of this size shares, while still reaching the score cutoff.
+    """
+    return 2 * (TOKEN_SCALE - MIN_SCORE_CUTOFF) * size // MIN_SCORE_CUTOFF
+
+
+def _min_shared(size: int, length: int, distinct: int, in_tokens: int) -> int:
+    """
+    Returns how many distinct trigrams a key of the given length must share
+    with a query to reach the score cutoff, judging by the query alone.
+
+    Each character only in one string breaks at most three of its trigrams
+    (q-gram lemma), so a string keeps its distinct trigrams minus three per
+    edit. ``distinct`` and ``in_tokens`` count the query's distinct trigrams
+    overall and inside its tokens.
+    """
+    # token_set_ratio when the query's tokens are all in the key.
+    bounds = [in_tokens]
+    # ratio: characters only in the query break three trigrams, characters
+    # only in the key two, and the distance has the parity of both lengths.
+    edits = _max_edits(size + length, RATIO_SCALE)
+    edits -= (edits - size - length) % 2
+    if edits >= abs(length - size):
+        only_query = (edits - length + size) // 2
+        only_key = (edits + length - size) // 2
+        bounds.append(distinct - 3 * only_query - 2 * only_key)
+    # token_sort_ratio, and token_set_ratio comparing both token sets, reorder
+    # tokens, so only trigrams inside tokens are sure to survive.
+    bounds.append(in_tokens - 3 * _max_edits(size + length, TOKEN_SCALE))
+    # token_set_ratio comparing the shared tokens with the query's tokens.
+    bounds.append(in_tokens - _token_set_tolerance(size))
+    return min(bounds)
+
+
+def _bag_distance(first: Iterable[str], second: Iterable[str]) -> int:
+    # Each character counted in only one string costs at least one Indel edit,
+    # however the tokens are ordered.
+    counts = Counter(chain.from_iterable(first))
+    counts.subtract(chain.from_iterable(second))
+    return sum(map(abs, counts.values()))
+
+
+def _may_match(query: str, key: str) -> bool:
+    """
+    Checks whether two strings of similar length can reach the score cutoff,
+    judging by the characters of their tokens.
+    """
+    total = len(query) + len(key)
+    query_tokens, key_tokens = query.split(), key.split()
+    # ratio and token_sort_ratio compare every token.
+    if _bag_distance(query_tokens, key_tokens) <= _max_edits(total, RATIO_SCALE):
+        return True
+    # token_set_ratio compares the tokens either string does not share,
+    query_set, key_set = set(query_tokens), set(key_tokens)
+    if _bag_distance(query_set, key_set) <= _max_edits(total, TOKEN_SCALE):
+        return True
+    # or the shared tokens with either string's tokens, if the rest are short.
+    return bool(query_set & key_set) and (
+        sum(map(len, query_set - key_set)) <= _token_set_tolerance(len(query))
+        or sum(map(len, key_set - query_set)) <= _token_set_tolerance(len(key))
+    )
+
+
+class NGramIndex:
+    """
+    A character trigram inverted index used to prune fuzzy match candidates.
+
+    Postings are bucketed by key length so a lookup only touches keys whose
+    length can still reach a ``WRatio`` score of 90 against the query:
+
+    - similar lengths (ratio below 1.5): keys sharing enough trigrams, or a
+      token too short to have any. Every edit breaks at most three trigrams,
+      so a score of 90 bounds how few trigrams a match can share. Keys left
+      must also have nearly the same characters, so keys sharing only a
+      common word are dropped and candidates grow sublinearly
+    - 1.5x to 8x apart: the shorter string must be an exact substring of the
+      longer one, so the key must contain every query trigram or vice versa
+    - more than 8x apart: never a candidate
+
+    Scoring only the candidates therefore gives the same result as scoring
+    every key, as long as the score cutoff is 90 or above. Candidates are
+    returned in insertion order so ties resolve the same way too.
+    """
+
+    def __init__(self, keys: Iterable[str] = ()):
+        self._keys: list[str] = []
+        self._positions: dict[str, int] = {}
+        self._trigram_counts: list[int] = []
+        self._key_min_shared: list[int] = []
+        self._postings: dict[str, dict[int, set[int]]] = {}
+        self._short: set[int] = set()
+        for key in keys:
+            self.add(key)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._positions
+
+    @property
+    def keys(self) -> list[str]:
+        """All indexed keys in insertion order."""
+        return self._keys
+
+    def add(self, key: str) -> None:
+        """Adds a key to the index. Adding an existing key is a no-op."""
+        if key in self._positions:
+            return
+        position = len(self._keys)
+        self._keys.append(key)
+        self._positions[key] = position
+
+        trigrams = _trigrams(key)
+        self._trigram_counts.append(len(trigrams))
+        # token_set_ratio also matches when the key's tokens are (nearly) all in
+        # the query, which only the key's own trigrams bound.
+        self._key_min_shared.append(
+            len(_token_trigrams(key)) - _token_set_tolerance(len(key))
+        )
+        if not trigrams and key:
+            self._short.add(position)
+        for term in trigrams | _short_tokens(key):
+            self._postings.setdefault(term, {}).setdefault(len(key), set()).add(
+                position
+            )
+
+    def _postings_in(self, term: str, low: float, high: float) -> list[set[int]]:
+        """Returns the postings of a term for key lengths in [low, high)."""
+        by_length = self._postings.get(term)
+        if not by_length:
+            return []
+        return [p for length, p in by_length.items() if low <= length < high]
+
+    def candidates(self, query: str) -> list[str]:
+        """Returns the keys that may fuzzy match the query, in insertion order."""
+        size = len(query)
+        if size < NGRAM_SIZE:
+            # Short queries can be a substring of any key, so nothing is pruned.
+            return list(self._keys)
+
+        trigrams = _trigrams(query)
+        positions = set(
+            i for i in self._short if len(self._keys[i]) * PARTIAL_LENGTH_RATIO >= size
+        )
+
+        # Similar lengths: enough shared trigrams, or a shared short token.
+        low, high = size / SIMILAR_LENGTH_RATIO, size * SIMILAR_LENGTH_RATIO
+        similar_positions: set[int] = set()
+        for term in _short_tokens(query):
+            for posting in self._postings_in(term, math.nextafter(low, math.inf), high):
+                similar_positions |= posting
+        similar: dict[int, list[set[int]]] = {}
+        for term in trigrams:
+            for length, posting in self._postings.get(term, {}).items():
+                if low < length < high:
+                    similar.setdefault(length, []).append(posting)
+        in_tokens = len(_token_trigrams(query))
+        for length, postings in similar.items():
+            shared = Counter(chain.from_iterable(postings))
+            needed = _min_shared(size, length, len(trigrams), in_tokens)
+            # Every key here shares at least one trigram, so bounds below one
+            # need no special case.
+            similar_positions.update(
+                i
+                for i, count in shared.items()
+                if count >= needed or count >= self._key_min_shared[i]
+            )
+        positions.update(
+            i for i in similar_positions if _may_match(query, self._keys[i])
+        )
+
+        # Shorter keys must be a substring of the query.
+        shared = Counter(
+            chain.from_iterable(
+                posting
+                for term in trigrams
+                for posting in self._postings_in(
+                    term, size / PARTIAL_LENGTH_RATIO, low + 1e-9
+                )
+            )
+        )
+        positions.update(i for i, n in shared.items() if n == self._trigram_counts[i])
+
+        # Longer keys must contain the query.
+        longer: set[int] | None = None
+        for term in sorted(trigrams, key=self._posting_size):
+            found = set().union(
+                *self._postings_in(term, high, size * PARTIAL_LENGTH_RATIO + 1)
+            )
+            longer = found if longer is None else longer & found
+            if not longer:
+                break
+        if longer:
+            positions |= longer
+
+        return [self._keys[i] for i in sorted(positions)]
+
+    def _posting_size(self, term: str) -> int:
+        return sum(len(p) for p in self._postings.get(term, {}).values())
@@ -0,0 +1,110 @@
+import hashlib
+import json
+import logging
+import mmap
+import os
+import zlib
+from pathlib import Path
+
+from expense_tracker.utils.extract import PARSER_VERSION
+from expense_tracker.utils.path import get_data_directory
+from expense_tracker.utils.settings import get_int_setting
+
+logger = logging.getLogger(__name__)
+
+ROW_FIELDS = ("date", "description", "amount")
+
+
+def hash_file(path: str) -> str:
+    """Returns the SHA-256 of a file's contents, read through a memory map."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return digest.hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            digest.update(mapped)
+    return digest.hexdigest()
+
+
+def _encode_rows(rows: list[dict]) -> bytes:
+    # Column-oriented JSON avoids repeating the keys for every row.
+    columns = {name: [row[name] for row in rows] for name in ROW_FIELDS}
+    return zlib.compress(json.dumps(columns, separators=(",", ":")).encode("utf-8"))
+
+
+def _decode_rows(data: bytes) -> list[dict]:
+    columns = json.loads(zlib.decompress(data).decode("utf-8"))
+    return [dict(zip(ROW_FIELDS, values)) for values in zip(*columns.values())]
+
+
+class ParseCache:
+    """
+    An on-disk cache of parsed statement rows keyed by file content hash.
+
+    Entries are tied to the parser version, so a parser change makes old
+    entries misses. The total size is bounded: when it goes over max_bytes the
+    least recently used entries are deleted first.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def default(cls) -> "ParseCache":
+        """The cache in the app data directory, sized by SPENDWISE_PARSE_CACHE_MB."""
+        max_mb = get_int_setting("PARSE_CACHE_MB", 64)
+        return cls(get_data_directory() / "parse_cache", max_mb * 1024 * 1024)
+
+    def _entry_path(self, digest: str) -> Path:
+        return self.directory / f"{digest}.v{PARSER_VERSION}.rows"
+
+    def get(self, digest: str) -> list[dict] | None:
+        """Returns the cached rows for a content hash, or None on a miss."""
+        path = self._entry_path(digest)
+        try:
+            rows = _decode_rows(path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, zlib.error) as e:
+            logger.warning(f"Dropping unreadable parse cache entry {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+        # The modification time doubles as the last-used time for eviction.
+        os.utime(path)
+        return rows
+
+    def put(self, digest: str, rows: list[dict]) -> None:
+        """Stores parsed rows, then evicts entries until the cache fits."""
+        path = self._entry_path(digest)
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            tmp_path.write_bytes(_encode_rows(rows))
+            os.replace(tmp_path, path)
+            self._evict()
+        except OSError as e:
+            # A cache that cannot be written only costs a re-parse later.
+            logger.warning(f"Could not write parse cache entry {path.name}: {e}")
+
+    def clear(self) -> None:
+        for entry in self.directory.glob("*.rows"):
+            entry.unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        current_suffix = f".v{PARSER_VERSION}.rows"
+        entries = []
+        for entry in self.directory.glob("*.rows"):
+            if not entry.name.endswith(current_suffix):
+                # Written by another parser version, never readable again.
+                entry.unlink(missing_ok=True)
+                continue
+            stat = entry.stat()
+            entries.append((stat.st_mtime_ns, stat.st_size, entry))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            total -= size
@@ -0,0 +1,169 @@
+from collections.abc import Iterable
+
+import pypdfium2
+
+# Same defaults as pdfplumber's extract_words, so both backends split words
+# alike.
+X_TOLERANCE = 3.0
+Y_TOLERANCE = 3.0
+
+
+def _words_from_chars(chars: list[dict]) -> list[dict]:
+    """
+    Joins characters into words in text-flow order, the way pdfplumber does
+    with use_text_flow=True: whitespace ends a word, and so does a character
+    that starts left of the previous one, too far right of it, or on another
+    line.
+    """
+    words = []
+    current: list[dict] = []
+    for char in chars:
+        if char["text"].isspace():
+            if current:
+                words.append(_merge(current))
+                current = []
+            continue
+        if current:
+            prev = current[-1]
+            if (
+                char["x0"] < prev["x0"]
+                or char["x0"] > prev["x1"] + X_TOLERANCE
+                or abs(char["top"] - prev["top"]) > Y_TOLERANCE
+            ):
+                words.append(_merge(current))
+                current = []
+        current.append(char)
+    if current:
+        words.append(_merge(current))
+    return words
+
+
+def _merge(chars: list[dict]) -> dict:
+    return {
+        "text": "".join(c["text"] for c in chars),
+        "x0": min(c["x0"] for c in chars),
+        "x1": max(c["x1"] for c in chars),
+        "top": min(c["top"] for c in chars),
+        "bottom": max(c["bottom"] for c in chars),
+    }
+
+
+class PdfiumPage:
+    """
+    A page read with pypdfium2, offering the parts of pdfplumber's Page that
+    statement parsing uses: chars, extract_words, crop, bbox and close.
+
+    Characters are read once, on first use, with pdfium's loose character
+    boxes, whose left and right edges match pdfminer's glyph advances.
+    """
+
+    def __init__(self, pdf: "PdfiumDocument", index: int):
+        self.pdf = pdf
+        self.index = index
+        self.page_number = index + 1
+        self.width, self.height = pdf.document.get_page_size(index)
+        self.bbox = (0, 0, self.width, self.height)
+        self._chars: list[dict] | None = None
+
+    @property
+    def chars(self) -> list[dict]:
+        if self._chars is None:
+            self._chars = self._read_chars()
+        return self._chars
+
+    def _read_chars(self) -> list[dict]:
+        page = self.pdf.document[self.index]
+        textpage = page.get_textpage()
+        try:
+            count = textpage.count_chars()
+            text = textpage.get_text_range()
+            if len(text) != count:
+                # Characters outside the BMP shift the index mapping.
+                raise ValueError(
+                    f"pdfium text does not match its characters on page "
+                    f"{self.page_number}"
+                )
+            chars = []
+            for i, ch in enumerate(text):
+                if ch in "\r\n":
+                    # Line breaks pdfium generated between text runs.
+                    chars.append(
+                        {"text": " ", "x0": 0.0, "x1": 0.0, "top": 0.0, "bottom": 0.0}
+                    )
+                    continue
+                left, bottom, right, top = textpage.get_charbox(i, loose=True)
+                chars.append(
+                    {
+                        "text": ch,
+                        "x0": left,
+                        "x1": right,
+                        "top": self.height - top,
+                        "bottom": self.height - bottom,
+                    }
+                )
+            return chars
+        finally:
+            textpage.close()
+            page.close()
+
+    def extract_words(self, use_text_flow: bool = True) -> list[dict]:
+        return _words_from_chars(self.chars)
+
+    def crop(self, bbox: tuple[float, float, float, float]) -> "PdfiumCrop":
+        return PdfiumCrop(self, bbox)
+
+    def close(self) -> None:
+        """Drops the characters read from the page."""
+        self._chars = None
+
+
+class PdfiumCrop:
+    """The characters of a PdfiumPage whose centers lie inside a bounding box."""
+
+    def __init__(self, page: PdfiumPage, bbox: tuple[float, float, float, float]):
+        self.page = page
+        self.bbox = bbox
+
+    @property
+    def chars(self) -> list[dict]:
+        x0, top, x1, bottom = self.bbox
+        return [
+            c
+            for c in self.page.chars
+            if x0 <= (c["x0"] + c["x1"]) / 2 <= x1
+            and top <= (c["top"] + c["bottom"]) / 2 <= bottom
+        ]
+
+    def extract_words(self, use_text_flow: bool = True) -> list[dict]:
+        return _words_from_chars(self.chars)
+
+    def close(self) -> None:
+        """Nothing to release: the characters belong to the page."""
+
+
+class PdfiumDocument:
+    """
+    A statement PDF opened with pypdfium2, used like a pdfplumber PDF. Like
+    pdfplumber.open, `pages` limits the document to those 1-based page numbers.
+    """
+
+    def __init__(self, path: str, pages: Iterable[int] | None = None):
+        self.document = pypdfium2.PdfDocument(path)
+        try:
+            self.metadata = self.document.get_metadata_dict()
+            count = len(self.document)
+            if pages is None:
+                pages = range(1, count + 1)
+            self.pages = [PdfiumPage(self, n - 1) for n in pages if 1 <= n <= count]
+        except Exception:
+            self.document.close()
+            raise
+
+    def close(self) -> None:
+        self.document.close()
+
+    def __enter__(self) -> "PdfiumDocument":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,100 @@
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+# Rows fetched per query, and blocks kept, when scrolling a long list.
+DEFAULT_BLOCK_SIZE = 200
+DEFAULT_MAX_BLOCKS = 5
+
+
+class RowBlockCache:
+    """
+    Serves rows of a long ordered result by position, fetching fixed-size
+    blocks on demand and keeping only the most recently used ones, so memory
+    stays bounded however many rows there are.
+
+    `fetch(limit, offset)` returns rows like the repository's paged queries,
+    and `count()` the total number of rows. Both are only called when needed;
+    `clear()` forgets everything so the next access sees fresh data.
+
+    With `key`, the sort key of a row, blocks are fetched by keyset instead:
+    `fetch(limit, offset, after=key)` returns rows following the row with
+    that key (from the start when it is None), skipping `offset` of them.
+    The key of each full block's last row is remembered, so fetching the
+    block after a known one, or fetching a block again, costs the same at any
+    depth; a jump to a block never reached skips rows from the nearest key.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[..., list],
+        count: Callable[[], int],
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        max_blocks: int = DEFAULT_MAX_BLOCKS,
+        key: Callable[[Any], Any] | None = None,
+    ):
+        self.fetch = fetch
+        self.count = count
+        self.block_size = block_size
+        self.max_blocks = max_blocks
+        self.key = key
+        self._blocks: OrderedDict[int, list] = OrderedDict()
+        # Sort key of the last row of each full block fetched, by block index
+        self._block_ends: dict[int, Any] = {}
+        self._count: int | None = None
+
+    def __len__(self) -> int:
+        if self._count is None:
+            self._count = self.count()
+        return self._count
+
+    def rows(self, start: int, stop: int) -> list:
+        """Rows [start, stop), clamped to the rows that exist."""
+        start, stop = max(start, 0), min(stop, len(self))
+        rows = []
+        index = start
+        while index < stop:
+            block_index, skip = divmod(index, self.block_size)
+            block = self._block(block_index)
+            if not block:
+                break
+            rows.extend(block[skip : skip + stop - index])
+            index = (block_index + 1) * self.block_size
+        return rows
+
+    def seed(self, other: "RowBlockCache") -> None:
+        """
+        Starts from the count and blocks `other` has fetched, such as a cache
+        over the same rows filled on another connection.
+        """
+        self._blocks = OrderedDict(other._blocks)
+        self._block_ends = dict(other._block_ends)
+        self._count = other._count
+
+    def clear(self) -> None:
+        self._blocks.clear()
+        self._block_ends.clear()
+        self._count = None
+
+    def _block(self, block_index: int) -> list:
+        block = self._blocks.get(block_index)
+        if block is not None:
+            self._blocks.move_to_end(block_index)
+            return block
+        block = self._fetch_block(block_index)
+        self._blocks[block_index] = block
+        while len(self._blocks) > self.max_blocks:
+            self._blocks.popitem(last=False)
+        return block
+
+    def _fetch_block(self, block_index: int) -> list:
+        if self.key is None:
+            return self.fetch(self.block_size, block_index * self.block_size)
+        known = [i for i in self._block_ends if i < block_index]
+        previous = max(known, default=-1)
+        after = self._block_ends[previous] if previous >= 0 else None
+        skip = (block_index - previous - 1) * self.block_size
+        block = self.fetch(self.block_size, skip, after=after)
+        if len(block) == self.block_size:
+            self._block_ends[block_index] = self.key(block[-1])
+        return block
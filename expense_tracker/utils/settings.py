@@ -0,0 +1,29 @@
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+ENV_PREFIX = "SPENDWISE_"
+
+
+def get_setting(name: str, default: str) -> str:
+    """
+    Returns a setting from the SPENDWISE_<NAME> environment variable,
+    or the default when it is not set.
+    """
+    return os.environ.get(f"{ENV_PREFIX}{name}", default)
+
+
+def get_int_setting(name: str, default: int) -> int:
+    """
+    Returns an integer setting from the SPENDWISE_<NAME> environment variable.
+    Falls back to the default when the variable is unset or not an integer.
+    """
+    raw = os.environ.get(f"{ENV_PREFIX}{name}")
+    if raw is None:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        logger.warning(f"Ignoring invalid {ENV_PREFIX}{name}={raw!r}, using {default}")
+        return default
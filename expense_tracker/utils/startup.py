@@ -0,0 +1,83 @@
+import logging
+import time
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    """
+    Records how long startup milestones (such as first paint and the time the
+    window becomes interactive) take, measured from `start`.
+    """
+
+    def __init__(self, start: float | None = None):
+        self.start = time.perf_counter() if start is None else start
+        self.marks: list[tuple[str, float]] = []
+
+    def mark(self, name: str) -> float:
+        """Records a milestone and returns its seconds since start."""
+        seconds = time.perf_counter() - self.start
+        self.marks.append((name, seconds))
+        return seconds
+
+    def summary(self) -> str:
+        return "Startup: " + ", ".join(
+            f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.marks
+        )
+
+    def report(self) -> None:
+        """Logs the summary, or prints it when logging goes nowhere."""
+        if logger.hasHandlers():
+            logger.info(self.summary())
+        else:
+            print(self.summary(), flush=True)
+
+
+@dataclass
+class ImportTime:
+    """One line of `python -X importtime` output, in microseconds."""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> list[ImportTime]:
+    """Reads the `import time:` lines of `-X importtime` output, in order."""
+    times = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        if not self_us.strip().isdigit():
+            # The header line
+            continue
+        # One space, then two per nesting level, precede the module name.
+        indent = len(name) - len(name.lstrip(" "))
+        times.append(
+            ImportTime(
+                module=name.strip(),
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+                depth=max(indent - 1, 0) // 2,
+            )
+        )
+    return times
+
+
+def format_import_profile(times: list[ImportTime], limit: int = 25) -> str:
+    """
+    The `limit` imports with the most cumulative time, in milliseconds and
+    indented by nesting level like `-X importtime`, and the total.
+    """
+    lines = [" self [ms] | cumulative [ms] | module"]
+    for t in sorted(times, key=lambda t: t.cumulative_us, reverse=True)[:limit]:
+        lines.append(
+            f"{t.self_us / 1000:10.1f} | {t.cumulative_us / 1000:15.1f} | "
+            f"{'  ' * t.depth}{t.module}"
+        )
+    total = sum(t.self_us for t in times) / 1000
+    lines.append(f"Imports: {total:.0f} ms in {len(times)} modules")
+    return "\n".join(lines)
@@ -0,0 +1,66 @@
+from collections.abc import Iterator
+from pathlib import Path
+
+from expense_tracker.utils.extract import (
+    PageFilterStats,
+    iter_bofa_statement_rows,
+    parse_bofa_statement_pdf,
+)
+from expense_tracker.utils.extract_csv import iter_csv_rows
+from expense_tracker.utils.extract_ofx import iter_ofx_rows
+from expense_tracker.utils.pdfium_backend import PdfiumDocument
+
+PDF, CSV, OFX = "pdf", "csv", "ofx"
+
+SUFFIX_FORMATS = {".pdf": PDF, ".csv": CSV, ".ofx": OFX, ".qfx": OFX}
+
+
+def detect_format(path: str) -> str:
+    """
+    Returns the statement format of a file: "pdf", "csv" or "ofx". Known
+    extensions decide; other files are recognized by their first bytes.
+    Raises ValueError for anything else.
+    """
+    suffix_format = SUFFIX_FORMATS.get(Path(path).suffix.lower())
+    if suffix_format is not None:
+        return suffix_format
+    with open(path, "rb") as f:
+        head = f.read(1024)
+    if head.startswith(b"%PDF"):
+        return PDF
+    upper = head.upper()
+    if b"OFXHEADER" in upper or b"<OFX>" in upper:
+        return OFX
+    if b"," in head:
+        return CSV
+    raise ValueError(f"Unrecognized statement format: {Path(path).name}")
+
+
+def count_pages(path: str) -> int:
+    """Pages in a statement; CSV and OFX/QFX files count as a single page."""
+    if detect_format(path) != PDF:
+        return 1
+    with PdfiumDocument(path, pages=()) as pdf:
+        return len(pdf.document)
+
+
+def iter_statement_rows(
+    path: str, workers: int = 1, stats: PageFilterStats | None = None
+) -> Iterator[dict]:
+    """
+    Yields the transaction rows of a PDF, CSV or OFX/QFX statement in order.
+    For PDFs, `stats` counts the pages parsed so far.
+    """
+    statement_format = detect_format(path)
+    if statement_format == PDF:
+        return iter_bofa_statement_rows(path, workers=workers, stats=stats)
+    if statement_format == CSV:
+        return iter_csv_rows(path)
+    return iter_ofx_rows(path)
+
+
+def parse_statement(path: str, workers: int | None = None) -> list[dict]:
+    """Parses every transaction row of a PDF, CSV or OFX/QFX statement."""
+    if detect_format(path) == PDF:
+        return parse_bofa_statement_pdf(path, workers)
+    return list(iter_statement_rows(path))
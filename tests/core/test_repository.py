@@ -1,8 +1,9 @@
+import sqlite3
 from datetime import date
 
 import pytest
 
-from expense_tracker.core.models import MerchantCategory, Transaction
+from expense_tracker.core.models import FuzzyMatch, MerchantCategory, Transaction
 from expense_tracker.core.transaction_repository import TransactionRepository
 from expense_tracker.core.merchant_repository import MerchantCategoryRepository
 
@@ -60,6 +61,121 @@ def test_get_all_merchants(in_memory_merchant_repo):
     assert "MerchantB" in merchant_keys
 
 
+def test_new_merchant_key_bumps_merchant_version(in_memory_merchant_repo):
+    repo: MerchantCategoryRepository = in_memory_merchant_repo
+    assert repo.merchant_version == 0
+    repo.set_category(MerchantCategory("AMAZON", "Shopping"))
+    assert repo.merchant_version == 1
+    # Updating an existing key keeps the version
+    repo.set_category(MerchantCategory("AMAZON", "Books"))
+    assert repo.merchant_version == 1
+
+
+def test_merchant_version_persists(tmp_path):
+    db_path = str(tmp_path / "merchants.db")
+    repo = MerchantCategoryRepository(db_path)
+    repo.set_category(MerchantCategory("AMAZON", "Shopping"))
+    repo.conn.close()
+
+    reopened = MerchantCategoryRepository(db_path)
+    assert reopened.merchant_version == 1
+    reopened.conn.close()
+
+
+def test_set_and_get_fuzzy_match(in_memory_merchant_repo):
+    repo: MerchantCategoryRepository = in_memory_merchant_repo
+    repo.set_fuzzy_match(FuzzyMatch("AMAZON MKTP", "AMAZON", 92.0, 90, 0))
+    repo.set_fuzzy_match(FuzzyMatch("UNKNOWN", None, None, 90, 0))
+
+    assert repo.get_fuzzy_match("AMAZON MKTP") == FuzzyMatch(
+        "AMAZON MKTP", "AMAZON", 92.0, 90, 0
+    )
+    assert repo.get_fuzzy_match("UNKNOWN").matched_key is None
+    assert repo.get_fuzzy_match("MISSING") is None
+    assert [m.query_key for m in repo.get_all_fuzzy_matches()] == [
+        "AMAZON MKTP",
+        "UNKNOWN",
+    ]
+
+
+def test_category_change_invalidates_fuzzy_matches(in_memory_merchant_repo):
+    repo: MerchantCategoryRepository = in_memory_merchant_repo
+    repo.set_category(MerchantCategory("AMAZON", "Shopping"))
+    repo.set_category(MerchantCategory("NETFLIX", "Streaming"))
+    version = repo.merchant_version
+    repo.set_fuzzy_match(FuzzyMatch("AMAZON MKTP", "AMAZON", 92.0, 90, version))
+    repo.set_fuzzy_match(FuzzyMatch("NETFLIX.COM", "NETFLIX", 95.0, 90, version))
+
+    repo.set_category(MerchantCategory("AMAZON", "Books"))
+
+    assert repo.get_fuzzy_match("AMAZON MKTP") is None
+    assert repo.get_fuzzy_match("NETFLIX.COM") is not None
+
+
+def test_prune_fuzzy_matches(in_memory_merchant_repo):
+    repo: MerchantCategoryRepository = in_memory_merchant_repo
+    repo.set_fuzzy_match(FuzzyMatch("OLD VERSION", None, None, 90, 0))
+    repo.set_category(MerchantCategory("AMAZON", "Shopping"))
+    repo.set_fuzzy_match(FuzzyMatch("OTHER THRESHOLD", None, None, 80, 1))
+    repo.set_fuzzy_match(FuzzyMatch("CURRENT", "AMAZON", 91.0, 90, 1))
+
+    assert repo.prune_fuzzy_matches(90) == 2
+    assert [m.query_key for m in repo.get_all_fuzzy_matches()] == ["CURRENT"]
+
+    assert repo.prune_fuzzy_matches() == 1
+    assert repo.get_all_fuzzy_matches() == []
+
+
+def test_add_and_get_rules(in_memory_merchant_repo):
+    repo: MerchantCategoryRepository = in_memory_merchant_repo
+    repo.add_rule("amzn", "Shopping")
+    repo.add_rule("UBER *EATS", "Dining")
+    rules = repo.get_all_rules()
+    assert [(r.pattern, r.category) for r in rules] == [
+        ("AMZN", "Shopping"),
+        ("UBER *EATS", "Dining"),
+    ]
+
+
+def test_add_rule_updates_existing_pattern(in_memory_merchant_repo):
+    repo: MerchantCategoryRepository = in_memory_merchant_repo
+    first = repo.add_rule("AMZN", "Shopping")
+    second = repo.add_rule("AMZN", "Books")
+    assert first.id == second.id
+    assert second.category == "Books"
+    assert len(repo.get_all_rules()) == 1
+
+
+def test_add_rule_rejects_empty_pattern(in_memory_merchant_repo):
+    with pytest.raises(ValueError):
+        in_memory_merchant_repo.add_rule("   ", "Shopping")
+
+
+def test_rule_changes_bump_rules_version(in_memory_merchant_repo):
+    repo: MerchantCategoryRepository = in_memory_merchant_repo
+    assert repo.rules_version == 0
+    rule = repo.add_rule("AMZN", "Shopping")
+    assert repo.rules_version == 1
+    repo.delete_rule(rule.id)
+    assert repo.rules_version == 2
+    assert repo.get_all_rules() == []
+
+
+def test_rules_version_sees_rules_changed_on_another_connection(tmp_path):
+    path = str(tmp_path / "merchant_categories.db")
+    repo = MerchantCategoryRepository(path)
+    other = MerchantCategoryRepository(path)
+    version = repo.rules_version
+
+    other.add_rule("AMZN", "Shopping")
+
+    assert repo.rules_version != version
+    assert [rule.pattern for rule in repo.get_all_rules()] == ["AMZN"]
+    assert other.delete_rule(999) == 0
+    repo.conn.close()
+    other.conn.close()
+
+
 def test_add_transaction(in_memory_repo):
     repo: TransactionRepository = in_memory_repo
     saved = repo.add_transaction(
@@ -79,6 +195,60 @@ def test_add_transaction(in_memory_repo):
     assert transaction.description == "Groceries"
 
 
+def test_atomic_commits_writes_together(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    repo = TransactionRepository(db_path)
+    reader = TransactionRepository(db_path)
+    with repo.atomic():
+        repo.add_transaction(Transaction(None, date.today(), -4.5, "Coffee", "A"))
+        with repo.atomic():
+            repo.add_transactions([Transaction(None, date.today(), -2.0, "Food", "B")])
+        # Nothing is visible to other connections until the block ends
+        assert reader.count_all_transactions() == 0
+    assert reader.count_all_transactions() == 2
+    repo.conn.close()
+    reader.conn.close()
+
+
+def test_atomic_rolls_back_on_error(in_memory_repo):
+    repo: TransactionRepository = in_memory_repo
+    repo.add_transaction(Transaction(None, date.today(), -1.0, "Food", "Kept"))
+    with pytest.raises(RuntimeError):
+        with repo.atomic():
+            repo.add_transaction(Transaction(None, date.today(), -4.5, "Coffee", "A"))
+            repo.delete_multiple_transactions(
+                [t.id for t in repo.get_all_transactions()]
+            )
+            raise RuntimeError("import failed")
+    assert [t.description for t in repo.get_all_transactions()] == ["Kept"]
+
+
+def test_data_version_changes_only_on_writes(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    repo = TransactionRepository(db_path)
+    other = TransactionRepository(db_path)
+    version = repo.data_version()
+
+    repo.get_all_transactions()
+    assert repo.data_version() == version
+
+    repo.add_transaction(Transaction(None, date.today(), -4.5, "Coffee", "A"))
+    assert repo.data_version() != version
+    version = repo.data_version()
+
+    with pytest.raises(RuntimeError):
+        with repo.atomic():
+            repo.add_transaction(Transaction(None, date.today(), -1.0, "Food", "B"))
+            raise RuntimeError("rolled back")
+    assert repo.data_version() == version
+
+    # Commits from another connection are seen too
+    other.delete_multiple_transactions([t.id for t in other.get_all_transactions()])
+    assert repo.data_version() != version
+    repo.conn.close()
+    other.conn.close()
+
+
 def test_get_transaction(in_memory_repo):
     repo: TransactionRepository = in_memory_repo
     saved = repo.add_transaction(
@@ -129,6 +299,47 @@ def test_get_all_transactions(in_memory_repo):
     assert transactions[1].amount == 10.0
 
 
+def test_get_all_transactions_pages_same_day_rows_by_id(in_memory_repo):
+    repo: TransactionRepository = in_memory_repo
+    repo.add_transactions(
+        [
+            Transaction(None, date(2023, 1, 1), -float(i), "Food", f"Row {i}")
+            for i in range(5)
+        ]
+    )
+    pages = [repo.get_all_transactions(limit=2, offset=offset) for offset in (0, 2, 4)]
+    assert [t.description for page in pages for t in page] == [
+        "Row 4",
+        "Row 3",
+        "Row 2",
+        "Row 1",
+        "Row 0",
+    ]
+
+
+def test_get_all_transactions_after_list_position(in_memory_repo):
+    repo: TransactionRepository = in_memory_repo
+    repo.add_transactions(
+        [
+            Transaction(None, date(2023, 1, 1 + i // 2), -float(i), "Food", f"Row {i}")
+            for i in range(6)
+        ]
+    )
+    expected = [t.description for t in repo.get_all_transactions()]
+    first = repo.get_all_transactions(limit=3)
+    after = repo.list_position(first[-1])
+    rest = repo.get_all_transactions(limit=10, after=after)
+    assert [t.description for t in first + rest] == expected
+    skipped = repo.get_all_transactions(limit=1, offset=1, after=after)
+    assert [t.description for t in skipped] == [expected[4]]
+
+    repo.add_transaction(Transaction(None, date(2023, 1, 2), -9.0, "Food", "Amazon"))
+    matches = repo.search_by_keyword("amazon", after=after)
+    assert [t.description for t in matches] == []
+    matches = repo.search_by_keyword("amazon", after=repo.list_position(first[0]))
+    assert [t.description for t in matches] == ["Amazon"]
+
+
 def test_daily_summary(in_memory_repo):
     repo: TransactionRepository = in_memory_repo
     repo.add_transaction(
@@ -275,6 +486,75 @@ def test_update_transaction(in_memory_repo):
     assert updated_transaction.description == "Groceries"  # Should remain unchanged
 
 
+def test_add_transactions(in_memory_repo):
+    repo: TransactionRepository = in_memory_repo
+    inserted = repo.add_transactions(
+        [
+            Transaction(None, date(2024, 1, 1), -5.0, "Coffee", "Starbucks"),
+            Transaction(None, date(2024, 1, 2), -9.0, "Streaming", "Netflix"),
+        ]
+    )
+    assert inserted == 2
+    assert repo.count_all_transactions() == 2
+    assert repo.add_transactions([]) == 0
+
+
+def test_insert_transactions_returns_ids(in_memory_repo):
+    repo: TransactionRepository = in_memory_repo
+    ids = repo.insert_transactions(
+        [
+            Transaction(None, date(2024, 1, 1), -5.0, "Coffee", "Starbucks"),
+            Transaction(None, date(2024, 1, 2), -9.0, "Streaming", "Netflix"),
+        ]
+    )
+    assert [repo.get_transaction(i).description for i in ids] == [
+        "Starbucks",
+        "Netflix",
+    ]
+    assert repo.insert_transactions([]) == []
+
+
+def test_get_transaction_fingerprints(in_memory_repo):
+    repo: TransactionRepository = in_memory_repo
+    repo.add_transactions(
+        [
+            Transaction(None, date(2024, 1, 1), -5.0, "Coffee", "Starbucks"),
+            Transaction(None, date(2024, 1, 1), -5.0, "Coffee", "Starbucks"),
+            Transaction(None, date(2024, 1, 2), -9.0, "Streaming", "Netflix"),
+            Transaction(None, date(2024, 2, 1), -9.0, "Streaming", "Netflix"),
+        ]
+    )
+    fingerprints = repo.get_transaction_fingerprints(
+        date(2024, 1, 1), date(2024, 1, 31)
+    )
+    assert fingerprints == {
+        ("2024-01-01", -5.0, "Starbucks"): 2,
+        ("2024-01-02", -9.0, "Netflix"): 1,
+    }
+
+
+def test_update_categories(in_memory_repo):
+    repo: TransactionRepository = in_memory_repo
+    first = repo.add_transaction(
+        Transaction(None, date(2024, 1, 1), -5.0, "Uncategorized", "Starbucks")
+    )
+    second = repo.add_transaction(
+        Transaction(None, date(2024, 1, 2), -9.0, "Uncategorized", "Netflix")
+    )
+    third = repo.add_transaction(
+        Transaction(None, date(2024, 1, 3), -1.0, "Uncategorized", "Unknown")
+    )
+
+    repo.update_categories([(first.id, "Coffee"), (second.id, "Subscriptions")])
+
+    assert repo.get_transaction(first.id).category == "Coffee"
+    assert repo.get_transaction(second.id).category == "Subscriptions"
+    assert repo.get_transaction(third.id).category == "Uncategorized"
+
+    # Empty updates are a no-op
+    repo.update_categories([])
+
+
 def test_count_all_transactions(in_memory_repo):
     repo: TransactionRepository = in_memory_repo
     assert repo.count_all_transactions() == 0
@@ -1154,3 +1434,16 @@ def test_get_all_months_with_data_single_month(in_memory_repo):
     assert isinstance(months, set)
     assert len(months) == 1
     assert (2023, 5) in months
+
+
+def test_read_only_repository_sees_commits_but_cannot_write(tmp_path):
+    path = str(tmp_path / "transactions.db")
+    repo = TransactionRepository(path)
+    reader = TransactionRepository(path, read_only=True)
+    repo.add_transaction(Transaction(None, date(2023, 1, 1), -5.0, "Food", "Lunch"))
+
+    assert reader.count_all_transactions() == 1
+    with pytest.raises(sqlite3.OperationalError):
+        reader.delete_transaction(1)
+    reader.conn.close()
+    repo.conn.close()
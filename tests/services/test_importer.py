@@ -0,0 +1,357 @@
+from datetime import date
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from expense_tracker.core.merchant_repository import MerchantCategoryRepository
+from expense_tracker.core.models import MerchantCategory, Transaction
+from expense_tracker.core.transaction_repository import TransactionRepository
+from expense_tracker.services.importer import (
+    FileImportResult,
+    ImportReport,
+    StatementImportService,
+    batched,
+    find_statement_files,
+    parse_row_date,
+)
+from expense_tracker.services.merchant import MerchantCategoryService
+from expense_tracker.services.pipeline import ImportCancelled
+from expense_tracker.utils.merchant_normalizer import normalize_merchant
+from expense_tracker.utils.parse_cache import ParseCache
+
+
+@pytest.fixture
+def in_memory_repo():
+    """Provides an in-memory TransactionRepository for testing."""
+    repo = TransactionRepository(":memory:")
+    yield repo
+    repo.conn.close()
+
+
+@pytest.fixture
+def import_service(in_memory_repo):
+    """Provides a serial StatementImportService with one known merchant."""
+    merchant_repo = MerchantCategoryRepository(":memory:")
+    merchant_repo.set_category(MerchantCategory("STARBUCKS", "Coffee"))
+    merchant_service = MerchantCategoryService(
+        merchant_repo, in_memory_repo, normalize_merchant
+    )
+    yield StatementImportService(in_memory_repo, merchant_service, workers=1)
+    merchant_repo.conn.close()
+
+
+STATEMENTS = {
+    "feb.pdf": [
+        {"date": "2024-02-03", "description": "STARBUCKS", "amount": -4.5},
+        {"date": "2024-02-01", "description": "PAYROLL", "amount": 1000.0},
+    ],
+    "jan.pdf": [
+        {"date": "2024-01-15", "description": "STARBUCKS", "amount": -4.5},
+        {"date": "2024-01-15", "description": "STARBUCKS", "amount": -4.5},
+        {"date": "not a date", "description": "BROKEN", "amount": -1.0},
+    ],
+}
+
+
+def _fake_parse(path, workers=None):
+    name = Path(path).name
+    if name not in STATEMENTS:
+        raise ValueError("not a statement")
+    return STATEMENTS[name]
+
+
+def _fake_iter_rows(path, workers=1, stats=None):
+    yield from _fake_parse(path, workers)
+
+
+PARSERS = "expense_tracker.utils.statement_formats"
+
+fake_parsers = [
+    patch(f"{PARSERS}.parse_bofa_statement_pdf", _fake_parse),
+    patch(f"{PARSERS}.iter_bofa_statement_rows", _fake_iter_rows),
+]
+
+
+def with_fake_parsers(test):
+    for fake in fake_parsers:
+        test = fake(test)
+    return test
+
+
+def test_find_statement_files(tmp_path):
+    (tmp_path / "b.pdf").write_bytes(b"")
+    (tmp_path / "a.PDF").write_bytes(b"")
+    (tmp_path / "c.qfx").write_bytes(b"")
+    (tmp_path / "notes.txt").write_text("")
+    (tmp_path / "nested").mkdir()
+    extra = tmp_path / "extra.pdf"
+
+    files = find_statement_files([str(tmp_path), str(extra), str(tmp_path / "b.pdf")])
+
+    assert files == [
+        str(tmp_path / "a.PDF"),
+        str(tmp_path / "b.pdf"),
+        str(tmp_path / "c.qfx"),
+        str(extra),
+    ]
+
+
+def test_parse_row_date():
+    assert parse_row_date("2024-01-15") == date(2024, 1, 15)
+    assert parse_row_date("01/15/24") == date(2024, 1, 15)
+    assert parse_row_date(date(2024, 1, 15)) == date(2024, 1, 15)
+    with pytest.raises(ValueError):
+        parse_row_date("15th of January")
+
+
+@with_fake_parsers
+def test_import_files_reports_per_file_results(import_service, in_memory_repo):
+    report = import_service.import_files(["/s/feb.pdf", "/s/jan.pdf", "/s/bad.pdf"])
+
+    assert [(f.imported, f.skipped, f.failed) for f in report.files] == [
+        (2, 0, 0),
+        (2, 0, 1),
+        (0, 0, 0),
+    ]
+    assert report.files[2].error == "not a statement"
+    assert report.imported == 4
+    assert report.elapsed_seconds > 0
+
+    transactions = in_memory_repo.get_all_transactions()
+    assert {t.category for t in transactions} == {"Coffee", "Income"}
+    # Written in date order by a single writer
+    dates_by_id = [t.date for t in sorted(transactions, key=lambda t: t.id)]
+    assert dates_by_id == sorted(dates_by_id)
+
+
+@with_fake_parsers
+def test_import_files_skips_already_imported_rows(import_service, in_memory_repo):
+    in_memory_repo.add_transaction(
+        Transaction(None, date(2024, 1, 15), -4.5, "Coffee", "STARBUCKS")
+    )
+
+    report = import_service.import_files(["/s/jan.pdf", "/s/jan.pdf", "/s/feb.pdf"])
+
+    # The duplicate path is dropped, one of the two repeated rows already exists
+    assert [(f.imported, f.skipped) for f in report.files] == [(1, 1), (2, 0)]
+    assert in_memory_repo.count_all_transactions() == 4
+
+    report = import_service.import_files(["/s/feb.pdf"])
+    assert (report.imported, report.skipped) == (0, 2)
+
+
+@with_fake_parsers
+def test_import_single_file_skips_existing_rows(import_service, in_memory_repo):
+    in_memory_repo.add_transaction(
+        Transaction(None, date(2024, 1, 15), -4.5, "Coffee", "STARBUCKS")
+    )
+    report = import_service.import_files(["/s/jan.pdf"])
+    assert (report.imported, report.skipped, report.failed) == (1, 1, 1)
+    assert in_memory_repo.count_all_transactions() == 2
+
+
+def test_import_single_file_streams_in_batches(in_memory_repo):
+    merchant_service = MerchantCategoryService(
+        MerchantCategoryRepository(":memory:"), in_memory_repo, normalize_merchant
+    )
+    service = StatementImportService(
+        in_memory_repo, merchant_service, workers=1, batch_size=2
+    )
+    rows_in_db_when_parsed = []
+
+    def streaming_rows(path, workers=1, stats=None):
+        for _ in range(5):
+            rows_in_db_when_parsed.append(in_memory_repo.count_all_transactions())
+            # The same row twice in one file is kept twice, across batches too
+            yield {"date": "2024-03-01", "description": "VONS", "amount": -2.0}
+
+    with patch(f"{PARSERS}.iter_bofa_statement_rows", streaming_rows):
+        report = service.import_files(["/s/mar.pdf"])
+
+    assert report.imported == 5
+    assert rows_in_db_when_parsed == [0, 0, 2, 2, 4]
+
+
+def test_import_uses_parse_cache(in_memory_repo, tmp_path):
+    merchant_service = MerchantCategoryService(
+        MerchantCategoryRepository(":memory:"), in_memory_repo, normalize_merchant
+    )
+    service = StatementImportService(
+        in_memory_repo,
+        merchant_service,
+        workers=1,
+        parse_cache=ParseCache(tmp_path / "cache", max_bytes=1024 * 1024),
+    )
+    for name in ("jan.pdf", "feb.pdf", "copy-of-jan.pdf"):
+        (tmp_path / name).write_bytes(name.removeprefix("copy-of-").encode())
+    parsed = []
+
+    def counting_parse(path, workers=None):
+        parsed.append(Path(path).name)
+        return _fake_parse(path, workers)
+
+    def counting_iter_rows(path, workers=1, stats=None):
+        yield from counting_parse(path, workers)
+
+    with (
+        patch(f"{PARSERS}.parse_bofa_statement_pdf", counting_parse),
+        patch(f"{PARSERS}.iter_bofa_statement_rows", counting_iter_rows),
+    ):
+        service.import_files([str(tmp_path / "jan.pdf")])
+        in_memory_repo.delete_multiple_transactions(
+            [t.id for t in in_memory_repo.get_all_transactions()]
+        )
+        # Same contents under another name: served from the cache
+        report = service.import_files(
+            [str(tmp_path / "copy-of-jan.pdf"), str(tmp_path / "feb.pdf")]
+        )
+
+    assert parsed == ["jan.pdf", "feb.pdf"]
+    assert [(f.imported, f.failed) for f in report.files] == [(2, 1), (2, 0)]
+
+
+def test_import_csv_and_ofx_statements(import_service, in_memory_repo, tmp_path):
+    (tmp_path / "jan.csv").write_text(
+        "Date,Description,Amount\n"
+        "01/15/2024,STARBUCKS,-4.50\n"
+        "01/16/2024,PAYROLL,1000.00\n"
+    )
+    (tmp_path / "feb.ofx").write_text(
+        "<OFX><BANKTRANLIST><STMTTRN><DTPOSTED>20240203</DTPOSTED>"
+        "<TRNAMT>-4.50</TRNAMT><NAME>STARBUCKS</NAME></STMTTRN>"
+        "</BANKTRANLIST></OFX>"
+    )
+
+    report = import_service.import_files([str(tmp_path)])
+
+    assert [(Path(f.path).name, f.imported) for f in report.files] == [
+        ("feb.ofx", 1),
+        ("jan.csv", 2),
+    ]
+    transactions = in_memory_repo.get_all_transactions()
+    categories = {t.description: t.category for t in transactions}
+    assert categories == {"STARBUCKS": "Coffee", "PAYROLL": "Income"}
+
+
+def test_import_reports_progress(import_service, tmp_path):
+    (tmp_path / "jan.csv").write_text(
+        "Date,Description,Amount\n"
+        "01/15/2024,STARBUCKS,-4.50\n"
+        "01/16/2024,PAYROLL,1000.00\n"
+    )
+    (tmp_path / "feb.csv").write_text(
+        "Date,Description,Amount\n02/03/2024,STARBUCKS,-4.50\n"
+    )
+    snapshots = []
+
+    import_service.import_files([str(tmp_path)], on_progress=snapshots.append)
+
+    final = snapshots[-1]
+    assert (final.pages, final.pages_parsed, final.fraction) == (2, 2, 1.0)
+    assert (final.rows_parsed, final.rows_categorized, final.rows_written) == (
+        3,
+        3,
+        3,
+    )
+    assert final.elapsed_seconds > 0
+
+
+def test_cancelled_import_rolls_back_inside_atomic(in_memory_repo):
+    merchant_service = MerchantCategoryService(
+        MerchantCategoryRepository(":memory:"), in_memory_repo, normalize_merchant
+    )
+    service = StatementImportService(
+        in_memory_repo, merchant_service, workers=1, batch_size=2
+    )
+
+    def rows(path, workers=1, stats=None):
+        for day in range(1, 6):
+            yield {"date": f"2024-03-0{day}", "description": "VONS", "amount": -2.0}
+
+    with patch(f"{PARSERS}.iter_bofa_statement_rows", rows):
+        with pytest.raises(ImportCancelled):
+            with in_memory_repo.atomic():
+                service.import_files(
+                    ["/s/mar.pdf"],
+                    # Cancel once the first batch has been written
+                    should_cancel=lambda: in_memory_repo.count_all_transactions() > 0,
+                )
+
+    assert in_memory_repo.count_all_transactions() == 0
+
+
+@pytest.mark.parametrize("threaded", [False, True])
+def test_streamed_file_failing_midway_leaves_no_rows(in_memory_repo, threaded):
+    merchant_service = MerchantCategoryService(
+        MerchantCategoryRepository(":memory:"), in_memory_repo, normalize_merchant
+    )
+    service = StatementImportService(
+        in_memory_repo, merchant_service, workers=1, threaded_stages=threaded
+    )
+    in_memory_repo.add_transaction(
+        Transaction(None, date(2024, 1, 2), -1.0, "Food", "KEPT")
+    )
+
+    def failing_rows(path, workers=1, stats=None):
+        for i in range(700):
+            yield {"date": "2024-03-01", "description": f"ROW {i}", "amount": -2.0}
+        raise ValueError("corrupt page 30")
+
+    with patch(f"{PARSERS}.iter_bofa_statement_rows", failing_rows):
+        report = service.import_files(["/s/a.pdf"])
+
+    assert report.files[0].error == "corrupt page 30"
+    assert report.imported == 0
+    assert [t.description for t in in_memory_repo.get_all_transactions()] == ["KEPT"]
+
+
+def test_batched():
+    assert list(batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(batched([], 3)) == []
+
+
+def test_import_report_summary():
+    report = ImportReport(
+        files=[
+            FileImportResult("/s/jan.pdf", imported=3, skipped=1),
+            FileImportResult("/s/bad.pdf", error="not a statement"),
+        ],
+        elapsed_seconds=2.0,
+    )
+    assert report.summary() == (
+        "jan.pdf: 3 imported, 1 skipped, 0 failed\n"
+        "bad.pdf: failed (not a statement)\n"
+        "Total: 3 imported, 1 skipped, 0 failed in 2.0s (2 rows/s)"
+    )
+
+
+@with_fake_parsers
+def test_import_with_threaded_stages(in_memory_repo):
+    merchant_repo = MerchantCategoryRepository(":memory:")
+    merchant_repo.set_category(MerchantCategory("STARBUCKS", "Coffee"))
+    merchant_service = MerchantCategoryService(
+        merchant_repo, in_memory_repo, normalize_merchant
+    )
+    service = StatementImportService(
+        in_memory_repo, merchant_service, workers=1, threaded_stages=True
+    )
+    in_memory_repo.add_transaction(
+        Transaction(None, date(2024, 1, 15), -4.5, "Coffee", "STARBUCKS")
+    )
+
+    report = service.import_files(["/s/jan.pdf", "/s/feb.pdf"])
+
+    assert [(f.imported, f.skipped, f.failed) for f in report.files] == [
+        (1, 1, 1),
+        (2, 0, 0),
+    ]
+    assert [s.name for s in report.stages] == [
+        "parse",
+        "normalize",
+        "categorize",
+        "dedupe",
+        "write",
+    ]
+    assert report.stages[-1].rows_out == 3
+    assert in_memory_repo.count_all_transactions() == 4
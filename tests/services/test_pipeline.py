@@ -0,0 +1,132 @@
+import pytest
+
+from expense_tracker.services.pipeline import (
+    ImportCancelled,
+    ImportPipeline,
+    PipelineStage,
+)
+
+
+class Double(PipelineStage):
+    name = "double"
+
+    def process(self, context, items):
+        return [i * 2 for i in items]
+
+
+class DropOdd(PipelineStage):
+    name = "drop-odd"
+
+    def process(self, context, items):
+        return [i for i in items if i % 4 == 0]
+
+
+class Collect(PipelineStage):
+    """Holds every batch back until the end, like an ordered writer."""
+
+    name = "collect"
+
+    def __init__(self, hold=False):
+        self.hold = hold
+        self.held = []
+        self.seen = []
+
+    def process(self, context, items):
+        self.seen.append((context, list(items)))
+        if self.hold:
+            self.held.extend(items)
+            return []
+        return items
+
+    def finish(self):
+        return [("all", sorted(self.held))] if self.held else []
+
+
+class Fail(PipelineStage):
+    name = "fail"
+
+    def process(self, context, items):
+        raise RuntimeError("stage failed")
+
+
+SOURCE = [("a", [1, 2, 3]), ("b", [4, 5]), ("b", [])]
+
+
+@pytest.mark.parametrize("threaded", [False, True])
+def test_pipeline_runs_batches_through_stages(threaded):
+    collect = Collect()
+    stats = ImportPipeline(
+        "source", [Double(), DropOdd(), collect], threaded=threaded
+    ).run(iter(SOURCE))
+
+    assert collect.seen == [("a", [4]), ("b", [8]), ("b", [])]
+    assert [(s.name, s.batches, s.rows_in, s.rows_out) for s in stats] == [
+        ("source", 3, 5, 5),
+        ("double", 3, 5, 5),
+        ("drop-odd", 3, 5, 2),
+        ("collect", 3, 2, 2),
+    ]
+    assert all(s.seconds >= 0 for s in stats)
+
+
+@pytest.mark.parametrize("threaded", [False, True])
+def test_pipeline_passes_finished_batches_downstream(threaded):
+    last = Collect()
+    ImportPipeline(
+        "source", [Collect(hold=True), Double(), last], threaded=threaded
+    ).run(iter(SOURCE))
+    assert last.seen == [("a", []), ("b", []), ("b", []), ("all", [2, 4, 6, 8, 10])]
+
+
+@pytest.mark.parametrize("threaded", [False, True])
+def test_pipeline_raises_stage_errors(threaded):
+    def endless():
+        while True:
+            yield "a", [1]
+
+    pipeline = ImportPipeline("source", [Double(), Fail()], threaded=threaded)
+    with pytest.raises(RuntimeError, match="stage failed"):
+        pipeline.run(endless())
+
+
+@pytest.mark.parametrize("threaded", [False, True])
+def test_pipeline_stops_when_cancelled(threaded):
+    collect = Collect()
+
+    def endless():
+        while True:
+            yield "a", [1]
+
+    pipeline = ImportPipeline(
+        "source",
+        [Double(), collect],
+        threaded=threaded,
+        should_cancel=lambda: len(collect.seen) >= 3,
+    )
+    with pytest.raises(ImportCancelled):
+        pipeline.run(endless())
+    assert 3 <= len(collect.seen) < 3 + 2 * pipeline.queue_size + 2
+
+
+def test_pipeline_reports_each_batch():
+    reported = []
+    ImportPipeline(
+        "source",
+        [Double(), DropOdd()],
+        on_batch=lambda stats: reported.append([s.rows_out for s in stats]),
+    ).run(iter(SOURCE[:2]))
+    assert reported == [
+        [3, 0, 0],
+        [3, 3, 0],
+        [3, 3, 1],
+        [5, 3, 1],
+        [5, 5, 1],
+        [5, 5, 2],
+        [5, 5, 2],
+        [5, 5, 2],
+    ]
+
+
+def test_stage_stats_summary():
+    stats = ImportPipeline("source", []).run(iter(SOURCE))
+    assert stats[0].summary().startswith("source: 5 in, 5 out, ")
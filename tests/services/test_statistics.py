@@ -1,10 +1,18 @@
+import threading
+from concurrent.futures import wait
 from datetime import date
 
 import pytest
 
 from expense_tracker.core.models import Transaction
 from expense_tracker.core.transaction_repository import TransactionRepository
-from expense_tracker.services.statistics import StatisticsService, MonthlyMetrics
+from expense_tracker.services.statistics import (
+    HEATMAP,
+    METRICS,
+    MonthDataCache,
+    MonthlyMetrics,
+    StatisticsService,
+)
 
 
 @pytest.fixture
@@ -302,3 +310,98 @@ def test_get_cashflow_trend(in_memory_repo, statistics_service):
     assert trend[0] == (2023, 1, 1500.0)  # 2000 - 500
     # Check February
     assert trend[1] == (2023, 2, 1200.0)  # 2000 - 800
+
+
+def test_month_data_cache_prefetches_neighbours(in_memory_repo, statistics_service):
+    in_memory_repo.add_transaction(
+        Transaction(None, date(2023, 2, 3), -20.0, "Food", "Lunch")
+    )
+    cache = MonthDataCache(statistics_service)
+    loaded = []
+    load = cache._loaders[HEATMAP]
+    cache._loaders[HEATMAP] = lambda y, m: loaded.append((y, m)) or load(y, m)
+
+    wait(cache.prefetch(HEATMAP, [(2023, 1), (2023, 2), (2023, 3)]))
+    # Already cached: nothing new is started
+    assert cache.prefetch(HEATMAP, [(2023, 2)]) == []
+
+    assert cache.heatmap(2023, 2) == {3: 20.0}
+    assert cache.heatmap(2023, 1) == {}
+    assert loaded == [(2023, 1), (2023, 2), (2023, 3)]
+    assert cache.metrics(2023, 2).net_income == -20.0
+
+
+def test_month_data_cache_is_bounded(statistics_service):
+    cache = MonthDataCache(statistics_service, max_entries=2)
+    wait(cache.prefetch(METRICS, [(2023, 1), (2023, 2), (2023, 3)]))
+    assert list(cache._entries) == [(METRICS, 2023, 2), (METRICS, 2023, 3)]
+
+
+def test_month_data_cache_invalidate_drops_stale_loads(
+    in_memory_repo, statistics_service
+):
+    cache = MonthDataCache(statistics_service)
+    assert cache.heatmap(2023, 1) == {}
+
+    # A prefetch that read the old data finishes after the data changed
+    started, release = threading.Event(), threading.Event()
+    load = cache._loaders[HEATMAP]
+
+    def slow_load(year, month):
+        result = load(year, month)
+        started.set()
+        release.wait(5)
+        return result
+
+    cache._loaders[HEATMAP] = slow_load
+    [future] = cache.prefetch(HEATMAP, [(2023, 2)])
+    started.wait(5)
+    in_memory_repo.add_transaction(
+        Transaction(None, date(2023, 2, 3), -20.0, "Food", "Lunch")
+    )
+    cache.invalidate()
+    release.set()
+    wait([future])
+    cache._loaders[HEATMAP] = load
+
+    assert cache._entries == {}
+    assert cache.heatmap(2023, 2) == {3: 20.0}
+
+
+def test_month_data_cache_drops_entries_when_data_changes(
+    in_memory_repo, statistics_service
+):
+    cache = MonthDataCache(statistics_service)
+    assert cache.heatmap(2023, 2) == {}
+    assert cache.heatmap(2023, 2) == {}
+
+    in_memory_repo.add_transaction(
+        Transaction(None, date(2023, 2, 3), -20.0, "Food", "Lunch")
+    )
+    assert cache.heatmap(2023, 2) == {3: 20.0}
+
+
+def test_month_data_cache_loads_through_reader_on_its_thread(tmp_path):
+    path = str(tmp_path / "transactions.db")
+    repo = TransactionRepository(path)
+    reader_repo = TransactionRepository(path, read_only=True)
+    cache = MonthDataCache(
+        StatisticsService(repo), reader=StatisticsService(reader_repo)
+    )
+    threads = []
+    load = cache._loaders[HEATMAP]
+
+    def recording_load(year, month):
+        threads.append(threading.current_thread())
+        return load(year, month)
+
+    cache._loaders[HEATMAP] = recording_load
+    repo.add_transaction(Transaction(None, date(2023, 2, 3), -20.0, "Food", "Lunch"))
+
+    assert cache.heatmap(2023, 2) == {3: 20.0}
+    wait(cache.prefetch(HEATMAP, [(2023, 3)]))
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
+    assert load.__self__.transaction_repo is reader_repo
+    reader_repo.conn.close()
+    repo.conn.close()
@@ -0,0 +1,158 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+from expense_tracker.app import (
+    build_parser,
+    run_fuzzy_cache_command,
+    run_import_command,
+    run_rules_command,
+)
+from expense_tracker.core.merchant_repository import MerchantCategoryRepository
+from expense_tracker.core.models import FuzzyMatch, MerchantCategory
+from expense_tracker.core.transaction_repository import TransactionRepository
+
+
+def test_parser_defaults_to_gui():
+    args = build_parser().parse_args([])
+    assert args.command is None
+    assert not args.profile_startup
+
+
+def test_parser_profile_startup():
+    args = build_parser().parse_args(["--profile-startup"])
+    assert args.profile_startup
+    assert args.command is None
+
+
+def test_startup_does_not_import_pdf_parsers_or_tkinter():
+    # A fresh interpreter, since other tests import the parsers. The window,
+    # its tabs and dialogs load tkinter but none of the parsers.
+    code = (
+        "import sys, expense_tracker.app; "
+        "print('tkinter' in sys.modules); "
+        "import expense_tracker.gui.main_window; "
+        "print(sorted(m for m in "
+        "('pdfplumber', 'pdfminer', 'pypdfium2', 'rapidfuzz') if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.split() == ["False", "[]"]
+
+
+def test_cli_commands_do_not_import_tkinter(tmp_path):
+    statement = tmp_path / "statement.csv"
+    statement.write_text("Date,Description,Amount\n01/02/2024,COFFEE SHOP,-3.50\n")
+    code = (
+        "import sys; from expense_tracker.app import main; "
+        "main(['fuzzy-cache', 'show']); "
+        f"main(['import', {str(statement)!r}]); "
+        "print('tkinter loaded' if 'tkinter' in sys.modules else 'no tkinter')"
+    )
+    # Keep the databases out of the real data directory.
+    env = {**os.environ, "HOME": str(tmp_path), "LOCALAPPDATA": str(tmp_path)}
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).parent.parent,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert "1 imported" in result.stdout
+    assert result.stdout.strip().endswith("no tkinter")
+
+
+def test_parser_fuzzy_cache_command():
+    args = build_parser().parse_args(["fuzzy-cache", "prune", "--threshold", "85"])
+    assert args.command == "fuzzy-cache"
+    assert args.action == "prune"
+    assert args.threshold == 85
+
+
+def test_run_fuzzy_cache_command(capsys):
+    repo = MerchantCategoryRepository(":memory:")
+    repo.set_fuzzy_match(FuzzyMatch("STALE", None, None, 90, 0))
+    repo.set_category(MerchantCategory("AMAZON", "Shopping"))
+    repo.set_fuzzy_match(FuzzyMatch("AMAZON MKTP", "AMAZON", 92.0, 90, 1))
+
+    run_fuzzy_cache_command("show", repo, 90)
+    output = capsys.readouterr().out
+    assert "'AMAZON MKTP' -> 'AMAZON' (score 92.0, threshold 90)\n" in output
+    assert "'STALE' -> None (score -, threshold 90) [stale]" in output
+    assert "2 cached fuzzy match(es)" in output
+
+    run_fuzzy_cache_command("prune", repo, 90)
+    assert "Pruned 1 stale fuzzy match(es)" in capsys.readouterr().out
+
+    run_fuzzy_cache_command("clear", repo, 90)
+    assert "Cleared 1 fuzzy match(es)" in capsys.readouterr().out
+    repo.conn.close()
+
+
+def test_parser_rules_command():
+    args = build_parser().parse_args(["rules", "add", "amzn", "Shopping"])
+    assert (args.command, args.action) == ("rules", "add")
+    assert (args.pattern, args.category) == ("amzn", "Shopping")
+    args = build_parser().parse_args(["rules", "delete", "3"])
+    assert (args.action, args.id) == ("delete", 3)
+
+
+def test_run_rules_command(capsys):
+    repo = MerchantCategoryRepository(":memory:")
+    parser = build_parser()
+
+    run_rules_command(parser.parse_args(["rules", "add", "amzn", "Shopping"]), repo)
+    assert "Rule 1: 'AMZN' -> Shopping" in capsys.readouterr().out
+
+    run_rules_command(parser.parse_args(["rules", "list"]), repo)
+    assert capsys.readouterr().out == "1: 'AMZN' -> Shopping\n1 rule(s)\n"
+
+    run_rules_command(parser.parse_args(["rules", "delete", "1"]), repo)
+    assert "Deleted rule 1" in capsys.readouterr().out
+    run_rules_command(parser.parse_args(["rules", "delete", "1"]), repo)
+    assert "No rule with id 1" in capsys.readouterr().out
+    assert repo.get_all_rules() == []
+    repo.conn.close()
+
+
+def test_parser_import_command():
+    args = build_parser().parse_args(["import", "jan.pdf", "statements", "--threaded"])
+    assert args.command == "import"
+    assert args.paths == ["jan.pdf", "statements"]
+    assert args.threaded
+
+
+def test_run_import_command(capsys, tmp_path):
+    transaction_repo = TransactionRepository(":memory:")
+    merchant_repo = MerchantCategoryRepository(":memory:")
+    rows = [{"date": "2024-01-15", "description": "STARBUCKS", "amount": -4.5}]
+    statement = tmp_path / "jan.pdf"
+    statement.write_bytes(b"jan")
+
+    with (
+        patch(
+            "expense_tracker.utils.parse_cache.get_data_directory",
+            return_value=tmp_path,
+        ),
+        patch(
+            "expense_tracker.utils.statement_formats.iter_bofa_statement_rows",
+            return_value=iter(rows),
+        ),
+    ):
+        run_import_command([str(statement)], transaction_repo, merchant_repo)
+
+    output = capsys.readouterr().out
+    assert "jan.pdf: 1 imported, 0 skipped, 0 failed" in output
+    for stage in ("parse", "normalize", "categorize", "dedupe", "write"):
+        assert f"\n{stage}: 1 in, " in output
+    assert transaction_repo.count_all_transactions() == 1
+    transaction_repo.conn.close()
+    merchant_repo.conn.close()
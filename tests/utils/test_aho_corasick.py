@@ -0,0 +1,39 @@
+import random
+
+from expense_tracker.utils.aho_corasick import AhoCorasick
+
+
+def test_finds_overlapping_patterns():
+    matcher = AhoCorasick(["HE", "SHE", "HIS", "HERS"])
+    matches = sorted(matcher.iter_matches("USHERS"))
+    assert matches == [(1, 1), (2, 0), (2, 3)]
+
+
+def test_matching_patterns():
+    matcher = AhoCorasick(["AMZN", "UBER *EATS", "UBER"])
+    assert matcher.matching_patterns("UBER *EATS PENDING") == {1, 2}
+    assert matcher.matching_patterns("AMZN MKTP US") == {0}
+    assert matcher.matching_patterns("STARBUCKS") == set()
+
+
+def test_empty_patterns_never_match():
+    matcher = AhoCorasick(["", "AB"])
+    assert matcher.matching_patterns("XABX") == {1}
+    assert AhoCorasick([]).matching_patterns("ANYTHING") == set()
+
+
+def test_matches_naive_search():
+    rng = random.Random(3)
+    patterns = [
+        "".join(rng.choice("ABC") for _ in range(rng.randint(1, 4))) for _ in range(30)
+    ]
+    matcher = AhoCorasick(patterns)
+    for _ in range(200):
+        text = "".join(rng.choice("ABCD") for _ in range(rng.randint(0, 20)))
+        expected = {
+            (start, i)
+            for i, p in enumerate(patterns)
+            for start in range(len(text) - len(p) + 1)
+            if text.startswith(p, start)
+        }
+        assert set(matcher.iter_matches(text)) == expected
@@ -0,0 +1,13 @@
+from expense_tracker.utils.amounts import parse_amount
+
+
+def test_parse_amount():
+    assert parse_amount("100.00") == 100.0
+    assert parse_amount("$50.50") == 50.5
+    assert parse_amount("1,000.00") == 1000.0
+    assert parse_amount("($25.00)") == -25.0
+    assert parse_amount("-10.00") == -10.0
+    assert parse_amount("") == 0.0
+    assert parse_amount("  $ 123.45  ") == 123.45
+    assert parse_amount(" -5.00 ") == -5.00
+    assert parse_amount("$1,234.56") == 1234.56
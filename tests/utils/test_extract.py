@@ -1,10 +1,56 @@
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from benchmarks import statement_pdf
+from benchmarks.statement_pdf import write_statement
+
 from expense_tracker.utils.extract import (
+    PageFilterStats,
     _parse_date,
-    _parse_amount,
+    _parity_sample,
+    _split_page_ranges,
+    clear_table_templates,
+    get_pdf_backend,
+    iter_bofa_statement_rows,
     parse_bofa_page,
     parse_bofa_statement_pdf,
 )
-from unittest.mock import patch, Mock
+from expense_tracker.utils import pdfium_backend
+from unittest.mock import MagicMock, patch, Mock
+
+# Peak traced memory allowed while streaming a statement, whatever its length.
+MAX_PARSE_PEAK_BYTES = 2 * 1024 * 1024
+
+
+def _mock_page(words: list[dict]) -> Mock:
+    """A letter-sized page whose raw chars spell out its words."""
+    page = Mock()
+    page.extract_words.return_value = words
+    page.chars = [
+        {
+            "text": ch,
+            "x0": w["x0"] + i,
+            "x1": w["x0"] + i + 1,
+            "top": w["top"],
+            "bottom": w["top"] + 8,
+        }
+        for w in words
+        for i, ch in enumerate(w["text"] + " ")
+    ]
+    page.pdf.metadata = {"Producer": "Test"}
+    page.width, page.height = 612, 792
+    page.bbox = (0, 0, 612, 792)
+    page.crop.return_value = page
+    return page
+
+
+@pytest.fixture(autouse=True)
+def no_table_templates():
+    clear_table_templates()
+    yield
+    clear_table_templates()
 
 
 def test_parse_date():
@@ -15,18 +61,6 @@ def test_parse_date():
     )  # Should return original string if parsing fails
 
 
-def test_parse_amount():
-    assert _parse_amount("100.00") == 100.0
-    assert _parse_amount("$50.50") == 50.5
-    assert _parse_amount("1,000.00") == 1000.0
-    assert _parse_amount("($25.00)") == -25.0
-    assert _parse_amount("-10.00") == -10.0
-    assert _parse_amount("") == 0.0
-    assert _parse_amount("  $ 123.45  ") == 123.45
-    assert _parse_amount(" -5.00 ") == -5.00
-    assert _parse_amount("$1,234.56") == 1234.56
-
-
 def test_parse_bofa_page():
     mock_page = Mock()
     words = [
@@ -74,21 +108,23 @@ def test_parse_bofa_page():
 @patch("expense_tracker.utils.extract.pdfplumber.open")
 def test_parse_bofa_statement_pdf(mock_pdfplumber_open):
     # Create mock pages
-    mock_page1 = Mock()
-    mock_page1.extract_words.return_value = [
-        {"text": "01/15/24", "top": 10, "x0": 10},
-        {"text": "Transaction", "top": 10, "x0": 20},
-        {"text": "1", "top": 10, "x0": 30},
-        {"text": "$10.00", "top": 10, "x0": 40},
-    ]
+    mock_page1 = _mock_page(
+        [
+            {"text": "01/15/24", "top": 10, "x0": 10},
+            {"text": "Transaction", "top": 10, "x0": 20},
+            {"text": "1", "top": 10, "x0": 30},
+            {"text": "$10.00", "top": 10, "x0": 40},
+        ]
+    )
 
-    mock_page2 = Mock()
-    mock_page2.extract_words.return_value = [
-        {"text": "01/16/24", "top": 20, "x0": 10},
-        {"text": "Transaction", "top": 20, "x0": 20},
-        {"text": "2", "top": 20, "x0": 30},
-        {"text": "($20.00)", "top": 20, "x0": 40},
-    ]
+    mock_page2 = _mock_page(
+        [
+            {"text": "01/16/24", "top": 20, "x0": 10},
+            {"text": "Transaction", "top": 20, "x0": 20},
+            {"text": "2", "top": 20, "x0": 30},
+            {"text": "($20.00)", "top": 20, "x0": 40},
+        ]
+    )
 
     # Mock the pdf object and its pages
     mock_pdf = Mock()
@@ -104,4 +140,260 @@ def test_parse_bofa_statement_pdf(mock_pdfplumber_open):
     assert transactions[0]["amount"] == 10.00
     assert transactions[1]["description"] == "Transaction 2"
     assert transactions[1]["amount"] == -20.00
-    mock_pdfplumber_open.assert_called_with("dummy_path.pdf")
+    # The pages are parsed from a chunk opened with just those pages
+    mock_pdfplumber_open.assert_called_with("dummy_path.pdf", pages=range(1, 51))
+
+
+def _mock_statement_pages(num_pages: int) -> list[Mock]:
+    return [
+        _mock_page(
+            [
+                {"text": "01/15/24", "top": 10, "x0": 10},
+                {"text": f"Transaction {i}", "top": 10, "x0": 20},
+                {"text": "($1.00)", "top": 10, "x0": 40},
+            ]
+        )
+        for i in range(num_pages)
+    ]
+
+
+def test_split_page_ranges():
+    assert _split_page_ranges(10, 3) == [(0, 4), (4, 7), (7, 10)]
+    assert _split_page_ranges(2, 4) == [(0, 1), (1, 2)]
+    assert _split_page_ranges(5, 1) == [(0, 5)]
+
+
+@patch("expense_tracker.utils.extract.parse_worker_pool", ThreadPoolExecutor)
+@patch("expense_tracker.utils.extract.pdfplumber.open")
+def test_parse_bofa_statement_pdf_parallel_preserves_order(mock_pdfplumber_open):
+    all_pages = _mock_statement_pages(12)
+
+    def open_pages(path, pages=None):
+        """Opens just the requested 1-based pages, like pdfplumber.open."""
+        opened = MagicMock()
+        opened.__enter__.return_value.pages = (
+            all_pages
+            if pages is None
+            else [all_pages[n - 1] for n in pages if n <= len(all_pages)]
+        )
+        return opened
+
+    mock_pdfplumber_open.side_effect = open_pages
+
+    transactions = parse_bofa_statement_pdf("dummy_path.pdf", workers=3)
+
+    assert [t["description"] for t in transactions] == [
+        f"Transaction {i}" for i in range(12)
+    ]
+    # One open to count pages, one to detect columns, then one per worker range
+    assert mock_pdfplumber_open.call_count == 5
+
+
+@patch("expense_tracker.utils.extract.parse_worker_pool")
+@patch("expense_tracker.utils.extract.pdfplumber.open")
+def test_parse_bofa_statement_pdf_small_file_is_serial(
+    mock_pdfplumber_open, mock_executor
+):
+    mock_pdf = Mock()
+    mock_pdf.pages = _mock_statement_pages(3)
+    mock_pdfplumber_open.return_value.__enter__.return_value = mock_pdf
+
+    transactions = parse_bofa_statement_pdf("dummy_path.pdf", workers=4)
+
+    assert len(transactions) == 3
+    mock_executor.assert_not_called()
+
+
+@patch("expense_tracker.utils.extract.pdfplumber.open")
+def test_iter_bofa_statement_rows_closes_pages(mock_pdfplumber_open):
+    mock_pdf = Mock()
+    mock_pdf.pages = _mock_statement_pages(3)
+    mock_pdfplumber_open.return_value.__enter__.return_value = mock_pdf
+
+    rows = iter_bofa_statement_rows("dummy_path.pdf")
+    assert next(rows)["description"] == "Transaction 0"
+    # Only the first page has been parsed and released so far
+    assert mock_pdf.pages[0].close.called
+    assert not mock_pdf.pages[1].extract_words.called
+
+    assert [r["description"] for r in rows] == ["Transaction 1", "Transaction 2"]
+    assert all(page.close.called for page in mock_pdf.pages)
+
+
+@patch("expense_tracker.utils.extract.pdfplumber.open")
+def test_pages_without_dates_are_not_parsed(mock_pdfplumber_open):
+    cover = _mock_page([{"text": "Your", "top": 10, "x0": 10}])
+    cover.chars = [{"text": ch} for ch in "Statement period 2024 Page 1 of 3"]
+    disclosures = _mock_page([])
+    mock_pdf = Mock()
+    mock_pdf.pages = [cover, *_mock_statement_pages(1), disclosures]
+    mock_pdfplumber_open.return_value.__enter__.return_value = mock_pdf
+
+    stats = PageFilterStats()
+    rows = list(iter_bofa_statement_rows("dummy_path.pdf", stats=stats))
+
+    assert [r["description"] for r in rows] == ["Transaction 0"]
+    assert not cover.extract_words.called
+    assert not disclosures.extract_words.called
+    assert all(page.close.called for page in mock_pdf.pages)
+    assert (stats.pages, stats.skipped) == (3, 2)
+
+
+def test_page_filter_stats_seconds_saved():
+    stats = PageFilterStats(pages=4, skipped=2, check_seconds=0.1, parse_seconds=1.0)
+    assert stats.seconds_saved == 0.9
+    assert PageFilterStats(pages=2, skipped=2).seconds_saved == 0.0
+
+
+@patch("expense_tracker.utils.extract.pdfplumber.open")
+def test_later_pages_are_cropped_to_the_table_template(mock_pdfplumber_open):
+    first, second = _mock_statement_pages(2)
+    # A row further down than any on the first page cannot use the template
+    outside = _mock_page(
+        [
+            {"text": "01/16/24", "top": 60, "x0": 10},
+            {"text": "Late", "top": 60, "x0": 20},
+            {"text": "($2.00)", "top": 60, "x0": 40},
+        ]
+    )
+    mock_pdf = Mock()
+    mock_pdf.pages = [first, second, outside]
+    mock_pdfplumber_open.return_value.__enter__.return_value = mock_pdf
+
+    rows = list(iter_bofa_statement_rows("dummy_path.pdf"))
+
+    assert [r["description"] for r in rows] == [
+        "Transaction 0",
+        "Transaction 1",
+        "Late",
+    ]
+    assert not first.crop.called
+    # Padded by 24 points, clamped to the page
+    second.crop.assert_called_once_with((0, 0, 64, 34))
+    assert not outside.crop.called
+
+    # The template grew to include the outlying page for the next statement
+    mock_pdf.pages = _mock_statement_pages(1)
+    list(iter_bofa_statement_rows("dummy_path.pdf"))
+    mock_pdf.pages[0].crop.assert_called_once_with((0, 0, 64, 84))
+
+
+def test_parse_generated_statement(tmp_path):
+    path = tmp_path / "statement.pdf"
+    rows = write_statement(str(path), pages=2, rows_per_page=12, seed=7)
+    stats = PageFilterStats()
+
+    assert list(iter_bofa_statement_rows(str(path), stats=stats)) == rows
+    # Cover and disclosure pages are skipped
+    assert (stats.pages, stats.skipped) == (4, 2)
+
+
+def test_parallel_parse_matches_serial(tmp_path):
+    path = str(tmp_path / "statement.pdf")
+    rows = write_statement(path, pages=12, rows_per_page=15, seed=3)
+
+    assert parse_bofa_statement_pdf(path, workers=1) == rows
+    clear_table_templates()
+    # Real worker processes, each starting without the columns or templates
+    assert parse_bofa_statement_pdf(path, workers=3) == rows
+
+
+def test_template_is_not_trusted_for_a_layout_sharing_its_key(tmp_path, monkeypatch):
+    # Same producer and page size, so both statements share a template key.
+    first, second = str(tmp_path / "first.pdf"), str(tmp_path / "second.pdf")
+    write_statement(first, pages=2, rows_per_page=10)
+    monkeypatch.setattr(statement_pdf, "AMOUNT_X", 570)
+    monkeypatch.setattr(statement_pdf, "DESCRIPTION_X", 130)
+    rows = write_statement(second, pages=2, rows_per_page=10)
+
+    list(iter_bofa_statement_rows(first))
+
+    assert list(iter_bofa_statement_rows(second)) == rows
+
+
+@pytest.mark.parametrize(
+    "pages, rows_per_page, seed, cover_pages, disclosure_pages",
+    [
+        (1, 1, 0, 0, 0),
+        (2, 12, 7, 1, 1),
+        (3, 30, 1, 2, 0),
+        (4, 33, 42, 0, 3),
+    ],
+)
+def test_pdfium_backend_matches_pdfplumber(
+    tmp_path, caplog, pages, rows_per_page, seed, cover_pages, disclosure_pages
+):
+    path = str(tmp_path / "statement.pdf")
+    rows = write_statement(
+        path, pages, rows_per_page, seed, cover_pages, disclosure_pages
+    )
+
+    assert list(iter_bofa_statement_rows(path, backend="pdfplumber")) == rows
+    clear_table_templates()
+    assert list(iter_bofa_statement_rows(path, backend="pdfium")) == rows
+    assert "Not using pdfium" not in caplog.text
+
+
+def test_pdfium_backend_falls_back_when_rows_differ(tmp_path, caplog, monkeypatch):
+    path = str(tmp_path / "statement.pdf")
+    rows = write_statement(path, pages=2, rows_per_page=5)
+    words_from_chars = pdfium_backend._words_from_chars
+    # Lose the last word of every page
+    monkeypatch.setattr(
+        pdfium_backend,
+        "_words_from_chars",
+        lambda chars: words_from_chars(chars)[:-1],
+    )
+
+    assert list(iter_bofa_statement_rows(path, backend="pdfium")) == rows
+    assert "Not using pdfium" in caplog.text
+
+
+def test_pdfium_backend_falls_back_when_a_later_page_differs(
+    tmp_path, caplog, monkeypatch
+):
+    path = str(tmp_path / "statement.pdf")
+    rows = write_statement(path, pages=9, rows_per_page=5)
+    # The rows end on the second to last page, before the disclosures.
+    last_dated_page = 9
+    read_chars = pdfium_backend.PdfiumPage._read_chars
+
+    def last_rows_lose_cents(page):
+        chars = read_chars(page)
+        return chars[:-3] if page.index == last_dated_page else chars
+
+    monkeypatch.setattr(pdfium_backend.PdfiumPage, "_read_chars", last_rows_lose_cents)
+
+    assert list(iter_bofa_statement_rows(path, backend="pdfium")) == rows
+    assert "Not using pdfium" in caplog.text
+
+
+def test_parity_sample_spreads_pages_from_first_to_last():
+    assert _parity_sample(1, 3) == [1, 2, 3]
+    assert _parity_sample(2, 19) == [2, 8, 13, 19]
+
+
+def test_get_pdf_backend(monkeypatch):
+    monkeypatch.delenv("SPENDWISE_PDF_BACKEND", raising=False)
+    assert get_pdf_backend() == "pdfplumber"
+    monkeypatch.setenv("SPENDWISE_PDF_BACKEND", "PDFium")
+    assert get_pdf_backend() == "pdfium"
+    monkeypatch.setenv("SPENDWISE_PDF_BACKEND", "poppler")
+    assert get_pdf_backend() == "pdfplumber"
+
+
+@pytest.mark.parametrize("pages", [3, 30])
+def test_parse_memory_is_bounded(tmp_path, monkeypatch, pages):
+    monkeypatch.setenv("SPENDWISE_PARSE_CHUNK_PAGES", "4")
+    path = str(tmp_path / "statement.pdf")
+    write_statement(path, pages, rows_per_page=5, cover_pages=0, disclosure_pages=0)
+
+    tracemalloc.start()
+    try:
+        count = sum(1 for _ in iter_bofa_statement_rows(path, backend="pdfplumber"))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert count == pages * 5
+    assert peak < MAX_PARSE_PEAK_BYTES
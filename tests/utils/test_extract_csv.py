@@ -0,0 +1,91 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from expense_tracker.utils.extract_csv import (
+    CsvColumns,
+    detect_csv_columns,
+    iter_csv_rows,
+)
+
+
+def test_detect_csv_columns():
+    columns = detect_csv_columns(["Posted Date", "Payee", "Address", "Amount"])
+    assert columns == CsvColumns("Posted Date", "Payee", amount="Amount")
+
+    columns = detect_csv_columns(["Date", "Description", "Debit", "Credit"])
+    assert columns == CsvColumns("Date", "Description", debit="Debit", credit="Credit")
+
+    assert detect_csv_columns(["Description", "", "Summary Amt."]) is None
+
+
+def test_iter_csv_rows_skips_account_summary(tmp_path):
+    path = tmp_path / "stmt.csv"
+    path.write_text(
+        "﻿Description,,Summary Amt.\n"
+        'Beginning balance as of 01/01/2024,,"1,000.00"\n'
+        "\n"
+        "Date,Description,Amount,Running Bal.\n"
+        '01/01/2024,Beginning balance as of 01/01/2024,,"1,000.00"\n'
+        '01/02/2024,"STARBUCKS  STORE 123",-4.50,995.50\n'
+        '01/03/2024,PAYROLL DIRECT DEP,"2,000.00","2,995.50"\n'
+        "01/04/2024,BROKEN,n/a,0\n",
+        encoding="utf-8",
+    )
+
+    assert list(iter_csv_rows(str(path))) == [
+        {"date": "2024-01-02", "description": "STARBUCKS STORE 123", "amount": -4.5},
+        {"date": "2024-01-03", "description": "PAYROLL DIRECT DEP", "amount": 2000.0},
+        {"date": "2024-01-04", "description": "BROKEN", "amount": "n/a"},
+    ]
+
+
+def test_iter_csv_rows_debit_and_credit_columns(tmp_path):
+    path = tmp_path / "stmt.csv"
+    path.write_text(
+        "Transaction Date,Memo,Withdrawal,Deposit\n"
+        "2024-02-01,VONS #123,12.34,\n"
+        "2024-02-02,REFUND,,5.00\n",
+        encoding="utf-8",
+    )
+
+    assert list(iter_csv_rows(str(path))) == [
+        {"date": "2024-02-01", "description": "VONS #123", "amount": -12.34},
+        {"date": "2024-02-02", "description": "REFUND", "amount": 5.0},
+    ]
+
+
+def test_iter_csv_rows_explicit_columns(tmp_path):
+    path = tmp_path / "stmt.csv"
+    path.write_text("When,What,How Much\n03/05/24,CHEVRON,-40.00\n")
+    columns = CsvColumns("When", "What", amount="How Much")
+
+    assert list(iter_csv_rows(str(path), columns)) == [
+        {"date": "2024-03-05", "description": "CHEVRON", "amount": -40.0}
+    ]
+
+
+def test_iter_csv_rows_without_header(tmp_path):
+    path = tmp_path / "stmt.csv"
+    path.write_text("01/02/2024,STARBUCKS,-4.50\n")
+
+    with pytest.raises(ValueError, match="No transaction header"):
+        list(iter_csv_rows(str(path)))
+
+
+def test_import_does_not_load_pdfplumber():
+    # A fresh interpreter, since other tests import the PDF parser.
+    code = (
+        "import sys, expense_tracker.utils.extract_csv; "
+        "print('pdfplumber' in sys.modules)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).parent.parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,72 @@
+from expense_tracker.utils import extract_ofx
+from expense_tracker.utils.extract_ofx import iter_ofx_rows
+
+SGML_OFX = """OFXHEADER:100
+DATA:OFXSGML
+VERSION:102
+ENCODING:USASCII
+CHARSET:1252
+
+<OFX>
+<BANKMSGSRSV1><STMTTRNRS><STMTRS>
+<BANKTRANLIST>
+<DTSTART>20240101
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20240102120000[-8:PST]
+<TRNAMT>-4.50
+<FITID>1
+<NAME>STARBUCKS STORE 123
+</STMTTRN>
+<STMTTRN>
+<TRNTYPE>CREDIT
+<DTPOSTED>20240103
+<TRNAMT>2000.00
+<FITID>2
+<MEMO>PAYROLL &amp; BONUS
+</STMTTRN>
+</BANKTRANLIST>
+<LEDGERBAL><BALAMT>1995.50<DTASOF>20240131</LEDGERBAL>
+</STMTRS></STMTTRNRS></BANKMSGSRSV1>
+</OFX>
+"""
+
+XML_OFX = """<?xml version="1.0" encoding="UTF-8"?>
+<?OFX OFXHEADER="200" VERSION="220"?>
+<OFX><CREDITCARDMSGSRSV1><CCSTMTTRNRS><CCSTMTRS><BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT</TRNTYPE><DTPOSTED>20240205</DTPOSTED>
+<TRNAMT>-12.34</TRNAMT><NAME>CAFÉ LUNA</NAME></STMTTRN>
+<STMTTRN><TRNTYPE>DEBIT</TRNTYPE><DTPOSTED>20240206</DTPOSTED>
+<TRNAMT>oops</TRNAMT><NAME>BROKEN</NAME></STMTTRN>
+</BANKTRANLIST></CCSTMTRS></CCSTMTTRNRS></CREDITCARDMSGSRSV1></OFX>
+"""
+
+
+def test_iter_ofx_rows_sgml(tmp_path):
+    path = tmp_path / "stmt.qfx"
+    path.write_text(SGML_OFX, encoding="cp1252")
+
+    assert list(iter_ofx_rows(str(path))) == [
+        {"date": "2024-01-02", "description": "STARBUCKS STORE 123", "amount": -4.5},
+        {"date": "2024-01-03", "description": "PAYROLL & BONUS", "amount": 2000.0},
+    ]
+
+
+def test_iter_ofx_rows_xml(tmp_path):
+    path = tmp_path / "stmt.ofx"
+    path.write_text(XML_OFX, encoding="utf-8")
+
+    assert list(iter_ofx_rows(str(path))) == [
+        {"date": "2024-02-05", "description": "CAFÉ LUNA", "amount": -12.34},
+        {"date": "2024-02-06", "description": "BROKEN", "amount": "oops"},
+    ]
+
+
+def test_iter_ofx_rows_tags_split_across_chunks(tmp_path, monkeypatch):
+    path = tmp_path / "stmt.ofx"
+    path.write_text(SGML_OFX, encoding="cp1252")
+    expected = list(iter_ofx_rows(str(path)))
+
+    for size in (1, 7, 50):
+        monkeypatch.setattr(extract_ofx, "CHUNK_SIZE", size)
+        assert list(iter_ofx_rows(str(path))) == expected
@@ -0,0 +1,158 @@
+from expense_tracker.utils.extract import AMOUNT_RX, DATE_RX
+from expense_tracker.utils.layout import (
+    ColumnLayout,
+    TableRegion,
+    assemble_rows,
+    detect_columns,
+    group_lines,
+    split_lines,
+    table_region,
+)
+
+
+def _word(text, x0, top, height=8):
+    return {
+        "text": text,
+        "x0": x0,
+        "x1": x0 + 5 * len(text),
+        "top": top,
+        "bottom": top + height,
+    }
+
+
+def _rows(words, columns=None):
+    parts = split_lines(group_lines(words), DATE_RX, AMOUNT_RX)
+    if columns is None:
+        columns = detect_columns(parts)
+    return [
+        (r.date, " ".join(r.description), r.amount)
+        for r in assemble_rows(parts, columns)
+    ]
+
+
+def test_group_lines_tolerates_small_top_differences():
+    # 9.9 and 11.1 used to round into different 2-point buckets
+    words = [
+        _word("-4.50", 520, 11.1),
+        _word("01/15/24", 40, 9.9),
+        _word("STARBUCKS", 95, 10.4),
+        _word("01/16/24", 40, 30),
+    ]
+    lines = group_lines(words)
+    assert [[w["text"] for w in line.words] for line in lines] == [
+        ["01/15/24", "STARBUCKS", "-4.50"],
+        ["01/16/24"],
+    ]
+
+
+def test_detect_columns():
+    words = [
+        _word("01/15/24", 40, 10),
+        _word("STARBUCKS", 95, 10),
+        _word("-4.50", 520, 10),
+        _word("01/16/24", 40, 30),
+        _word("VONS", 96, 30),
+        _word("-12.00", 515, 30),
+        _word("Page", 40, 700),
+    ]
+    columns = detect_columns(split_lines(group_lines(words), DATE_RX, AMOUNT_RX))
+    assert columns == ColumnLayout(description_x0=95.5, amount_x0=515, line_height=8)
+
+
+def test_detect_columns_without_rows():
+    words = [_word("Account", 40, 10), _word("summary", 95, 10)]
+    assert detect_columns(split_lines(group_lines(words), DATE_RX, AMOUNT_RX)) is None
+
+
+def test_wrapped_description_is_joined():
+    words = [
+        _word("01/15/24", 40, 10),
+        _word("AMAZON", 95, 10),
+        _word("MKTP", 130, 10),
+        _word("-20.00", 520, 10),
+        _word("SEATTLE", 95, 20),
+        _word("WA", 135, 20),
+        _word("01/16/24", 40, 30),
+        _word("VONS", 95, 30),
+        _word("-12.00", 520, 30),
+    ]
+    assert _rows(words) == [
+        ("01/15/24", "AMAZON MKTP SEATTLE WA", "-20.00"),
+        ("01/16/24", "VONS", "-12.00"),
+    ]
+
+
+def test_amount_on_continuation_line_is_recovered():
+    words = [
+        _word("01/15/24", 40, 10),
+        _word("VONS", 95, 10),
+        _word("-12.00", 520, 10),
+        _word("01/16/24", 40, 30),
+        _word("UBER", 95, 30),
+        _word("TRIP", 120, 41),
+        _word("-9.99", 520, 41),
+    ]
+    assert _rows(words) == [
+        ("01/15/24", "VONS", "-12.00"),
+        ("01/16/24", "UBER TRIP", "-9.99"),
+    ]
+
+
+def test_unrelated_lines_are_not_continuations():
+    words = [
+        _word("01/15/24", 40, 10),
+        _word("VONS", 95, 10),
+        _word("-12.00", 520, 10),
+        # Starts in the date column
+        _word("Subtotal", 40, 20),
+        _word("01/16/24", 40, 40),
+        _word("UBER", 95, 40),
+        _word("-9.99", 520, 40),
+        # Too far below the row
+        _word("Continued", 95, 100),
+        _word("01/17/24", 40, 120),
+        _word("NETFLIX", 95, 120),
+        _word("-15.49", 520, 120),
+        _word("Total", 95, 130),
+        _word("for", 125, 130),
+        _word("period", 145, 130),
+    ]
+    assert _rows(words) == [
+        ("01/15/24", "VONS", "-12.00"),
+        ("01/16/24", "UBER", "-9.99"),
+        ("01/17/24", "NETFLIX", "-15.49"),
+    ]
+
+
+def test_rows_without_amount_are_dropped():
+    words = [
+        _word("01/15/24", 40, 10),
+        _word("PENDING", 95, 10),
+        _word("01/16/24", 40, 30),
+        _word("VONS", 95, 30),
+        _word("-12.00", 520, 30),
+    ]
+    assert _rows(words) == [("01/16/24", "VONS", "-12.00")]
+
+
+def test_table_region():
+    words = [
+        _word("Statement", 40, 5),
+        _word("01/15/24", 40, 10),
+        _word("STARBUCKS", 95, 10),
+        _word("-4.50", 520, 10),
+        _word("01/16/24", 40, 30),
+        _word("VONS", 95, 30),
+        _word("-12.00", 515, 30),
+    ]
+    parts = split_lines(group_lines(words), DATE_RX, AMOUNT_RX)
+    assert table_region(parts, padding=2) == TableRegion(38, 8, 547, 40)
+    assert table_region(parts[:1], padding=2) is None
+
+
+def test_table_region_contains_and_clamp():
+    region = TableRegion(10, 10, 100, 100)
+    assert region.contains(TableRegion(20, 20, 90, 90))
+    assert not region.contains(TableRegion(5, 20, 90, 90))
+    assert region.union(TableRegion(5, 20, 120, 90)) == TableRegion(5, 10, 120, 100)
+    assert region.clamp((0, 0, 50, 200)) == TableRegion(10, 10, 50, 100)
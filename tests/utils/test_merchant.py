@@ -1,6 +1,11 @@
+from datetime import date
+
 import pytest
-from unittest.mock import MagicMock
-from expense_tracker.core.models import MerchantCategory
+from unittest.mock import MagicMock, patch
+from expense_tracker.core.models import MerchantCategory, MerchantRule, Transaction
+from expense_tracker.core.merchant_repository import MerchantCategoryRepository
+from expense_tracker.core.transaction_repository import TransactionRepository
+from expense_tracker.services.merchant import MerchantCategoryService
 from expense_tracker.utils.merchant_normalizer import (
     normalize_merchant,
 )
@@ -47,4 +52,174 @@ def mock_repo() -> MagicMock:
 
     repo.get_category.side_effect = get_category
     repo.get_all_merchants.return_value = list(merchants.values())
+    repo.get_all_rules.return_value = []
+    repo.rules_version = 0
+    repo.get_fuzzy_match.return_value = None
+    repo.merchant_version = 0
     return repo
+
+
+@pytest.fixture
+def merchant_service(mock_repo) -> MerchantCategoryService:
+    return MerchantCategoryService(mock_repo, MagicMock(), normalize_merchant)
+
+
+def test_categorize_merchant_exact_match(merchant_service):
+    assert merchant_service.categorize_merchant("Starbucks", -5.0) == "Coffee"
+
+
+def test_categorize_merchant_income(merchant_service):
+    assert merchant_service.categorize_merchant("Payroll", 1000.0) == "Income"
+
+
+def test_categorize_merchant_fuzzy_match(merchant_service):
+    assert merchant_service.categorize_merchant("NETFLIX.COM", -15.0) == "Subscriptions"
+    assert (
+        merchant_service.categorize_merchant("MOBILE PURCHASE Whole Foods", -20.0)
+        == "Uncategorized"
+    )
+
+
+def test_fuzzy_lookup_builds_index_once(merchant_service, mock_repo):
+    merchant_service.fuzzy_lookup_merchant("STARBUCKS COFFEE")
+    merchant_service.fuzzy_lookup_merchant("MCDONALDS #12")
+    assert mock_repo.get_all_merchants.call_count == 1
+
+
+def test_update_category_extends_index(merchant_service, mock_repo):
+    assert merchant_service.fuzzy_lookup_merchant("BLUE BOTTLE") is None
+    merchant_service.update_category("Blue Bottle", "Coffee")
+    assert merchant_service.fuzzy_lookup_merchant("BLUE BOTTLE") == "BLUE BOTTLE"
+    assert mock_repo.get_all_merchants.call_count == 1
+
+
+def test_fuzzy_lookup_below_indexed_threshold_scans_all_keys(merchant_service):
+    assert merchant_service.fuzzy_lookup_merchant("STARBUCKZ", threshold=80) == (
+        "STARBUCKS"
+    )
+
+
+@pytest.fixture
+def transaction_repo():
+    repo = TransactionRepository(":memory:")
+    yield repo
+    repo.conn.close()
+
+
+def _add_uncategorized(repo: TransactionRepository, descriptions: list[str]) -> None:
+    for description in descriptions:
+        repo.add_transaction(
+            Transaction(None, date(2024, 1, 1), -5.0, "Uncategorized", description)
+        )
+
+
+def test_update_uncategorized_transactions_in_chunks(mock_repo, transaction_repo):
+    _add_uncategorized(transaction_repo, ["Starbucks", "Netflix", "Unknown"] * 3)
+    service = MerchantCategoryService(mock_repo, transaction_repo, normalize_merchant)
+    progress = []
+
+    updated = service.update_uncategorized_transactions(
+        chunk_size=4, on_progress=lambda done, total: progress.append((done, total))
+    )
+
+    assert updated == 6
+    assert progress == [(4, 9), (8, 9), (9, 9)]
+    remaining = transaction_repo.get_all_transactions_by_category("Uncategorized")
+    assert [t.description for t in remaining] == ["Unknown"] * 3
+
+
+def test_update_uncategorized_transactions_cancel_keeps_committed_chunks(
+    mock_repo, transaction_repo
+):
+    _add_uncategorized(transaction_repo, ["Starbucks"] * 5)
+    service = MerchantCategoryService(mock_repo, transaction_repo, normalize_merchant)
+    progress = []
+
+    updated = service.update_uncategorized_transactions(
+        chunk_size=2,
+        on_progress=lambda done, total: progress.append(done),
+        should_cancel=lambda: len(progress) >= 1,
+    )
+
+    assert updated == 2
+    assert len(transaction_repo.get_all_transactions_by_category("Coffee")) == 2
+    assert len(transaction_repo.get_all_transactions_by_category("Uncategorized")) == 3
+
+
+def test_rules_apply_before_fuzzy_matching(merchant_service, mock_repo):
+    mock_repo.get_all_rules.return_value = [
+        MerchantRule(1, "AMZN", "Shopping"),
+        MerchantRule(2, "UBER *EATS", "Dining"),
+        MerchantRule(3, "UBER", "Transport"),
+    ]
+    mock_repo.rules_version = 1
+
+    assert merchant_service.categorize_merchant("AMZN Mktp US*2K4", -30.0) == "Shopping"
+    assert merchant_service.categorize_merchant("UBER *EATS PENDING", -25.0) == "Dining"
+    assert merchant_service.categorize_merchant("UBER *TRIP", -12.0) == "Transport"
+    # Exact merchant matches still take precedence over rules
+    assert merchant_service.categorize_merchant("Starbucks", -5.0) == "Coffee"
+
+
+def test_rule_matcher_rebuilt_only_when_rules_change(merchant_service, mock_repo):
+    mock_repo.get_all_rules.return_value = [MerchantRule(1, "AMZN", "Shopping")]
+    mock_repo.rules_version = 1
+    merchant_service.match_rule("AMZN MKTP")
+    merchant_service.match_rule("AMZN PRIME")
+    assert mock_repo.get_all_rules.call_count == 1
+
+    mock_repo.get_all_rules.return_value = [MerchantRule(1, "AMZN", "Books")]
+    mock_repo.rules_version = 2
+    assert merchant_service.match_rule("AMZN PRIME").category == "Books"
+    assert mock_repo.get_all_rules.call_count == 2
+
+
+@pytest.fixture
+def merchant_repo():
+    repo = MerchantCategoryRepository(":memory:")
+    yield repo
+    repo.conn.close()
+
+
+def test_fuzzy_lookup_uses_persistent_cache(merchant_repo):
+    merchant_repo.set_category(MerchantCategory("STARBUCKS", "Coffee"))
+    service = MerchantCategoryService(merchant_repo, MagicMock(), normalize_merchant)
+    assert service.fuzzy_lookup_merchant("STARBUCKS COFFEE") == "STARBUCKS"
+
+    # A fresh service answers from the cache without building the index
+    cached_service = MerchantCategoryService(
+        merchant_repo, MagicMock(), normalize_merchant
+    )
+    with patch.object(cached_service, "_get_merchant_index") as get_index:
+        assert cached_service.fuzzy_lookup_merchant("STARBUCKS COFFEE") == "STARBUCKS"
+        get_index.assert_not_called()
+
+
+def test_fuzzy_cache_misses_on_new_key_or_threshold(merchant_repo):
+    merchant_repo.set_category(MerchantCategory("STARBUCKS", "Coffee"))
+    service = MerchantCategoryService(merchant_repo, MagicMock(), normalize_merchant)
+    assert service.fuzzy_lookup_merchant("BLUE BOTTLE CAFE") is None
+    assert merchant_repo.get_fuzzy_match("BLUE BOTTLE CAFE").matched_key is None
+
+    service.update_category("Blue Bottle Cafe", "Coffee")
+    assert service.fuzzy_lookup_merchant("BLUE BOTTLE CAFE") == "BLUE BOTTLE CAFE"
+
+    service.fuzzy_lookup_merchant("BLUE BOTTLE CAFE", threshold=95)
+    assert merchant_repo.get_fuzzy_match("BLUE BOTTLE CAFE").threshold == 95
+
+
+def test_fuzzy_matches_committed_once_per_chunk(merchant_repo, transaction_repo):
+    merchant_repo.set_category(MerchantCategory("STARBUCKS", "Coffee"))
+    _add_uncategorized(
+        transaction_repo, ["Alpha Mart", "Bravo Deli", "Cafe Rio", "Dunkin", "Exxon"]
+    )
+    service = MerchantCategoryService(
+        merchant_repo, transaction_repo, normalize_merchant
+    )
+    statements = []
+    merchant_repo.conn.set_trace_callback(statements.append)
+
+    service.update_uncategorized_transactions(chunk_size=3)
+
+    assert len(merchant_repo.get_all_fuzzy_matches()) == 5
+    assert statements.count("COMMIT") == 2
@@ -0,0 +1,81 @@
+import random
+
+import pytest
+from rapidfuzz import process
+
+from expense_tracker.utils.ngram_index import NGramIndex
+
+
+def test_candidates_share_a_trigram():
+    index = NGramIndex(["STARBUCKS", "MCDONALDS", "NETFLIX"])
+    assert index.candidates("STARBUCKS COFFEE") == ["STARBUCKS"]
+    assert index.candidates("NETFLIX.COM") == ["NETFLIX"]
+    assert index.candidates("WHOLE FOODS") == []
+
+
+def test_candidates_keep_insertion_order():
+    index = NGramIndex(["UBER EATS", "UBER TRIP", "LYFT"])
+    index.add("UBER ONE")
+    assert index.candidates("UBER") == ["UBER EATS", "UBER TRIP", "UBER ONE"]
+
+
+def test_short_keys_and_queries_are_never_pruned():
+    index = NGramIndex(["SQ", "TARGET", "VONS"])
+    assert index.candidates("WALMART") == ["SQ"]
+    assert index.candidates("AB") == ["SQ", "TARGET", "VONS"]
+
+
+def test_shared_short_token_is_a_candidate():
+    # No trigram is shared, but token_sort_ratio scores the pair 95.
+    index = NGramIndex(["AB SQ", "TARGET"])
+    assert index.candidates("SQ AB") == ["AB SQ"]
+
+
+def test_sharing_only_a_common_word_is_not_a_candidate():
+    index = NGramIndex(["KOVARI MARKET", "ZEPHYR MARKET", "BELLA CAFE"])
+    assert index.candidates("KOVARI MARKT") == ["KOVARI MARKET"]
+
+
+def test_add_existing_key_is_noop():
+    index = NGramIndex(["TARGET"])
+    index.add("TARGET")
+    assert len(index) == 1
+    assert "TARGET" in index
+
+
+def _mutate(rng: random.Random, text: str, alphabet: str) -> str:
+    chars = list(text)
+    for _ in range(rng.randint(0, 3)):
+        op = rng.random()
+        if op < 0.3 and chars:
+            chars.pop(rng.randrange(len(chars)))
+        elif op < 0.6:
+            chars.insert(rng.randrange(len(chars) + 1), rng.choice(alphabet))
+        elif chars:
+            chars[rng.randrange(len(chars))] = rng.choice(alphabet)
+    return "".join(chars)
+
+
+@pytest.mark.parametrize("alphabet", ["ABCDEFGHIJKLMNOP .'-&", "ABCD .E"])
+@pytest.mark.parametrize("threshold", [90, 95, 100])
+def test_matches_exhaustive_search(alphabet, threshold):
+    """Pruned scoring returns exactly what scoring every key returns."""
+    rng = random.Random(7)
+    keys = list(
+        dict.fromkeys(
+            "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 14))).strip()
+            or "X"
+            for _ in range(500)
+        )
+    )
+    index = NGramIndex(keys)
+
+    for _ in range(500):
+        query = _mutate(rng, rng.choice(keys), alphabet)
+        if rng.random() < 0.3:
+            query = f"{query} {rng.choice(keys)}"
+        expected = process.extractOne(query, keys, score_cutoff=threshold)
+        actual = process.extractOne(
+            query, index.candidates(query), score_cutoff=threshold
+        )
+        assert (actual and actual[:2]) == (expected and expected[:2])
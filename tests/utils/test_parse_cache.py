@@ -0,0 +1,72 @@
+import hashlib
+import os
+
+from expense_tracker.utils import parse_cache
+from expense_tracker.utils.parse_cache import ParseCache, hash_file
+
+ROWS = [
+    {"date": "2024-01-15", "description": "STARBUCKS", "amount": -4.5},
+    {"date": "2024-01-16", "description": "PAYROLL", "amount": 1000.0},
+]
+
+
+def test_hash_file_matches_sha256(tmp_path):
+    path = tmp_path / "statement.pdf"
+    path.write_bytes(b"%PDF-1.4 statement")
+    assert hash_file(str(path)) == hashlib.sha256(b"%PDF-1.4 statement").hexdigest()
+
+
+def test_hash_file_empty(tmp_path):
+    path = tmp_path / "empty.pdf"
+    path.write_bytes(b"")
+    assert hash_file(str(path)) == hashlib.sha256(b"").hexdigest()
+
+
+def test_put_and_get_round_trip(tmp_path):
+    cache = ParseCache(tmp_path, max_bytes=1024 * 1024)
+    assert cache.get("abc") is None
+    cache.put("abc", ROWS)
+    assert cache.get("abc") == ROWS
+
+
+def test_empty_rows_are_cached(tmp_path):
+    cache = ParseCache(tmp_path, max_bytes=1024 * 1024)
+    cache.put("abc", [])
+    assert cache.get("abc") == []
+
+
+def test_parser_version_change_invalidates(tmp_path, monkeypatch):
+    cache = ParseCache(tmp_path, max_bytes=1024 * 1024)
+    cache.put("abc", ROWS)
+    monkeypatch.setattr(parse_cache, "PARSER_VERSION", parse_cache.PARSER_VERSION + 1)
+    assert cache.get("abc") is None
+
+    # Entries of other parser versions are removed on the next write.
+    cache.put("def", ROWS)
+    assert [p.name for p in tmp_path.glob("abc.*")] == []
+
+
+def test_unreadable_entry_is_a_miss(tmp_path):
+    cache = ParseCache(tmp_path, max_bytes=1024 * 1024)
+    cache.put("abc", ROWS)
+    next(tmp_path.glob("abc.*")).write_bytes(b"garbage")
+    assert cache.get("abc") is None
+    assert list(tmp_path.glob("abc.*")) == []
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = ParseCache(tmp_path, max_bytes=1024 * 1024)
+    for i, digest in enumerate(["a", "b", "c"]):
+        cache.put(digest, ROWS)
+        entry = next(tmp_path.glob(f"{digest}.*"))
+        os.utime(entry, ns=(i * 10**9, i * 10**9))
+    # Reading "a" makes it the most recently used entry.
+    assert cache.get("a") == ROWS
+
+    entry_size = next(tmp_path.glob("a.*")).stat().st_size
+    cache.max_bytes = entry_size * 2
+    cache.put("b", ROWS)
+
+    assert cache.get("a") == ROWS
+    assert cache.get("b") == ROWS
+    assert cache.get("c") is None
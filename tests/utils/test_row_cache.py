@@ -0,0 +1,86 @@
+from expense_tracker.utils.row_cache import RowBlockCache
+
+
+def make_cache(total, **kwargs):
+    data = list(range(total))
+    fetches = []
+
+    def fetch(limit, offset):
+        fetches.append(offset)
+        return data[offset : offset + limit]
+
+    return RowBlockCache(fetch, lambda: len(data), **kwargs), fetches
+
+
+def test_rows_span_blocks_and_clamp():
+    cache, fetches = make_cache(25, block_size=10)
+
+    assert len(cache) == 25
+    assert cache.rows(8, 13) == [8, 9, 10, 11, 12]
+    assert cache.rows(-5, 2) == [0, 1]
+    assert cache.rows(23, 40) == [23, 24]
+    assert fetches == [0, 10, 20]
+
+
+def test_only_recent_blocks_are_kept():
+    cache, fetches = make_cache(1_000_000, block_size=100, max_blocks=2)
+
+    cache.rows(0, 5)
+    cache.rows(500_000, 500_005)
+    cache.rows(0, 5)
+    cache.rows(999_990, 1_000_000)
+    # Block 0 was used more recently than block 5000, so it is still cached
+    cache.rows(0, 5)
+    cache.rows(500_000, 500_005)
+
+    assert fetches == [0, 500_000, 999_900, 500_000]
+    assert len(cache._blocks) == 2
+
+
+def test_seed_reuses_another_caches_rows():
+    filled, _ = make_cache(1000, block_size=100)
+    filled.rows(0, 100)
+    cache, fetches = make_cache(1000, block_size=100)
+    cache.seed(filled)
+    assert len(cache) == 1000
+    assert cache.rows(0, 100) == list(range(100))
+    assert fetches == []
+
+
+def test_clear_refetches_rows_and_count():
+    data = [1, 2, 3]
+    cache = RowBlockCache(
+        lambda limit, offset: data[offset : offset + limit], data.__len__
+    )
+    assert cache.rows(0, 10) == [1, 2, 3]
+
+    data.append(4)
+    assert cache.rows(0, 10) == [1, 2, 3]
+    cache.clear()
+    assert len(cache) == 4
+    assert cache.rows(0, 10) == [1, 2, 3, 4]
+
+
+def test_keyset_fetches_continue_from_the_previous_block():
+    data = list(range(0, 250, 10))
+    fetches = []
+
+    def fetch(limit, offset, after=None):
+        fetches.append((offset, after))
+        start = 0 if after is None else data.index(after) + 1
+        return data[start + offset : start + offset + limit]
+
+    cache = RowBlockCache(
+        fetch, lambda: len(data), block_size=10, max_blocks=1, key=lambda row: row
+    )
+
+    assert cache.rows(8, 12) == [80, 90, 100, 110]
+    assert cache.rows(21, 23) == [210, 220]
+    assert cache.rows(0, 1) == [0]
+    assert cache.rows(10, 11) == [100]
+    # Each block starts after the last row of a block fetched before it
+    assert fetches == [(0, None), (0, 90), (0, 190), (0, None), (0, 90)]
+
+    cache.clear()
+    assert cache.rows(21, 22) == [210]
+    assert fetches[-1] == (20, None)
@@ -0,0 +1,20 @@
+from expense_tracker.utils.settings import get_int_setting, get_setting
+
+
+def test_get_setting(monkeypatch):
+    monkeypatch.delenv("SPENDWISE_SOME_SETTING", raising=False)
+    assert get_setting("SOME_SETTING", "default") == "default"
+    monkeypatch.setenv("SPENDWISE_SOME_SETTING", "value")
+    assert get_setting("SOME_SETTING", "default") == "value"
+
+
+def test_get_int_setting(monkeypatch):
+    monkeypatch.delenv("SPENDWISE_SOME_NUMBER", raising=False)
+    assert get_int_setting("SOME_NUMBER", 4) == 4
+    monkeypatch.setenv("SPENDWISE_SOME_NUMBER", "8")
+    assert get_int_setting("SOME_NUMBER", 4) == 8
+
+
+def test_get_int_setting_invalid_value(monkeypatch):
+    monkeypatch.setenv("SPENDWISE_SOME_NUMBER", "many")
+    assert get_int_setting("SOME_NUMBER", 4) == 4
@@ -0,0 +1,62 @@
+from expense_tracker.utils.startup import (
+    ImportTime,
+    StartupTimer,
+    format_import_profile,
+    parse_importtime,
+)
+
+IMPORTTIME_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       132 |        132 |   _io
+import time:       280 |        412 | _frozen_importlib_external
+import time:      1500 |       1500 |     re
+import time:       700 |       2200 |   json.decoder
+import time:       300 |       2500 | json
+"""
+
+
+def test_startup_timer_summary():
+    timer = StartupTimer(start=0.0)
+    timer.marks = [("first paint", 0.2104), ("interactive", 0.35)]
+    assert timer.summary() == "Startup: first paint 210 ms, interactive 350 ms"
+
+
+def test_startup_timer_marks_in_order():
+    timer = StartupTimer()
+    first = timer.mark("first paint")
+    second = timer.mark("interactive")
+    assert 0 <= first <= second
+    assert [name for name, _ in timer.marks] == ["first paint", "interactive"]
+
+
+def test_startup_timer_reports_once(caplog, capsys):
+    timer = StartupTimer(start=0.0)
+    timer.marks = [("interactive", 0.35)]
+    with caplog.at_level("INFO"):
+        timer.report()
+    assert caplog.messages == ["Startup: interactive 350 ms"]
+    assert capsys.readouterr().out == ""
+
+
+def test_parse_importtime():
+    times = parse_importtime("Startup noise\n" + IMPORTTIME_OUTPUT)
+    assert times[0] == ImportTime("_io", 132, 132, 1)
+    assert times[2] == ImportTime("re", 1500, 1500, 2)
+    assert [t.module for t in times] == [
+        "_io",
+        "_frozen_importlib_external",
+        "re",
+        "json.decoder",
+        "json",
+    ]
+    assert [t.depth for t in times] == [1, 0, 2, 1, 0]
+
+
+def test_format_import_profile_lists_slowest_first():
+    profile = format_import_profile(parse_importtime(IMPORTTIME_OUTPUT), limit=2)
+    lines = profile.splitlines()
+    assert lines[1].endswith("| json")
+    assert lines[2].endswith("|   json.decoder")
+    assert "2.5" in lines[1]
+    assert len(lines) == 4
+    assert lines[-1] == "Imports: 3 ms in 5 modules"
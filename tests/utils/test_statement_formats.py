@@ -0,0 +1,29 @@
+import pytest
+
+from expense_tracker.utils.statement_formats import detect_format
+
+
+@pytest.mark.parametrize(
+    "name, content, expected",
+    [
+        ("jan.PDF", b"", "pdf"),
+        ("jan.csv", b"", "csv"),
+        ("jan.qfx", b"", "ofx"),
+        ("download", b"%PDF-1.4\n", "pdf"),
+        ("download", b"OFXHEADER:100\nDATA:OFXSGML\n", "ofx"),
+        ("download.txt", b"Date,Description,Amount\n", "csv"),
+    ],
+)
+def test_detect_format(tmp_path, name, content, expected):
+    path = tmp_path / name
+    path.write_bytes(content)
+
+    assert detect_format(str(path)) == expected
+
+
+def test_detect_format_rejects_other_files(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_bytes(b"just some notes")
+
+    with pytest.raises(ValueError, match="notes.txt"):
+        detect_format(str(path))